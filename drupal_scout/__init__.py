@@ -1 +1,12 @@
-from .application import Application
+def __getattr__(name):
+    # imported lazily, so the thin daemon client does not pay for the full application
+    if name == "Application":
+        from .application import Application
+        return Application
+    if name == "Scanner":
+        from .scanner import Scanner
+        return Scanner
+    if name == "iter_scan":
+        from .scanning import iter_scan
+        return iter_scan
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -3,23 +3,66 @@ import asyncio
 import json
 import os
 from argparse import ArgumentParser
-import jq
+from . import codec
+from .corematrix import DEFAULT_CORE_MINORS, STATUS_OK, CoreSupportMatrix, fetch_releases, write_csv, write_sqlite
 from .formatters.formatterfactory import FormatterFactory
+from .formatters.diffformatter import DiffFormatter
+from .formatters.jsonformatter import JSONFormatter
 from .exceptions import *
 from .module import Module
+from .cache import LRUCache
+from .breaker import CircuitBreaker
+from .fetcher import MetadataFetcher
+from .hedging import HedgePolicy
+from .mirrors import UPSTREAM_URL, EndpointPool, configured_mirrors
+from .project import ProjectFileCache, package_versions
+from .retries import RetryBudget
+from .revisions import load_file_at_revision, resolve_revision
+from .scanner import DEFAULT_CORE_VERSION, Scanner, module_requirements
+from .summary import ScanSummary
+from .scheduling import ORDER_POLICIES, POLICY_LONGEST_FIRST, ScanHistory
+from .warmer import DEFAULT_RATE, CacheWarmer
+from .watcher import FileWatcher
 from .workers_manager import WorkersManager
 from .output import ConsoleOutputHandler, logger
 
+# the metadata cached for a run: the dependency resolution reuses the payloads of the scan, and --watch
+# keeps them warm between its scans
+_METADATA_CACHE_SIZE = 4096
+_METADATA_CACHE_TTL = 900
+
 
 class Application:
     """
     The main application class.
     """
 
-    def __init__(self, output_handler=None):
+    def __init__(self, output_handler=None, scanner: Scanner | None = None, warmer: CacheWarmer | None = None):
         self.output = output_handler or ConsoleOutputHandler()
+        # a shared scanner keeps the session, the caches and the project files warm across runs,
+        # e.g. in the scout daemon; without one, the scanner gets the fetcher configured by the arguments
+        self.__shared_scanner = scanner is not None
+        self.scanner = scanner or Scanner()
+        # the background cache warmer of the scout daemon, which also learns the scanned modules
+        self.warmer = warmer
         self.__modules = {}
-        self.__drupal_core_version = "8.8"  # default and minimal supported Drupal core version for upgrade
+        self.__drupal_core_version = DEFAULT_CORE_VERSION
+
+    @property
+    def fetcher(self) -> MetadataFetcher:
+        return self.scanner.fetcher
+
+    @property
+    def project_files(self) -> ProjectFileCache:
+        return self.scanner.project_files
+
+    @property
+    def results(self) -> LRUCache:
+        return self.scanner.results
+
+    @property
+    def history(self) -> ScanHistory:
+        return self.scanner.history
 
     @property
     def modules(self) -> dict:
@@ -37,22 +80,69 @@ class Application:
     def drupal_core_version(self, value: str) -> None:
         self.__drupal_core_version = value
 
-    async def run(self):
+    async def run(self, argv: list[str] | None = None, cwd: str | None = None):
         # This is the main entry point for the application.
         # It should check the existence of the composer.json and composer.lock files,
         # parse the composer.json file to get the required modules,
         # parse the composer.lock file to get the installed versions of the modules,
         # and output the results in a human-readable format.
+        # The argv and cwd arguments let the scout daemon run the invocations of its clients.
 
         try:
             parser = ArgumentParser()
             parser = self.get_argparser_configuration(parser)
-            args = parser.parse_args()
+            args = parser.parse_args(argv)
+            if getattr(args, "summary", False) and args.format == "suggest":
+                parser.error("--summary cannot be combined with --format suggest")
+            if getattr(args, "watch", False) and (args.modules or args.fail_fast or args.summary):
+                parser.error("--watch cannot be combined with --modules, --fail-fast or --summary")
+            if getattr(args, "diff", None) and (args.modules or args.watch or args.summary):
+                parser.error("--diff cannot be combined with --modules, --watch or --summary")
+            if cwd is not None:
+                args.directory = os.path.join(cwd, args.directory)
+                if getattr(args, "projects", None):
+                    args.projects = [os.path.join(cwd, project) for project in args.projects]
+                for export in ("csv", "sqlite"):
+                    if getattr(args, export, None):
+                        setattr(args, export, os.path.join(cwd, getattr(args, export)))
 
             if hasattr(args, "command") and args.command == "info":
                 self.handle_info(args)
                 return
 
+            if hasattr(args, "command") and args.command == "serve":
+                await self.handle_serve(args)
+                return
+
+            if hasattr(args, "command") and args.command == "cache":
+                self.handle_cache(args)
+                return
+
+            if not self.__shared_scanner:
+                mirrors = args.mirror or configured_mirrors()
+                self.scanner.fetcher = MetadataFetcher(
+                    cache=LRUCache(max_size=_METADATA_CACHE_SIZE, ttl=_METADATA_CACHE_TTL),
+                    keep_session=args.watch,
+                    hedging=HedgePolicy() if args.hedge else None,
+                    breaker=CircuitBreaker(args.breaker_threshold) if args.breaker_threshold > 0 else None,
+                    retry_budget=RetryBudget(args.retry_budget / 100),
+                    endpoints=EndpointPool(mirrors) if mirrors else None,
+                )
+            else:
+                self._check_shared_fetcher(args)
+
+            if hasattr(args, "command") and args.command == "matrix":
+                await self.handle_matrix(args)
+                return
+
+            if args.watch:
+                await self._run_watch(args)
+                return
+
+            if args.diff:
+                await self._run_diff_scan(args)
+                return
+
             # Targeted scan: specific modules provided via CLI
             if args.modules:
                 await self._run_targeted_scan(args)
@@ -64,6 +154,35 @@ class Application:
         except (ComposerV1Exception, DirectoryNotFoundException, NoComposerJSONFileException) as e:
             logger.warning(e.message)
             exit(1)
+        except RevisionNotFoundException as e:
+            logger.error(e.message)
+            exit(1)
+
+    def _check_shared_fetcher(self, args) -> None:
+        """
+        Warn about the request options that the fetcher of the scout daemon, shared by the scans of
+        its clients, does not follow.
+        :param args:    the arguments passed to the application
+        :type args:     argparse.Namespace
+        """
+        if args.hedge and self.fetcher.hedging is None:
+            logger.warning("Hedged requests of the scout daemon are enabled with: drupal-scout serve --hedge")
+        retry_budget = self.fetcher.retry_budget
+        if retry_budget is not None and args.retry_budget / 100 != retry_budget.ratio:
+            logger.warning("--retry-budget is ignored: the scans in the scout daemon share its retry budget of %g%%.",
+                           retry_budget.ratio * 100)
+        breaker = self.fetcher.breaker
+        breaker_threshold = breaker.threshold if breaker is not None else 0
+        if args.breaker_threshold != breaker_threshold:
+            logger.warning("--breaker-threshold is ignored: the scout daemon uses a threshold of %d (0: disabled).",
+                           breaker_threshold)
+        if args.mirror:
+            endpoints = self.fetcher.endpoints
+            shared = [endpoint.base_url for endpoint in endpoints.endpoints] if endpoints is not None \
+                else [UPSTREAM_URL]
+            if [endpoint.base_url for endpoint in EndpointPool(args.mirror).endpoints] != shared:
+                logger.warning("--mirror is ignored: the scout daemon sends the requests to %s. "
+                               "Set DRUPAL_SCOUT_MIRRORS for the daemon instead.", ", ".join(shared))
 
     async def _run_targeted_scan(self, args) -> None:
         """Scan one or more specific modules and optionally use local lock metadata."""
@@ -85,16 +204,30 @@ class Application:
                 "The composer.lock file was not used to determine installed versions of targeted modules."
             )
 
-        workers_manager = WorkersManager(
-            modules=list(self.__modules.values()),
-            current_core=self.__drupal_core_version,
+        summary = ScanSummary() if args.summary else None
+        if self.warmer is not None:
+            self.warmer.record(self.__modules)
+        workers_manager = await self.scanner.scan(
+            self.__modules.values(),
+            self.__drupal_core_version,
             use_lock_version=use_lock_version,
             concurrency_limit=args.limit,
-            output=self.output
+            output=self.output,
+            resolve_dependencies=args.resolve_dependencies,
+            deadline=args.deadline,
+            order=args.schedule,
+            hints=self.scanner.lock_hints(args.directory) if use_lock_version else None,
+            summary=summary,
+            fail_fast=args.fail_fast
         )
-        await workers_manager.run()
+        self.history.save()
+        if args.profile:
+            self.print_profile(workers_manager)
+        if args.fail_fast and workers_manager.blocking is not None:
+            logger.error(BlockingModuleException(workers_manager.blocking, self.__drupal_core_version).message)
+            exit(1)
 
-        formatter = FormatterFactory.get_formatter(args)
+        formatter = FormatterFactory.get_formatter(args, summary)
         if formatter:
             self.output.print(formatter.format(list(self.__modules.values())))
 
@@ -141,7 +274,8 @@ class Application:
         self.get_required_modules(args)
 
         if len(self.__modules) > 0:
-            if not args.no_lock and os.path.isfile(os.path.join(args.directory, "composer.lock")):
+            use_lock_version = not args.no_lock and os.path.isfile(os.path.join(args.directory, "composer.lock"))
+            if use_lock_version:
                 self.determine_module_versions(args)
             elif args.no_lock:
                 logger.warning("The composer.lock file was not used to determine the installed versions of the modules.")
@@ -149,23 +283,262 @@ class Application:
                     "The only Drupal core version will be use to determine the transitive versions of the modules."
                 )
 
-            # create the workers manager
-            workers_manager = WorkersManager(
-                modules=list(self.__modules.values()),
-                current_core=self.__drupal_core_version,
+            # scan the modules
+            summary = ScanSummary() if args.summary else None
+            if self.warmer is not None:
+                self.warmer.record(self.__modules)
+            workers_manager = await self.scanner.scan(
+                self.__modules.values(),
+                self.__drupal_core_version,
                 use_lock_version=not args.no_lock,
                 concurrency_limit=args.limit,
-                output=self.output
+                output=self.output,
+                resolve_dependencies=args.resolve_dependencies,
+                deadline=args.deadline,
+                order=args.schedule,
+                hints=self.scanner.lock_hints(args.directory) if use_lock_version else None,
+                summary=summary,
+                fail_fast=args.fail_fast
             )
-            await workers_manager.run()
+            self.history.save()
+            if args.profile:
+                self.print_profile(workers_manager)
+            if args.fail_fast and workers_manager.blocking is not None:
+                logger.error(BlockingModuleException(workers_manager.blocking, self.__drupal_core_version).message)
+                exit(1)
 
             # output the results
-            formatter = FormatterFactory.get_formatter(args)
+            formatter = FormatterFactory.get_formatter(args, summary)
             if formatter:
                 self.output.print(formatter.format(list(self.__modules.values())))
         else:
             logger.warning("No modules were found in the composer.json file.")
 
+    async def _run_watch(self, args) -> None:
+        """
+        Scan the project, then watch its composer files. After every change, scan again only the modules whose
+        requirement or locked version changed, or all modules if the core version changed, and print the
+        differences from the previous results. The session, the metadata and the results stay warm in between.
+        """
+        try:
+            await self._run_environment_scan(args)
+            requirements = self._module_requirements(args)
+            results = {name: JSONFormatter.module_result(module) for name, module in self.__modules.items()}
+            paths = [os.path.join(args.directory, "composer.json"), os.path.join(args.directory, "composer.lock")]
+            async with FileWatcher(paths) as watcher:
+                logger.warning(
+                    "Watching composer.json and composer.lock for changes (%s). Press Ctrl+C to stop.", watcher.backend
+                )
+                async for _ in watcher.changes():
+                    try:
+                        requirements, results = await self._rescan_changes(args, requirements, results)
+                    except (FileNotFoundError, KeyError, TypeError, ValueError) as e:
+                        logger.warning("The composer files could not be read, waiting for the next change: %s", e)
+        finally:
+            await self.scanner.close()
+
+    async def _rescan_changes(self, args, requirements: dict[str, tuple], results: dict[str, dict]) \
+            -> tuple[dict[str, tuple], dict[str, dict]]:
+        """
+        Scan the modules whose requirement or locked version changed and print the differences.
+        :param args:            the arguments passed to the application
+        :type args:             argparse.Namespace
+        :param requirements:    the requirement and locked version of each module at the previous scan
+        :type requirements:     dict
+        :param results:         the JSON result of each module at the previous scan
+        :type results:          dict
+        :return:                the current requirements and results
+        :rtype:                 tuple
+        """
+        previous_core_version = self.__drupal_core_version
+        # read both files before updating the state, so that after a failed read the next change still compares
+        # against the last scan
+        core_version = self.scanner.drupal_core_version(args.directory, use_lock=not args.no_lock) \
+            or previous_core_version
+        current = self._module_requirements(args)
+        core_changed = core_version != previous_core_version
+        self.__drupal_core_version = core_version
+        logger.warning("The Drupal core version is: " + core_version)
+        removed = [name for name in requirements if name not in current]
+        modules = {}
+        for name, (constraint, locked_version) in current.items():
+            if core_changed or requirements.get(name) != (constraint, locked_version):
+                modules[name] = Module(name)
+                modules[name].version = locked_version
+
+        if modules:
+            await self.scanner.scan(
+                modules.values(),
+                self.__drupal_core_version,
+                use_lock_version=not args.no_lock,
+                concurrency_limit=args.limit,
+                output=self.output,
+                resolve_dependencies=args.resolve_dependencies,
+                deadline=args.deadline,
+                order=args.schedule
+            )
+            self.history.save()
+
+        formatter = DiffFormatter(results, removed, as_json=args.format == "json")
+        self.output.print(formatter.format(list(modules.values())))
+
+        results = {name: result for name, result in results.items() if name not in removed}
+        results.update({name: JSONFormatter.module_result(module) for name, module in modules.items()})
+        self.__modules = {name: self.__modules[name] for name in current if name in self.__modules}
+        self.__modules.update(modules)
+        return current, results
+
+    def _module_requirements(self, args) -> dict[str, tuple]:
+        """
+        Get the requirement in composer.json and the version in composer.lock of each required module.
+        :param args:    the arguments passed to the application
+        :type args:     argparse.Namespace
+        :return:        the (requirement, locked version) pair by module name
+        :rtype:         dict
+        """
+        return self.scanner.module_requirements(args.directory, use_lock=not args.no_lock)
+
+    async def _run_diff_scan(self, args) -> None:
+        """
+        Scan only the modules that were added or changed since a git revision, at both revisions,
+        and print the differences between the results. With --fail-fast, exit with status 1 at the
+        first changed module without a release compatible with the current core version.
+        """
+        if not os.path.isdir(args.directory):
+            raise DirectoryNotFoundException("The directory {} does not exist.".format(args.directory))
+        if not os.path.isfile(os.path.join(args.directory, "composer.json")):
+            raise NoComposerJSONFileException()
+        if not self.is_composer2(args):
+            raise ComposerV1Exception()
+
+        commit = resolve_revision(args.directory, args.diff)
+        base_json = load_file_at_revision(args.directory, commit, "composer.json")
+        if base_json is None:
+            raise RevisionNotFoundException("composer.json did not exist at {}.".format(args.diff))
+        base_lock = None if args.no_lock else load_file_at_revision(args.directory, commit, "composer.lock")
+        base_versions = package_versions(base_lock) if base_lock is not None else {}
+        base = module_requirements(base_json, base_versions)
+
+        self.determine_drupal_core_version(args)
+        head = self._module_requirements(args)
+        base_core_version = self._core_version_of(base_json, base_versions if base_lock is not None else None) \
+            or self.__drupal_core_version
+        core_changed = base_core_version != self.__drupal_core_version
+        changed = [name for name in head if core_changed or base.get(name) != head[name]]
+        removed = [name for name in base if name not in head]
+        logger.warning(
+            "%d of %d module(s) were added or changed since %s, %d removed.",
+            len(changed), len(head), args.diff, len(removed)
+        )
+
+        head_modules = {name: Module(name) for name in changed}
+        for name, module in head_modules.items():
+            module.version = head[name][1]
+        base_modules = {name: Module(name) for name in changed if name in base}
+        for name, module in base_modules.items():
+            module.version = base[name][1]
+
+        if head_modules:
+            workers_manager = await self.scanner.scan(
+                head_modules.values(),
+                self.__drupal_core_version,
+                use_lock_version=not args.no_lock,
+                concurrency_limit=args.limit,
+                output=self.output,
+                resolve_dependencies=args.resolve_dependencies,
+                deadline=args.deadline,
+                order=args.schedule,
+                fail_fast=args.fail_fast
+            )
+            self.history.save()
+            if args.profile:
+                self.print_profile(workers_manager)
+            if args.fail_fast and workers_manager.blocking is not None:
+                logger.error(BlockingModuleException(workers_manager.blocking, self.__drupal_core_version).message)
+                exit(1)
+        if base_modules:
+            # the metadata fetched for the current revision serves the base revision from the cache
+            await self.scanner.scan(
+                base_modules.values(),
+                base_core_version,
+                use_lock_version=not args.no_lock,
+                concurrency_limit=args.limit,
+                output=self.output,
+                resolve_dependencies=args.resolve_dependencies,
+                deadline=args.deadline,
+                order=args.schedule
+            )
+
+        before = {name: JSONFormatter.module_result(module) for name, module in base_modules.items()}
+        formatter = DiffFormatter(before, removed, as_json=args.format == "json")
+        self.output.print(formatter.format(list(head_modules.values())))
+
+    @staticmethod
+    def _core_version_of(composer_json: dict, versions: dict[str, str] | None) -> str | None:
+        """
+        Get the Drupal core version from the installed versions or, without them, from the requirements.
+        """
+        if versions is not None:
+            return versions.get("drupal/core")
+        require = composer_json.get("require") or {}
+        constraint = require.get("drupal/core") or require.get("drupal/core-recommended")
+        return constraint.replace("^", "").replace("~", "") if constraint else None
+
+    def print_profile(self, workers_manager: WorkersManager) -> None:
+        """
+        Print the scheduling order and the per-module timings of the last scan to stderr.
+        :param workers_manager:     the workers manager that ran the scan
+        :type  workers_manager:     WorkersManager
+        """
+        from rich.table import Table
+
+        table = Table(title="Scan profile: {} order, makespan {:.2f}s, {} retries".format(
+            workers_manager.order, workers_manager.elapsed, workers_manager.retries
+        ))
+        table.add_column("#", justify="right")
+        table.add_column("Module", style="cyan")
+        table.add_column("Estimate")
+        table.add_column("Finished after", justify="right")
+        table.add_column("Request", justify="right")
+        table.add_column("Size", justify="right")
+        table.add_column("Retries", justify="right")
+        for row in workers_manager.profile:
+            if row["estimate_source"] == "history":
+                estimate = "{:.2f}s (history)".format(row["estimate"])
+            elif row["estimate_source"] == "lock":
+                estimate = "{:.0f} (lock hint)".format(row["estimate"])
+            else:
+                estimate = "-"
+            table.add_row(
+                str(row["position"]),
+                row["module"],
+                estimate,
+                "timed out" if row["timed_out"] else "cancelled" if row["cancelled"]
+                else "{:.2f}s".format(row["finished_after"]),
+                "cached" if row["latency"] is None else "{:.2f}s".format(row["latency"]),
+                "-" if row["size"] is None else "{} B".format(row["size"]),
+                str(row["retries"]),
+            )
+        self.output.print(table, error=True)
+
+        endpoints = workers_manager.fetcher.endpoints
+        if endpoints is not None:
+            table = Table(title="Metadata endpoints")
+            table.add_column("Endpoint", style="cyan")
+            table.add_column("Requests", justify="right")
+            table.add_column("Failures", justify="right")
+            table.add_column("Latency", justify="right")
+            table.add_column("Healthy")
+            for endpoint in endpoints.stats():
+                table.add_row(
+                    endpoint["url"],
+                    str(endpoint["requests"]),
+                    str(endpoint["failures"]),
+                    "-" if endpoint["latency"] is None else "{:.2f}s".format(endpoint["latency"]),
+                    "yes" if endpoint["healthy"] else "no",
+                )
+            self.output.print(table, error=True)
+
     def get_argparser_configuration(self, parser) -> ArgumentParser:
         """
         Get the configuration of the ArgumentParser object.
@@ -244,8 +617,194 @@ class Application:
             default=[]
         )
 
+        parser.add_argument(
+            '-r',
+            '--resolve-dependencies',
+            help='Also resolve the drupal/* dependencies of the suitable entries and report only the entries '
+                 'whose dependencies have a release compatible with the target core.',
+            default=False,
+            action='store_true'
+        )
+
+        parser.add_argument(
+            '--deadline',
+            help='Stop the scan after DEADLINE seconds. The modules fetched by then are reported as usual, '
+                 'the others as timed out.',
+            type=float,
+            default=None
+        )
+
+        parser.add_argument(
+            '--schedule',
+            help='The order in which the modules are fetched. "longest-first" starts the modules that took '
+                 'longest in previous scans first, which shortens the scan; "declared" keeps the composer.json '
+                 'order. Default: longest-first.',
+            choices=ORDER_POLICIES,
+            default=POLICY_LONGEST_FIRST
+        )
+
+        parser.add_argument(
+            '--hedge',
+            help='Send a duplicate request for module metadata that is slower than 95%% of the recent requests, '
+                 'and use whichever response arrives first. At most 5%% of the requests are duplicated.',
+            default=False,
+            action='store_true'
+        )
+
+        parser.add_argument(
+            '--breaker-threshold',
+            help='Stop sending requests after this many consecutive modules failed all their retries, so that an '
+                 'upstream outage fails the remaining modules at once; a probe request checks for recovery every '
+                 '10 seconds. '
+                 '0 disables the circuit breaker. Default: 5.',
+            type=int,
+            default=5
+        )
+
+        parser.add_argument(
+            '--retry-budget',
+            help='Limit the retries of the whole scan to this percentage of the successful requests, '
+                 'after an initial allowance of 10 retries. Default: 10.',
+            type=float,
+            default=10
+        )
+
+        parser.add_argument(
+            '--mirror',
+            help='The base URL of a p2 metadata mirror to prefer over packages.drupal.org, e.g. an internal '
+                 'caching mirror. Repeat for several mirrors, in order of preference. Each request goes to the '
+                 'fastest healthy endpoint and fails over to the next one. Default: $DRUPAL_SCOUT_MIRRORS.',
+            type=str,
+            action='append',
+            default=None
+        )
+
+        parser.add_argument(
+            '--summary',
+            help='Only print the number of compatible, incompatible, inactive, failed and timed out modules, and '
+                 'of the modules with a suitable release in their installed major version. The entries of each '
+                 'module are dropped as soon as it is counted. Use with --format table or json.',
+            default=False,
+            action='store_true'
+        )
+
+        parser.add_argument(
+            '--fail-fast',
+            help='Stop the scan at the first module without a release compatible with the target core, and exit '
+                 'with status 1 naming the module. Use as a CI gate.',
+            default=False,
+            action='store_true'
+        )
+
+        parser.add_argument(
+            '--watch',
+            help='Keep running after the scan and watch composer.json and composer.lock. After every change, '
+                 'scan again the modules whose requirement or locked version changed and print the differences.',
+            default=False,
+            action='store_true'
+        )
+
+        parser.add_argument(
+            '--diff',
+            help='Scan only the modules that were added or changed since the given git revision of the project, '
+                 'e.g. the target branch of a merge request, and print the differences between the results at '
+                 'that revision and now.',
+            metavar='BASE_REV',
+            type=str,
+            default=None
+        )
+
+        parser.add_argument(
+            '--profile',
+            help='Print the scheduling order and the timing of each module to stderr after the scan.',
+            default=False,
+            action='store_true'
+        )
+
         subparsers = parser.add_subparsers(dest="command")
         info_parser = subparsers.add_parser('info', help='Diagnostic information about the tool and environment')
+        serve_parser = subparsers.add_parser(
+            'serve',
+            help='Run the scout daemon. While it runs, drupal-scout forwards its invocations to it and reuses '
+                 'its pooled connections and cached metadata.'
+        )
+        serve_parser.add_argument(
+            '--socket',
+            help='The Unix socket to listen on. Default: a per-user socket in $XDG_RUNTIME_DIR or the temp directory.',
+            type=str,
+            default=None
+        )
+        serve_parser.add_argument(
+            '--hedge',
+            help='Send hedged requests for the scans of all clients, see the --hedge option of the scan.',
+            default=False,
+            action='store_true'
+        )
+        serve_parser.add_argument(
+            '--cache-ttl',
+            help='The number of seconds the daemon keeps module metadata. Default: 900.',
+            type=float,
+            default=900
+        )
+        matrix_parser = subparsers.add_parser(
+            'matrix',
+            help='For each module of the projects, the release lines that support each Drupal core minor version '
+                 'from 8.8 through 11.x. Each module is fetched once.'
+        )
+        matrix_parser.add_argument(
+            '-p',
+            '--projects',
+            help='The Drupal project directories. Default: --directory.',
+            type=str,
+            nargs='+',
+            default=None
+        )
+        matrix_parser.add_argument(
+            '--cores',
+            help='The core versions to evaluate. Default: every minor version from 8.8 through 11.x.',
+            type=str,
+            nargs='+',
+            default=None
+        )
+        matrix_parser.add_argument(
+            '--csv',
+            help='Export the matrix to this CSV file: a row per module and a column per core version.',
+            type=str,
+            default=None
+        )
+        matrix_parser.add_argument(
+            '--sqlite',
+            help='Export the matrix to this SQLite database, in the "modules" and "support" tables.',
+            type=str,
+            default=None
+        )
+        cache_parser = subparsers.add_parser('cache', help='Manage the metadata cache of the scout daemon')
+        cache_subparsers = cache_parser.add_subparsers(dest="cache_command", required=True)
+        warm_parser = cache_subparsers.add_parser(
+            'warm',
+            help='Refresh the cached module metadata in the background. Covers the modules of the given '
+                 'projects, or the most recently scanned modules.'
+        )
+        warm_parser.add_argument(
+            '-p',
+            '--projects',
+            help='The Drupal project directories whose modules are kept warm.',
+            type=str,
+            nargs='+',
+            default=None
+        )
+        warm_parser.add_argument(
+            '--rate',
+            help='The number of metadata requests started per second. Default: 2.',
+            type=float,
+            default=DEFAULT_RATE
+        )
+        warm_parser.add_argument(
+            '--interval',
+            help='Repeat the refresh every INTERVAL seconds until the daemon stops. Default: refresh once.',
+            type=float,
+            default=None
+        )
 
         return parser
 
@@ -292,24 +851,12 @@ class Application:
         composer_json_str = "DETECTED" if os.path.isfile(os.path.join(args.directory, "composer.json")) else "NOT DETECTED"
         composer_lock_str = "DETECTED" if os.path.isfile(os.path.join(args.directory, "composer.lock")) else "NOT DETECTED"
         
-        composer2_status_str = "DETECTED" if self.is_composer2(args) else "NOT DETECTED"
+        composer2_status_str = "DETECTED" if self.scanner.is_composer2(args.directory) else "NOT DETECTED"
         
         core_version = "[Unknown]"
         if composer_json_str == "DETECTED":
-            try:
-                if composer_lock_str == "DETECTED":
-                    args_mock = type('Args', (object,), {"no_lock": False, "directory": args.directory})()
-                else:
-                    args_mock = type('Args', (object,), {"no_lock": True, "directory": args.directory})()
-                
-                # Use contextlib for cleaner stream suppression
-                import contextlib, io
-                with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
-                    self.determine_drupal_core_version(args_mock)
-                    # Use public property to avoid __ direct access if possible
-                    core_version = self.drupal_core_version
-            except Exception:
-                pass
+            # composer.lock is preferred when it exists
+            core_version = self.scanner.detect_drupal_core_version(args.directory) or core_version
 
         status_data = {
             "Version": f"{version} (verified from metadata)",
@@ -321,6 +868,102 @@ class Application:
         }
         self.output.render_info_table(f"Drupal Scout v{version} Status", status_data)
 
+    async def handle_matrix(self, args):
+        """
+        Handle the 'matrix' subcommand: for each module of the projects, find the release lines that support
+        each core minor version, print them and export them to CSV or SQLite.
+        """
+        projects = {}
+        for directory in args.projects or [args.directory]:
+            composer_json_path = os.path.join(directory, "composer.json")
+            if not os.path.isfile(composer_json_path):
+                logger.warning("%s does not contain a composer.json file; skipping it.", directory)
+                continue
+            requirements = self.scanner.module_requirements(directory, use_lock=not args.no_lock)
+            projects[directory] = {name: installed_version for name, (_, installed_version) in requirements.items()}
+        if not projects:
+            logger.error("No Drupal project to build the matrix for.")
+            exit(1)
+
+        # each module is fetched once for the whole fleet
+        semaphore = asyncio.Semaphore(args.limit if args.limit >= 1 else (os.cpu_count() or 4))
+        releases = await fetch_releases(
+            (name for modules in projects.values() for name in modules), self.fetcher, semaphore
+        )
+        cores = args.cores or list(DEFAULT_CORE_MINORS)
+        rows = CoreSupportMatrix(releases, cores).rows(projects)
+
+        if args.csv:
+            write_csv(rows, cores, args.csv)
+            logger.warning("The matrix was written to %s.", args.csv)
+        if args.sqlite:
+            write_sqlite(rows, args.sqlite)
+            logger.warning("The matrix was written to %s.", args.sqlite)
+        if args.format == "json":
+            self.output.print(codec.dumps(rows, indent=True))
+        else:
+            self.print_matrix(rows, cores, show_project=len(projects) > 1)
+
+    def print_matrix(self, rows: list[dict], cores: list[str], show_project: bool = False) -> None:
+        """
+        Print the release lines of each module that support each core version.
+        :param rows:            the rows of the matrix, see CoreSupportMatrix.rows()
+        :type  rows:            list
+        :param cores:           the core versions
+        :type  cores:           list
+        :param show_project:    whether to add the project column, for several projects
+        :type  show_project:    bool
+        """
+        from rich.table import Table
+
+        table = Table(title="Release lines supporting each Drupal core version", show_lines=True)
+        if show_project:
+            table.add_column("Project", style="grey70")
+        table.add_column("Module", style="cyan", no_wrap=True)
+        table.add_column("Installed", style="green")
+        for core in cores:
+            table.add_column(core)
+        for row in rows:
+            if row["status"] != STATUS_OK:
+                cells = ["[red]{}[/red]".format(row["status"])] * len(cores)
+            else:
+                cells = ["\n".join(row["cores"][core]) or "[dim]-[/dim]" for core in cores]
+            project = [row["project"]] if show_project else []
+            table.add_row(*project, row["module"], row["installed_version"] or "[dim]N/A[/dim]", *cells)
+        self.output.print(table)
+
+    def handle_cache(self, args):
+        """
+        Handle the 'cache warm' subcommand: schedule the cache warmer of the scout daemon.
+        """
+        if self.warmer is None:
+            logger.error("The metadata cache lives in the scout daemon. Start it with 'drupal-scout serve' first.")
+            exit(1)
+        if args.rate <= 0:
+            logger.error("The rate must be positive.")
+            exit(1)
+        if args.interval is not None and args.interval <= 0:
+            logger.error("The interval must be positive.")
+            exit(1)
+        self.warmer.schedule(args.projects, rate=args.rate, interval=args.interval)
+        target = "the modules of {} project(s)".format(len(args.projects)) if args.projects \
+            else "{} recently scanned module(s)".format(len(self.warmer.recent))
+        repeat = " every {:g} seconds".format(args.interval) if args.interval else ""
+        self.output.print("Warming the metadata cache for {} at {:g} requests/s{}.".format(target, args.rate, repeat))
+
+    async def handle_serve(self, args):
+        """
+        Handle the 'serve' subcommand: run the scout daemon until interrupted.
+        """
+        from .daemon import ScoutDaemon
+
+        daemon = ScoutDaemon(cache_ttl=args.cache_ttl, hedge=args.hedge)
+        try:
+            await daemon.serve(socket_path=args.socket)
+        except RuntimeError as e:
+            logger.error(str(e))
+            exit(1)
+
     def is_composer2(self, args):
         """
         Check if the Drupal project uses Composer 2.
@@ -329,12 +972,7 @@ class Application:
         :return:        True if the Drupal project uses Composer 2, False otherwise
         :rtype:         bool
         """
-        # check whether the vendor directory exists and has a composer/platform_check.php file
-        # because this clue is only available in Composer 2
-        if os.path.isdir(os.path.join(args.directory, "vendor")):
-            if os.path.isfile(os.path.join(args.directory, "vendor", "composer", "platform_check.php")):
-                return True
-        return False
+        return self.scanner.is_composer2(args.directory)
 
     def determine_drupal_core_version(self, args):
         """
@@ -342,25 +980,9 @@ class Application:
         :param args:    the arguments passed to the application
         :type args:     argparse.Namespace
         """
-        # default Drupal core version
-        if not args.no_lock:
-            with open(os.path.join(args.directory, "composer.lock"), "r") as f:
-                composer_lock = json.load(f)
-                self.__drupal_core_version = jq.compile(".packages[] | select(.name == \"drupal/core\") | .version") \
-                    .input(composer_lock).first()
-        else:
-            with open(os.path.join(args.directory, "composer.json"), "r") as f:
-                composer_json = json.load(f)
-                # Drupal core version can be represented by "drupal/core" requirement
-                # or within the "drupal/core-recommended" requirement
-                if "drupal/core" in composer_json["require"]:
-                    # clear special characters from the version
-                    self.__drupal_core_version = composer_json["require"]["drupal/core"] \
-                        .replace("^", "").replace("~", "")
-                elif "drupal/core-recommended" in composer_json["require"]:
-                    # clear special characters from the version
-                    self.__drupal_core_version = composer_json["require"]["drupal/core-recommended"] \
-                        .replace("^", "").replace("~", "")
+        core_version = self.scanner.drupal_core_version(args.directory, use_lock=not args.no_lock)
+        if core_version:
+            self.__drupal_core_version = core_version
         logger.warning("The Drupal core version is: " + self.__drupal_core_version)
 
     def get_required_modules(self, args):
@@ -368,42 +990,20 @@ class Application:
         Get the list of required modules from the composer.json file.
         :param args:    the arguments passed to the application
         :type args:     argparse.Namespace
-        :return:        the list of required modules
-        :rtype:         list
         """
-        with open(os.path.join(args.directory, "composer.json"), "r") as f:
-            composer_json = json.load(f)
-            # load required modules, but only with drupal/* prefix and exclude modules with drupal/core prefix
-            found_modules = jq.compile(".require | keys | map(select(startswith(\"drupal/\"))) | map(select("
-                                       "startswith(\"drupal/core\") | not))").input(composer_json).first()
-            for module in found_modules:
-                self.__modules[module] = Module(module)
+        self.__modules.update(self.scanner.required_modules(args.directory))
 
     def determine_module_versions(self, args):
         """
         Get the versions of the required modules described in the "composer.lock" file.
         :param args:      the arguments passed to the application
-        :return:          the list of required modules with their versions
-        :rtype:           list
+        :type args:       argparse.Namespace
         """
         if len(self.__modules) == 0:
             logger.warning("No modules to check.")
             exit(0)
 
-        with open(os.path.join(args.directory, "composer.lock"), "r") as f:
-            composer_lock = json.load(f)
-            for module_name in self.__modules.keys():
-                module = self.__modules.get(module_name)
-                if module is None:
-                    continue
-                # look for the module with name in the packages array
-                module_version = None
-                try:
-                    module_version = jq.compile(
-                        ".packages | map(select(.name == \"{}\")) | .[].version".format(module.name)) \
-                        .input(composer_lock).first()
-                except StopIteration:
-                    module_version = None
-                # save the module name and version in the versioned_modules array
-                module.version = module_version
-                self.__modules[module.name] = module
+        # one pass over the packages array serves the lookups of all modules
+        versions = self.scanner.installed_versions(args.directory)
+        for module in self.__modules.values():
+            module.version = versions.get(module.name)
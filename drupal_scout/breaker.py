@@ -0,0 +1,102 @@
+import logging
+import threading
+import time
+
+from .exceptions import CircuitOpenException
+
+logger = logging.getLogger(__name__)
+
+# states of the circuit breaker
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """
+    Stops the requests to a failing upstream.
+    After `threshold` consecutive failed requests the circuit opens, and requests fail at once instead of
+    going through their retries. Every `probe_interval` seconds one request is let through as a probe:
+    its success closes the circuit again, its failure keeps it open for another interval.
+    """
+
+    def __init__(self, threshold: int = 5, probe_interval: float = 10.0):
+        """
+        Initialize the circuit breaker.
+        :param threshold:       the number of consecutive failures that open the circuit
+        :type threshold:        int
+        :param probe_interval:  the number of seconds between two probe requests while the circuit is open
+        :type probe_interval:   float
+        """
+        if threshold < 1:
+            raise ValueError("The circuit breaker threshold must be at least 1.")
+        self.threshold = threshold
+        self.probe_interval = probe_interval
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        # the number of times the circuit opened, and of the requests it rejected
+        self.opened = 0
+        self.rejected = 0
+        self.__next_probe_at = 0.0
+        self.__lock = threading.Lock()
+
+    def before_request(self) -> None:
+        """
+        Check whether a request may be sent; while the circuit is open, only the periodic probe is.
+        :raises:    CircuitOpenException if the request must not be sent
+        """
+        with self.__lock:
+            if self.state == STATE_CLOSED:
+                return
+            now = time.monotonic()
+            # a probe that never reports back, e.g. when cancelled, is replaced after an interval
+            if now >= self.__next_probe_at:
+                self.state = STATE_HALF_OPEN
+                self.__next_probe_at = now + self.probe_interval
+                logger.info("Probing the metadata upstream after %d consecutive failures.", self.consecutive_failures)
+                return
+            self.rejected += 1
+        raise CircuitOpenException(
+            "The metadata upstream failed {} times in a row; the request was not sent.".format(
+                self.consecutive_failures)
+        )
+
+    def record_success(self) -> None:
+        """
+        Record a request that got a response; a successful probe closes the circuit.
+        """
+        with self.__lock:
+            if self.state != STATE_CLOSED:
+                logger.warning("The metadata upstream recovered; resuming the requests.")
+            self.state = STATE_CLOSED
+            self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        """
+        Record a failed request; the circuit opens at the threshold, or again after a failed probe.
+        """
+        with self.__lock:
+            self.consecutive_failures += 1
+            if self.state == STATE_HALF_OPEN or (
+                    self.state == STATE_CLOSED and self.consecutive_failures >= self.threshold):
+                if self.state == STATE_CLOSED:
+                    self.opened += 1
+                    logger.warning(
+                        "The metadata upstream failed %d times in a row; failing the remaining requests fast "
+                        "and probing every %gs.", self.consecutive_failures, self.probe_interval
+                    )
+                self.state = STATE_OPEN
+                self.__next_probe_at = time.monotonic() + self.probe_interval
+
+    def stats(self) -> dict:
+        """
+        Get the statistics of the circuit breaker.
+        :return:    the state, the consecutive failures, and how often the circuit opened and rejected requests
+        :rtype:     dict
+        """
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,87 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LRUCache:
+    """
+    A size-bounded least-recently-used cache with an optional time-to-live.
+    Lookups through get() are counted as hits and misses.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float | None = None):
+        """
+        Initialize the cache.
+        :param max_size:    the maximum number of entries; the least recently used one is evicted first
+        :type max_size:     int
+        :param ttl:         the number of seconds an entry stays valid, or None to keep it until evicted
+        :type ttl:          float | None
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Get the cached value and mark it as recently used.
+        :param key:         the cache key
+        :param default:     the value returned on a miss or an expired entry
+        :return:            the cached value or the default
+        """
+        item = self.__entries.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+        stored_at, value = item
+        if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+            del self.__entries[key]
+            self.misses += 1
+            return default
+        self.__entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store the value, evicting the least recently used entries beyond max_size.
+        :param key:     the cache key
+        :param value:   the value to store
+        """
+        self.__entries[key] = (time.monotonic(), value)
+        self.__entries.move_to_end(key)
+        while len(self.__entries) > self.max_size:
+            self.__entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        item = self.__entries.pop(key, None)
+        return default if item is None else item[1]
+
+    def clear(self) -> None:
+        self.__entries.clear()
+
+    def stats(self) -> dict:
+        """
+        The usage statistics of the cache.
+        :return:    the number of entries, hits, misses and evictions, and the hit rate
+        :rtype:     dict
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.__entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __contains__(self, key: Hashable) -> bool:
+        item = self.__entries.get(key)
+        return item is not None and (self.ttl is None or time.monotonic() - item[0] <= self.ttl)
+
+    def __len__(self) -> int:
+        return len(self.__entries)
@@ -0,0 +1,144 @@
+"""
+Thin client of the scout daemon (``drupal-scout serve``).
+
+Only the standard library is imported here, so forwarding a command to a running daemon
+costs little more than starting the interpreter.
+"""
+
+import http.client
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+
+# "unix:/path/to/socket"; defaults to the per-user Unix socket
+DAEMON_ENV = "DRUPAL_SCOUT_DAEMON"
+# set to any non-empty value to always run locally
+NO_DAEMON_ENV = "DRUPAL_SCOUT_NO_DAEMON"
+# commands, and options that keep the process running, that must never be forwarded
+LOCAL_COMMANDS = frozenset(["serve", "--watch"])
+
+_CONNECT_TIMEOUT = 1
+# the number of seconds to wait for the answer of the daemon to a scan without a deadline
+_READ_TIMEOUT = 600
+# the number of seconds the daemon may take beyond the deadline of the scan, e.g. to resolve and render
+_DEADLINE_MARGIN = 30
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix domain socket."""
+
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self._path = path
+
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self._path)
+        self.sock = sock
+
+
+def default_socket_path() -> str:
+    """
+    The default Unix socket of the daemon, private to the current user.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+    return os.path.join(runtime_dir, "drupal-scout-{}.sock".format(user))
+
+
+def daemon_address() -> str:
+    """
+    The address of the daemon, "unix:<path>".
+    """
+    return os.environ.get(DAEMON_ENV) or "unix:" + default_socket_path()
+
+
+def _read_timeout(argv: list[str]) -> float:
+    """
+    The number of seconds to wait for the daemon to run the invocation: the --deadline of the scan
+    plus a margin, or a default for scans without a deadline.
+    :param argv:    the command line arguments, without the program name
+    """
+    for index, arg in enumerate(argv):
+        if arg == "--deadline" and index + 1 < len(argv):
+            value = argv[index + 1]
+        elif arg.startswith("--deadline="):
+            value = arg[len("--deadline="):]
+        else:
+            continue
+        try:
+            return float(value) + _DEADLINE_MARGIN
+        except ValueError:
+            break
+    return _READ_TIMEOUT
+
+
+def _connect(address: str, timeout: float) -> http.client.HTTPConnection:
+    connection = _UnixHTTPConnection(address[len("unix:"):], _CONNECT_TIMEOUT)
+    connection.connect()
+    # scans may take a while once connected, but a stuck daemon must not hang the client
+    assert connection.sock is not None
+    connection.sock.settimeout(timeout)
+    return connection
+
+
+def request(path: str, payload: dict, address: str | None = None, timeout: float = _READ_TIMEOUT) -> dict | None:
+    """
+    Send a JSON request to the daemon.
+    :param path:        the endpoint, e.g. "/run"
+    :param payload:     the JSON body
+    :param address:     the daemon address, defaults to daemon_address()
+    :param timeout:     the number of seconds to wait for the response once connected
+    :return:            the JSON response, or None if no daemon is reachable
+    :raises:            TimeoutError if the daemon accepted the request but did not answer in time
+    """
+    address = address or daemon_address()
+    # the daemon only listens on a Unix socket
+    if not address.startswith("unix:") or not os.path.exists(address[len("unix:"):]):
+        return None
+    try:
+        connection = _connect(address, timeout)
+    except OSError:
+        return None
+    try:
+        connection.request("POST", path, body=json.dumps(payload), headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        if response.status != 200:
+            return None
+        return json.loads(response.read())
+    except TimeoutError:
+        raise
+    except (OSError, http.client.HTTPException, ValueError):
+        return None
+    finally:
+        connection.close()
+
+
+def forward(argv: list[str]) -> int | None:
+    """
+    Forward a CLI invocation to the running daemon and replay its output.
+    :param argv:    the command line arguments, without the program name
+    :return:        the exit code of the command, or None if it must run locally
+    """
+    if os.environ.get(NO_DAEMON_ENV) or LOCAL_COMMANDS.intersection(argv):
+        return None
+    timeout = _read_timeout(argv)
+    try:
+        result = request("/run", {
+            "argv": argv,
+            "cwd": os.getcwd(),
+            "terminal": sys.stdout.isatty(),
+            "width": shutil.get_terminal_size().columns,
+        }, timeout=timeout)
+    except TimeoutError:
+        sys.stderr.write("The scout daemon did not answer within {:g} seconds; running locally.\n".format(timeout))
+        return None
+    if result is None:
+        return None
+    sys.stdout.write(result.get("stdout", ""))
+    sys.stderr.write(result.get("stderr", ""))
+    return int(result.get("exit_code", 0))
@@ -0,0 +1,106 @@
+"""
+The JSON codec used for project files, metadata payloads and output.
+
+orjson or msgspec is used when installed (``pip install drupal-scout[speedups]``), the standard
+library otherwise. Set ``DRUPAL_SCOUT_JSON`` to ``orjson``, ``msgspec`` or ``json`` to pick one.
+"""
+
+import json
+import os
+import re
+from typing import Any
+
+# environment variable forcing a backend
+BACKEND_ENV = "DRUPAL_SCOUT_JSON"
+BACKENDS = ("orjson", "msgspec", "json")
+
+# pretty output is indented with four spaces, like Composer writes composer.json
+_INDENT = 4
+_LEADING_SPACES = re.compile(r"^( +)", re.MULTILINE)
+
+
+def _select_backend() -> str:
+    requested = os.environ.get(BACKEND_ENV)
+    for name in ([requested] if requested in BACKENDS else BACKENDS):
+        if name == "json":
+            return name
+        try:
+            __import__(name)
+            return name
+        except ImportError:
+            continue
+    return "json"
+
+
+BACKEND = _select_backend()
+
+if BACKEND == "orjson":
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj: Any, indent: bool) -> str:
+        if not indent:
+            return orjson.dumps(obj).decode()
+        # orjson only indents with two spaces; JSON strings cannot span lines, so every leading run
+        # of spaces is indentation and can be doubled
+        pretty = orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+        return _LEADING_SPACES.sub(lambda match: match.group(1) * 2, pretty)
+
+elif BACKEND == "msgspec":
+    import msgspec
+
+    _encoder = msgspec.json.Encoder()
+    _decoder = msgspec.json.Decoder()
+
+    def _loads(data: bytes | str) -> Any:
+        try:
+            return _decoder.decode(data)
+        except msgspec.DecodeError as exc:
+            # callers handle the decoding errors of the standard library
+            raise json.JSONDecodeError(str(exc), "", 0) from exc
+
+    def _dumps(obj: Any, indent: bool) -> str:
+        encoded = _encoder.encode(obj)
+        if indent:
+            encoded = msgspec.json.format(encoded, indent=_INDENT)
+        return encoded.decode()
+
+else:
+    _loads = json.loads
+
+    def _dumps(obj: Any, indent: bool) -> str:
+        if indent:
+            return json.dumps(obj, indent=_INDENT)
+        return json.dumps(obj, separators=(",", ":"))
+
+
+def loads(data: bytes | str) -> Any:
+    """
+    Parse a JSON document.
+    :param data:    the JSON document
+    :return:        the parsed value
+    :raises:        json.JSONDecodeError on invalid JSON
+    """
+    return _loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """
+    Serialize a value to JSON.
+    :param obj:     the value
+    :param indent:  whether to indent the output with four spaces
+    :return:        the JSON document
+    """
+    return _dumps(obj, indent)
+
+
+def load_file(path: str) -> Any:
+    """
+    Read and parse a JSON file.
+    :param path:    the path to the file
+    :return:        the parsed contents
+    :raises:        FileNotFoundError, json.JSONDecodeError
+    """
+    with open(path, "rb") as f:
+        return loads(f.read())
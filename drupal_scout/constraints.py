@@ -0,0 +1,290 @@
+"""
+Composer version constraint parsing.
+
+Composer requirement strings (``^9.4 || ^10``, ``>=10.2 <11``, ``10.x``, ``1.0 - 2.0``, ...)
+are compiled into a :class:`VersionSet`, a normalized union of version intervals that supports
+O(log n) containment checks, union and intersection.
+"""
+
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Iterable
+
+from .exceptions import InvalidConstraintException
+
+# Stability ranks, ordered the same way Composer orders them.
+_STABILITY_RANKS = {
+    'dev': 0,
+    'alpha': 1, 'a': 1,
+    'beta': 2, 'b': 2,
+    'rc': 3,
+    'stable': 4,
+    'patch': 5, 'pl': 5, 'p': 5,
+}
+_STABLE = _STABILITY_RANKS['stable']
+
+# Sentinel keys that sort before and after every real version key.
+_MIN_KEY: tuple = (-1,)
+_MAX_KEY: tuple = (float('inf'),)
+
+_VERSION_RE = re.compile(
+    r'^v?(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:\.(\d+))?'
+    r'(?:[-.]?(dev|alpha|a|beta|b|rc|stable|patch|pl|p)(?:[.-]?(\d+))?)?'
+    r'(?:\+[0-9a-z.-]*)?$',
+    re.IGNORECASE
+)
+_WILDCARD_RE = re.compile(r'^v?(\d+)(?:\.(\d+|[x*]))?(?:\.(\d+|[x*]))?(?:\.(\d+|[x*]))?$', re.IGNORECASE)
+_OPERATOR_RE = re.compile(r'^(>=|<=|<>|!=|==|=|>|<|\^|~)?(.+)$')
+_HYPHEN_RE = re.compile(r'^(\S+)\s+-\s+(\S+)$')
+_STABILITY_FLAG_RE = re.compile(r'@(dev|alpha|beta|rc|stable)$', re.IGNORECASE)
+
+
+class VersionSet:
+    """
+    A normalized union of version intervals.
+    Each interval is a tuple ``(low, low_inclusive, high, high_inclusive)`` of version keys
+    as produced by :func:`parse_version`. Intervals are kept sorted and disjoint.
+    """
+
+    __slots__ = ('intervals', '_lows')
+
+    def __init__(self, intervals: Iterable[tuple] = ()):
+        """
+        Initialize the set.
+        :param intervals:   the intervals to normalize into the set
+        :type intervals:    Iterable[tuple]
+        """
+        self.intervals: tuple = _normalize(intervals)
+        self._lows = [interval[0] for interval in self.intervals]
+
+    @classmethod
+    def any(cls) -> 'VersionSet':
+        """
+        The set containing every version.
+        """
+        return cls([(_MIN_KEY, True, _MAX_KEY, True)])
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.intervals
+
+    def contains(self, version: str | tuple) -> bool:
+        """
+        Check whether the version belongs to the set.
+        :param version:     the version string or version key
+        :type version:      str | tuple
+        :return:            True if the version is inside one of the intervals
+        :rtype:             bool
+        """
+        key = parse_version(version) if isinstance(version, str) else version
+        index = bisect_right(self._lows, key) - 1
+        if index < 0:
+            return False
+        low, low_inclusive, high, high_inclusive = self.intervals[index]
+        if key == low and not low_inclusive:
+            return False
+        return key < high or (key == high and high_inclusive)
+
+    def union(self, other: 'VersionSet') -> 'VersionSet':
+        return VersionSet(self.intervals + other.intervals)
+
+    def intersection(self, other: 'VersionSet') -> 'VersionSet':
+        result = []
+        i = j = 0
+        while i < len(self.intervals) and j < len(other.intervals):
+            a, b = self.intervals[i], other.intervals[j]
+            low, low_inclusive = max((a[0], not a[1]), (b[0], not b[1]))
+            high, high_inclusive = min((a[2], a[3]), (b[2], b[3]))
+            result.append((low, not low_inclusive, high, high_inclusive))
+            # advance the interval that ends first
+            if (a[2], a[3]) < (b[2], b[3]):
+                i += 1
+            else:
+                j += 1
+        return VersionSet(result)
+
+    __contains__ = contains
+    __or__ = union
+    __and__ = intersection
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, VersionSet) and self.intervals == other.intervals
+
+    def __hash__(self) -> int:
+        return hash(self.intervals)
+
+    def __repr__(self) -> str:
+        return "VersionSet({!r})".format(self.intervals)
+
+
+def _is_empty_interval(interval: tuple) -> bool:
+    low, low_inclusive, high, high_inclusive = interval
+    return low > high or (low == high and not (low_inclusive and high_inclusive))
+
+
+def _normalize(intervals: Iterable[tuple]) -> tuple:
+    """
+    Sort the intervals and merge the overlapping or adjacent ones.
+    """
+    ordered = sorted(
+        (interval for interval in intervals if not _is_empty_interval(interval)),
+        key=lambda interval: (interval[0], not interval[1])
+    )
+    merged: list[list] = []
+    for low, low_inclusive, high, high_inclusive in ordered:
+        if merged:
+            last = merged[-1]
+            if low < last[2] or (low == last[2] and (low_inclusive or last[3])):
+                if high > last[2] or (high == last[2] and high_inclusive):
+                    last[2], last[3] = high, high_inclusive
+                continue
+        merged.append([low, low_inclusive, high, high_inclusive])
+    return tuple(tuple(interval) for interval in merged)
+
+
+@lru_cache(maxsize=4096)
+def _parse_version(text: str) -> tuple[tuple, int]:
+    """
+    Parse a version string into a comparable key and the number of numeric components given.
+    """
+    match = _VERSION_RE.match(text.strip())
+    if match is None:
+        raise InvalidConstraintException("Invalid version string: {!r}".format(text))
+    numbers = [int(part) for part in match.group(1, 2, 3, 4) if part is not None]
+    precision = len(numbers)
+    numbers += [0] * (4 - precision)
+    stability = _STABILITY_RANKS[match.group(5).lower()] if match.group(5) else _STABLE
+    stability_number = int(match.group(6)) if match.group(6) else 0
+    return (*numbers, stability, stability_number), precision
+
+
+def parse_version(text: str) -> tuple:
+    """
+    Parse a version string into a comparable key.
+    :param text:    the version string, e.g. "10.2.0" or "11.0.0-rc1"
+    :type text:     str
+    :return:        the version key
+    :rtype:         tuple
+    :raises:        InvalidConstraintException if the version cannot be parsed
+    """
+    return _parse_version(text)[0]
+
+
+def _lowest(numbers: Iterable[int]) -> tuple:
+    """
+    The lowest possible key for the numeric version, i.e. its "-dev" pre-release.
+    """
+    numbers = list(numbers)
+    return (*numbers, *[0] * (4 - len(numbers)), 0, 0)
+
+
+def _bump(key: tuple, position: int) -> tuple:
+    """
+    The lowest key of the next version at the given numeric position.
+    """
+    numbers = list(key[:4])
+    numbers[position] += 1
+    return _lowest(numbers[:position + 1])
+
+
+def _is_stable_release(key: tuple) -> bool:
+    return key[4] == _STABLE and key[5] == 0
+
+
+def _parse_atom(atom: str) -> VersionSet:
+    """
+    Parse a single constraint without logical operators, e.g. "^10.2" or ">=9.5".
+    """
+    if atom in ('*', 'x', 'X', '*.*', 'x.x'):
+        return VersionSet.any()
+    if atom.lower().startswith('dev-'):
+        # branch constraints never match a numbered release
+        return VersionSet()
+    if atom.lower().endswith('.x-dev'):
+        atom = atom[:-4]
+
+    wildcard = _WILDCARD_RE.match(atom)
+    if wildcard and any(part is not None and not part.isdigit() for part in wildcard.groups()):
+        numbers = []
+        for part in wildcard.groups():
+            if part is None or not part.isdigit():
+                break
+            numbers.append(int(part))
+        low = _lowest(numbers)
+        return VersionSet([(low, True, _bump(low, len(numbers) - 1), False)])
+
+    match = _OPERATOR_RE.match(atom)
+    assert match is not None
+    operator, text = match.group(1) or '=', match.group(2)
+    key, precision = _parse_version(text)
+    # like Composer, open lower bounds start at the "-dev" pre-release of stable versions
+    low = _lowest(key[:4]) if _is_stable_release(key) else key
+
+    if operator == '^':
+        position = 0
+        if key[0] == 0 and precision > 1:
+            position = 1 if key[1] != 0 or precision == 2 else 2
+        return VersionSet([(low, True, _bump(key, position), False)])
+    if operator == '~':
+        position = max(precision - 2, 0)
+        return VersionSet([(low, True, _bump(key, position), False)])
+    if operator == '>=':
+        return VersionSet([(low, True, _MAX_KEY, True)])
+    if operator == '>':
+        return VersionSet([(key, False, _MAX_KEY, True)])
+    if operator == '<':
+        return VersionSet([(_MIN_KEY, True, low, False)])
+    if operator == '<=':
+        return VersionSet([(_MIN_KEY, True, key, True)])
+    if operator in ('!=', '<>'):
+        return VersionSet([(_MIN_KEY, True, key, False), (key, False, _MAX_KEY, True)])
+    return VersionSet([(key, True, key, True)])
+
+
+def _parse_hyphen_range(low_text: str, high_text: str) -> VersionSet:
+    """
+    Parse a hyphen range, e.g. "1.0 - 2.0". A partial upper bound acts as a wildcard.
+    """
+    low_key, _ = _parse_version(low_text)
+    high_key, precision = _parse_version(high_text)
+    low = _lowest(low_key[:4]) if _is_stable_release(low_key) else low_key
+    if precision < 3 and _is_stable_release(high_key):
+        return VersionSet([(low, True, _bump(high_key, precision - 1), False)])
+    return VersionSet([(low, True, high_key, True)])
+
+
+@lru_cache(maxsize=4096)
+def parse_constraint(constraint: str) -> VersionSet:
+    """
+    Compile a Composer constraint string into a version set.
+    Supports "||"/"|" alternatives, comma or space separated conjunctions, caret, tilde,
+    comparison operators, wildcards, hyphen ranges and stability flags.
+    :param constraint:  the Composer constraint, e.g. "^9.4 || ^10"
+    :type constraint:   str
+    :return:            the compiled version set
+    :rtype:             VersionSet
+    :raises:            InvalidConstraintException if the constraint cannot be parsed
+    """
+    result = VersionSet()
+    alternatives = [part.strip() for part in re.split(r'\|\|?', constraint)]
+    if not any(alternatives):
+        raise InvalidConstraintException("Empty version constraint: {!r}".format(constraint))
+    for alternative in alternatives:
+        if not alternative:
+            raise InvalidConstraintException("Invalid version constraint: {!r}".format(constraint))
+        hyphen = _HYPHEN_RE.match(alternative)
+        if hyphen:
+            result = result | _parse_hyphen_range(*hyphen.groups())
+            continue
+        # glue operators to their versions (">= 9.5" -> ">=9.5") and drop inline aliases
+        alternative = re.sub(r'(?<=[<>=!~^])\s+', '', alternative)
+        alternative = re.sub(r'\s+as\s+\S+$', '', alternative)
+        conjunction = VersionSet.any()
+        for atom in re.split(r'\s*,\s*|\s+', alternative):
+            atom = _STABILITY_FLAG_RE.sub('', atom)
+            if not atom:
+                continue
+            conjunction = conjunction & _parse_atom(atom)
+        result = result | conjunction
+    return result
@@ -0,0 +1,211 @@
+"""
+The core compatibility matrix: which release lines of each module support which Drupal core minor version.
+
+Every release of every module is evaluated against every core minor version in one CompatibilityMatrix,
+then a single sweep over the releases of each module, newest first, keeps the newest release of each
+release line per core minor version.
+"""
+
+import asyncio
+import csv
+import sqlite3
+from typing import Iterable, Sequence
+
+import aiohttp
+from packaging import version
+
+from .evaluation import CompatibilityMatrix, requirement_set
+from .exceptions import ModuleNotFoundException
+from .fetcher import MetadataFetcher
+
+# the Drupal core minor versions from 8.8 through 11.x
+DEFAULT_CORE_MINORS = (
+    "8.8", "8.9",
+    "9.0", "9.1", "9.2", "9.3", "9.4", "9.5",
+    "10.0", "10.1", "10.2", "10.3", "10.4", "10.5", "10.6",
+    "11.0", "11.1", "11.2", "11.3", "11.4",
+)
+
+# the status of a module in the matrix
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_INACTIVE = "inactive"
+
+
+def release_line(release: version.Version) -> str:
+    """
+    Get the release line of a release, e.g. "6.2.x" for 6.2.5.
+    :param release:     the parsed version of the release
+    :type release:      packaging.version.Version
+    :return:            the release line
+    :rtype:             str
+    """
+    return "{}.{}.x".format(release.major, release.minor)
+
+
+def core_releases(contents: dict, module_name: str) -> list[dict]:
+    """
+    Get the releases of a module that declare a drupal/core requirement, newest first.
+    Releases whose version cannot be parsed are left out.
+    :param contents:        the p2 metadata of the module
+    :type contents:         dict
+    :param module_name:     the name of the module
+    :type module_name:      str
+    :return:                the releases: version, parsed version and drupal/core constraint
+    :rtype:                 list
+    """
+    releases = []
+    for package in (contents.get("packages") or {}).get(module_name) or []:
+        constraint = (package.get("require") or {}).get("drupal/core")
+        if not constraint:
+            continue
+        try:
+            parsed = version.parse(package["version"])
+        except (version.InvalidVersion, KeyError, TypeError):
+            continue
+        releases.append({"version": package["version"], "parsed": parsed, "constraint": constraint})
+    releases.sort(key=lambda release: release["parsed"], reverse=True)
+    return releases
+
+
+async def fetch_releases(module_names: Iterable[str], fetcher: MetadataFetcher,
+                         semaphore: asyncio.Semaphore) -> dict[str, list[dict] | str]:
+    """
+    Fetch the metadata of each module once and extract its releases.
+    :param module_names:    the names of the modules
+    :type module_names:     Iterable[str]
+    :param fetcher:         the metadata fetcher
+    :type fetcher:          MetadataFetcher
+    :param semaphore:       the semaphore limiting concurrent requests
+    :type semaphore:        asyncio.Semaphore
+    :return:                the releases by module name, or STATUS_FAILED or STATUS_INACTIVE
+    :rtype:                 dict
+    """
+    releases: dict[str, list[dict] | str] = {}
+
+    async def fetch(module_name: str) -> None:
+        async with semaphore:
+            try:
+                releases[module_name] = core_releases(await fetcher.fetch(module_name), module_name)
+            except ModuleNotFoundException:
+                releases[module_name] = STATUS_INACTIVE
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                releases[module_name] = STATUS_FAILED
+
+    async with asyncio.TaskGroup() as tg:
+        for module_name in dict.fromkeys(module_names):
+            tg.create_task(fetch(module_name))
+    return releases
+
+
+class CoreSupportMatrix:
+    """
+    The release lines of the modules that support each core minor version, with the newest supporting
+    release of each line.
+    """
+
+    def __init__(self, releases: dict[str, list[dict] | str], cores: Sequence[str] = DEFAULT_CORE_MINORS):
+        """
+        Evaluate the releases of all modules against all core versions.
+        :param releases:    the releases by module name, newest first, see fetch_releases()
+        :type releases:     dict
+        :param cores:       the core versions; a minor version such as "10.3" stands for its first release
+        :type cores:        Sequence[str]
+        """
+        self.cores = list(cores)
+        self.statuses = {name: value if isinstance(value, str) else STATUS_OK for name, value in releases.items()}
+        # the requirements are compiled once, for the matrix and for the sweep
+        modules = {
+            name: [(release, requirement_set(release)) for release in value]
+            for name, value in releases.items() if not isinstance(value, str)
+        }
+        matrix = CompatibilityMatrix(
+            (requirement for module_releases in modules.values() for _, requirement in module_releases),
+            self.cores
+        )
+        # module -> core -> release line -> newest supporting release
+        self.support: dict[str, dict[str, dict[str, str]]] = {}
+        for name, module_releases in modules.items():
+            support = {core: {} for core in self.cores}
+            for release, requirement in module_releases:
+                line = release_line(release["parsed"])
+                for core, supported in zip(self.cores, matrix.row(requirement)):
+                    # the releases are sorted newest first, so the first release of a line is its newest
+                    if supported and line not in support[core]:
+                        support[core][line] = release["version"]
+            self.support[name] = support
+
+    def rows(self, projects: dict[str, dict[str, str | None]]) -> list[dict]:
+        """
+        Get a row per module of each project.
+        :param projects:    the installed version of each module, by project
+        :type projects:     dict
+        :return:            project, module, installed_version, status and, per core, the supporting
+                            release lines with their newest release
+        :rtype:             list
+        """
+        rows = []
+        for project, modules in projects.items():
+            for name, installed_version in modules.items():
+                rows.append({
+                    "project": project,
+                    "module": name,
+                    "installed_version": installed_version,
+                    "status": self.statuses.get(name, STATUS_FAILED),
+                    "cores": self.support.get(name, {core: {} for core in self.cores}),
+                })
+        return rows
+
+
+def write_csv(rows: list[dict], cores: Sequence[str], path: str) -> None:
+    """
+    Write the matrix as CSV: a row per module and a column per core version, listing the supporting release lines.
+    :param rows:    the rows, see CoreSupportMatrix.rows()
+    :type rows:     list
+    :param cores:   the core versions
+    :type cores:    Sequence[str]
+    :param path:    the path of the CSV file
+    :type path:     str
+    """
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["project", "module", "installed_version", "status", *cores])
+        for row in rows:
+            writer.writerow([
+                row["project"], row["module"], row["installed_version"] or "", row["status"],
+                *(" ".join(row["cores"][core]) for core in cores)
+            ])
+
+
+def write_sqlite(rows: list[dict], path: str) -> None:
+    """
+    Write the matrix to an SQLite database, replacing the tables of a previous export:
+    "modules" with a row per module of each project, and "support" with a row per core version
+    and supporting release line of each module.
+    :param rows:    the rows, see CoreSupportMatrix.rows()
+    :type rows:     list
+    :param path:    the path of the database
+    :type path:     str
+    """
+    connection = sqlite3.connect(path)
+    try:
+        with connection:
+            connection.executescript("""
+                DROP TABLE IF EXISTS modules;
+                DROP TABLE IF EXISTS support;
+                CREATE TABLE modules (project TEXT, module TEXT, installed_version TEXT, status TEXT,
+                                      PRIMARY KEY (project, module));
+                CREATE TABLE support (project TEXT, module TEXT, core TEXT, release_line TEXT, latest_release TEXT,
+                                      PRIMARY KEY (project, module, core, release_line));
+            """)
+            connection.executemany(
+                "INSERT INTO modules VALUES (?, ?, ?, ?)",
+                [(row["project"], row["module"], row["installed_version"], row["status"]) for row in rows]
+            )
+            connection.executemany(
+                "INSERT INTO support VALUES (?, ?, ?, ?, ?)",
+                [(row["project"], row["module"], core, line, latest)
+                 for row in rows for core, lines in row["cores"].items() for line, latest in lines.items()]
+            )
+    finally:
+        connection.close()
@@ -0,0 +1,166 @@
+import asyncio
+import contextlib
+import logging
+import os
+import socket
+
+from aiohttp import web
+
+from . import codec
+from .breaker import CircuitBreaker
+from .cache import LRUCache
+from .client import default_socket_path
+from .fetcher import MetadataFetcher
+from .hedging import HedgePolicy
+from .mirrors import EndpointPool, configured_mirrors
+from .output import CapturedOutputHandler
+from .project import ProjectFileCache
+from .retries import RetryBudget
+from .scanner import Scanner
+from .warmer import CacheWarmer
+
+logger = logging.getLogger("drupal_scout")
+
+
+class ScoutDaemon:
+    """
+    A long-running scout service for thin clients.
+    It keeps one pooled HTTP session, the parsed metadata and the parsed project files warm across scans, and runs the CLI
+    invocations it receives over a Unix socket that only its user can connect to. The invocations read and write files
+    as the daemon user, so the daemon does not listen on the network.
+    """
+
+    def __init__(self, cache_ttl: float = 900, cache_size: int = 4096, hedge: bool = False):
+        """
+        Initialize the daemon.
+        :param cache_ttl:   the number of seconds parsed metadata stays valid
+        :param cache_size:  the maximum number of cached metadata payloads and evaluation results
+        :param hedge:       duplicate slow metadata requests, see HedgePolicy
+        """
+        self.scanner = Scanner(
+            fetcher=MetadataFetcher(cache=LRUCache(max_size=cache_size, ttl=cache_ttl),
+                                    hedging=HedgePolicy() if hedge else None, breaker=CircuitBreaker(),
+                                    retry_budget=RetryBudget(), endpoints=self._endpoints()),
+            results=LRUCache(max_size=cache_size),
+        )
+        self.warmer = CacheWarmer(self.fetcher, self.project_files)
+        # the scans share the process streams, so they run one at a time
+        self.__lock = asyncio.Lock()
+
+    @property
+    def fetcher(self) -> MetadataFetcher:
+        return self.scanner.fetcher
+
+    @property
+    def results(self) -> LRUCache:
+        return self.scanner.results
+
+    @property
+    def project_files(self) -> ProjectFileCache:
+        return self.scanner.project_files
+
+    def create_app(self) -> web.Application:
+        """
+        Create the HTTP application of the daemon.
+        """
+        app = web.Application()
+        app.router.add_post("/run", self.handle_run)
+        app.router.add_get("/health", self.handle_health)
+        return app
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "status": "ok",
+            "metadata_cache": self.fetcher.cache.stats() if self.fetcher.cache is not None else None,
+            "results_cache": self.results.stats(),
+            "hedging": self.fetcher.hedging.stats() if self.fetcher.hedging is not None else None,
+            "circuit_breaker": self.fetcher.breaker.stats(),
+            "retry_budget": self.fetcher.retry_budget.stats(),
+            "endpoints": self.fetcher.endpoints.stats() if self.fetcher.endpoints is not None else None,
+        })
+
+    async def handle_run(self, request: web.Request) -> web.Response:
+        payload = await request.json(loads=codec.loads)
+        result = await self.run_command(
+            payload.get("argv", []),
+            cwd=payload.get("cwd"),
+            terminal=payload.get("terminal"),
+            width=payload.get("width"),
+        )
+        return web.json_response(result, dumps=codec.dumps)
+
+    async def run_command(self, argv: list[str], cwd: str | None = None, terminal: bool | None = None,
+                          width: int | None = None) -> dict:
+        """
+        Run a CLI invocation with the warm fetcher and capture its output.
+        :param argv:        the command line arguments, without the program name
+        :param cwd:         the working directory of the client
+        :param terminal:    whether the client renders to a terminal
+        :param width:       the terminal width of the client
+        :return:            the captured stdout and stderr, and the exit code
+        """
+        from .application import Application
+
+        output = CapturedOutputHandler(force_terminal=terminal, width=width)
+        app = Application(output_handler=output, scanner=self.scanner, warmer=self.warmer)
+        exit_code = 0
+        async with self.__lock:
+            with contextlib.redirect_stdout(output.out_stream), contextlib.redirect_stderr(output.err_stream):
+                try:
+                    await app.run(argv, cwd=cwd)
+                except SystemExit as exc:
+                    exit_code = exc.code if isinstance(exc.code, int) else int(exc.code is not None)
+                except Exception as exc:
+                    logger.error("The scout daemon failed to run the command: %s", exc)
+                    exit_code = 1
+        return {"stdout": output.stdout, "stderr": output.stderr, "exit_code": exit_code}
+
+    async def serve(self, socket_path: str | None = None) -> None:
+        """
+        Serve until cancelled.
+        :param socket_path:     the Unix socket to listen on, defaults to the per-user socket
+        """
+        runner = web.AppRunner(self.create_app())
+        await runner.setup()
+        socket_path = socket_path or default_socket_path()
+        self._remove_stale_socket(socket_path)
+        site = web.UnixSite(runner, socket_path)
+        async with self.fetcher:
+            try:
+                # the socket is created private, so other users never get a chance to connect
+                umask = os.umask(0o077)
+                try:
+                    await site.start()
+                finally:
+                    os.umask(umask)
+                os.chmod(socket_path, 0o600)
+                logger.warning("The scout daemon is listening on unix:%s", socket_path)
+                await asyncio.Event().wait()
+            finally:
+                await self.warmer.stop()
+                await runner.cleanup()
+                if os.path.exists(socket_path):
+                    os.unlink(socket_path)
+
+    @staticmethod
+    def _endpoints() -> EndpointPool | None:
+        mirrors = configured_mirrors()
+        return EndpointPool(mirrors) if mirrors else None
+
+    @staticmethod
+    def _remove_stale_socket(socket_path: str) -> None:
+        """
+        Remove a socket file left behind by a daemon that is no longer running.
+        :raises:    RuntimeError if another daemon is listening on the socket
+        """
+        if not os.path.exists(socket_path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            os.unlink(socket_path)
+        else:
+            raise RuntimeError("Another scout daemon is already listening on {}.".format(socket_path))
+        finally:
+            probe.close()
@@ -0,0 +1,193 @@
+"""
+Batch evaluation of drupal/core requirements.
+
+A scan usually sees only a few hundred distinct requirement strings, so they are compiled once,
+deduplicated and evaluated against every target core version in a single pass, producing a
+boolean matrix (requirement x target). NumPy is used when it is installed.
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import Iterable, Sequence
+
+from .constraints import VersionSet, parse_constraint, parse_version
+from .exceptions import InvalidConstraintException
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=4096)
+def compile_requirement_parts(parts: tuple[str, ...]) -> VersionSet:
+    """
+    Compile cleaned requirement parts (as stored in "requirement_parts") into a version set.
+    The caret is stripped from the parts, so a bare version such as "10" or "9.4" means "^10" or "^9.4".
+    Unparseable parts are skipped with a warning.
+    :param parts:   the requirement parts
+    :type parts:    tuple
+    :return:        the union of the parsed parts
+    :rtype:         VersionSet
+    """
+    result = VersionSet()
+    for part in parts:
+        if re.match(r'^\d+(\.\d+)*$', part):
+            part = '^' + part
+        try:
+            result = result | parse_constraint(part)
+        except InvalidConstraintException as exc:
+            logger.warning("Failed to parse requirement clause %r: %s", part, exc.message)
+    return result
+
+
+def requirement_set(entry: dict) -> VersionSet:
+    """
+    Compile the drupal/core requirement of a transitive entry into a version set.
+    The raw constraint is preferred; the cleaned requirement parts are used otherwise.
+    :param entry:   the transitive entry
+    :type entry:    dict
+    :return:        the compiled requirement
+    :rtype:         VersionSet
+    """
+    constraint = entry.get('constraint')
+    if constraint:
+        try:
+            return parse_constraint(constraint)
+        except InvalidConstraintException as exc:
+            logger.warning("Failed to parse requirement %r: %s", constraint, exc.message)
+    req_parts = entry.get('requirement_parts', [])
+    if not req_parts and 'requirement' in entry:
+        req_parts = [p.strip() for p in re.split(r'\|+', entry['requirement']) if p.strip()]
+    return compile_requirement_parts(tuple(req_parts))
+
+
+def _clean_target(target: str) -> str:
+    return target.replace("^", "").replace("~", "")
+
+
+def parse_target(target: str) -> tuple | None:
+    """
+    Parse a target core version into a version key, or None if it is not a valid version.
+    """
+    try:
+        return parse_version(_clean_target(target))
+    except InvalidConstraintException:
+        return None
+
+
+class CompatibilityMatrix:
+    """
+    A boolean matrix telling which requirement is satisfied by which target core version.
+    """
+
+    def __init__(self, requirements: Iterable[VersionSet], targets: Sequence[str]):
+        """
+        Evaluate the unique requirements against every target in one pass.
+        :param requirements:    the compiled requirements, duplicates are allowed
+        :type requirements:     Iterable[VersionSet]
+        :param targets:         the target core versions
+        :type targets:          Sequence[str]
+        """
+        self.targets = list(targets)
+        self.__columns = {_clean_target(target): index for index, target in enumerate(self.targets)}
+        self.__target_keys = [parse_target(target) for target in self.targets]
+        self.__rows: dict[VersionSet, int] = {}
+        for requirement in requirements:
+            self.__rows.setdefault(requirement, len(self.__rows))
+        if np is not None:
+            self.values = self._evaluate_vectorized(list(self.__rows), self.__target_keys)
+        else:
+            self.values = self._evaluate(list(self.__rows), self.__target_keys)
+
+    @classmethod
+    def for_modules(cls, modules: Iterable, targets: Sequence[str]) -> 'CompatibilityMatrix':
+        """
+        Build the matrix from the transitive entries of the modules.
+        :param modules:     the modules with fetched transitive entries
+        :type modules:      Iterable[Module]
+        :param targets:     the target core versions
+        :type targets:      Sequence[str]
+        :return:            the evaluated matrix
+        :rtype:             CompatibilityMatrix
+        """
+        return cls(
+            (requirement_set(entry) for module in modules for entry in module.transitive_entries),
+            targets
+        )
+
+    def __len__(self) -> int:
+        return len(self.__rows)
+
+    def row(self, requirement: VersionSet) -> list[bool]:
+        """
+        Get the evaluation row of the requirement, one value per target.
+        Requirements unknown to the matrix are evaluated on the fly.
+        """
+        index = self.__rows.get(requirement)
+        if index is None:
+            return self._evaluate([requirement], self.__target_keys)[0]
+        return [bool(value) for value in self.values[index]]
+
+    def is_satisfied(self, requirement: VersionSet, target: str) -> bool:
+        """
+        Check whether the target core version satisfies the requirement.
+        :param requirement:     the compiled requirement
+        :type requirement:      VersionSet
+        :param target:          the target core version
+        :type target:           str
+        :return:                True if the requirement is satisfied
+        :rtype:                 bool
+        """
+        column = self.__columns.get(_clean_target(target))
+        index = self.__rows.get(requirement)
+        if column is None or index is None:
+            key = parse_target(target)
+            return key is not None and key in requirement
+        return bool(self.values[index][column])
+
+    @staticmethod
+    def _evaluate(requirements: list[VersionSet], target_keys: list) -> list[list[bool]]:
+        """
+        Pure-Python evaluation: one bisect per requirement and target.
+        """
+        return [
+            [key is not None and key in requirement for key in target_keys]
+            for requirement in requirements
+        ]
+
+    @staticmethod
+    def _evaluate_vectorized(requirements: list[VersionSet], target_keys: list):
+        """
+        NumPy evaluation: version keys are rank-encoded into integers, then every interval
+        is compared with every target at once and the results are OR-reduced per requirement.
+        """
+        valid_keys = [key for key in target_keys if key is not None]
+        bounds = {bound for requirement in requirements for interval in requirement.intervals
+                  for bound in (interval[0], interval[2])}
+        ranks = {key: rank for rank, key in enumerate(sorted(bounds | set(valid_keys)))}
+
+        intervals = [(row, *interval) for row, requirement in enumerate(requirements)
+                     for interval in requirement.intervals]
+        result = np.zeros((len(requirements), len(target_keys)), dtype=bool)
+        if not intervals or not valid_keys:
+            return result
+
+        owners = np.array([interval[0] for interval in intervals], dtype=np.intp)
+        low = np.array([ranks[interval[1]] for interval in intervals])[:, None]
+        low_inclusive = np.array([interval[2] for interval in intervals], dtype=bool)[:, None]
+        high = np.array([ranks[interval[3]] for interval in intervals])[:, None]
+        high_inclusive = np.array([interval[4] for interval in intervals], dtype=bool)[:, None]
+
+        columns = [index for index, key in enumerate(target_keys) if key is not None]
+        targets = np.array([ranks[target_keys[index]] for index in columns])[None, :]
+        inside = ((targets > low) | ((targets == low) & low_inclusive)) \
+            & ((targets < high) | ((targets == high) & high_inclusive))
+
+        evaluated = np.zeros((len(requirements), len(columns)), dtype=bool)
+        np.logical_or.at(evaluated, owners, inside)
+        result[:, columns] = evaluated
+        return result
@@ -1,3 +1,6 @@
+import aiohttp
+
+
 class ComposerV1Exception(Exception):
     """Exception raised for case when Composer v1 is used."""
 
@@ -28,3 +31,36 @@ class ModuleNotFoundException(Exception):
     def __init__(self, message):
         self.message = message
         super().__init__(self.message)
+
+
+class InvalidConstraintException(Exception):
+    """Exception raised for case when a version constraint cannot be parsed."""
+
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+
+class CircuitOpenException(aiohttp.ClientError):
+    """Exception raised for case when requests are not sent because the upstream is failing."""
+
+    def __init__(self, message="The metadata upstream is failing; the request was not sent."):
+        self.message = message
+        super().__init__(self.message)
+
+
+class BlockingModuleException(Exception):
+    """Exception raised for case when a module has no release compatible with the target core."""
+
+    def __init__(self, module, core):
+        self.module = module
+        self.message = "Module {} has no release compatible with Drupal core {}.".format(module.name, core)
+        super().__init__(self.message)
+
+
+class RevisionNotFoundException(Exception):
+    """Exception raised for case when a git revision of the project cannot be read."""
+
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
@@ -0,0 +1,431 @@
+import asyncio
+import contextlib
+import itertools
+import logging
+import time
+from typing import AsyncIterator, Iterable
+
+import aiohttp
+
+from . import codec
+from .breaker import STATE_OPEN, CircuitBreaker
+from .cache import LRUCache
+from .exceptions import ModuleNotFoundException
+from .hedging import HedgePolicy
+from .mirrors import UPSTREAM_URL, EndpointPool
+from .retries import RetryBudget, full_jitter
+
+logger = logging.getLogger(__name__)
+
+_MAX_RETRIES = 3
+_RETRY_STATUS_CODES = frozenset([500, 502, 503, 504])
+_REQUEST_TIMEOUT = aiohttp.ClientTimeout(sock_connect=5, sock_read=30)
+
+
+class MetadataFetcher:
+    """
+    Fetches the p2 metadata of Drupal packages.
+    Concurrent requests for the same package are deduplicated into a single HTTP request,
+    and parsed payloads, as well as packages that do not exist, are kept in the optional metadata cache.
+    Use the fetcher as an async context manager, or pass keep_session, to keep one pooled session
+    open for its lifetime. With a hedging policy, slow requests are duplicated to cut the tail latency.
+    With a circuit breaker, requests fail fast while the upstream is failing, and with a retry budget
+    the retries of all requests are limited to a share of the successful ones. With an endpoint pool,
+    the requests go to the fastest healthy mirror; URLs and cache keys always name packages.drupal.org.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession | None = None, cache: LRUCache | None = None,
+                 keep_session: bool = False, hedging: HedgePolicy | None = None,
+                 breaker: CircuitBreaker | None = None, retry_budget: RetryBudget | None = None,
+                 endpoints: EndpointPool | None = None):
+        """
+        Initialize the fetcher.
+        :param session:         a shared HTTP session; when omitted, every request opens its own session
+                                unless the fetcher is opened as a context manager
+        :type session:          aiohttp.ClientSession | None
+        :param cache:           the cache of parsed payloads by URL
+        :type cache:            LRUCache | None
+        :param keep_session:    open a pooled session on the first request and keep it until close()
+        :type keep_session:     bool
+        :param hedging:         the policy deciding when a slow request is duplicated
+        :type hedging:          HedgePolicy | None
+        :param breaker:         the circuit breaker shared by the requests of the fetcher
+        :type breaker:          CircuitBreaker | None
+        :param retry_budget:    the retry budget shared by the requests of the fetcher
+        :type retry_budget:     RetryBudget | None
+        :param endpoints:       the metadata mirrors to send the requests to
+        :type endpoints:        EndpointPool | None
+        """
+        self.session = session
+        self.cache = cache
+        self.keep_session = keep_session
+        self.hedging = hedging
+        self.breaker = breaker
+        self.retry_budget = retry_budget
+        self.endpoints = endpoints
+        self.__owns_session = False
+        self.__session_loop: asyncio.AbstractEventLoop | None = None
+        self.__in_flight: dict[str, asyncio.Future] = {}
+        # the number of callers waiting for each request in flight
+        self.__waiters: dict[asyncio.Future, int] = {}
+        # validators identify the payload version currently served for a URL
+        self.__validators: dict[str, str] = {}
+        self.__response_validators: dict[str, str] = {}
+        self.__generation = itertools.count(1)
+        # latency and size of the latest network request per URL, until taken by the scan
+        self.__request_stats: dict[str, dict] = {}
+
+    async def __aenter__(self) -> 'MetadataFetcher':
+        self._open_session()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        Close the pooled session if the fetcher opened it.
+        """
+        if self.__owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+            self.__owns_session = False
+
+    def prepare_url(self, module_name: str) -> str:
+        """
+        Prepare the URL to the JSON data of the module.
+        :param module_name: the name of the module
+        :type module_name:  str
+        :return:   the URL to the JSON data of the module
+        :rtype:    str
+        """
+        return UPSTREAM_URL + module_name + '.json'
+
+    async def fetch(self, module_name: str) -> dict:
+        """
+        Fetch the metadata of the module.
+        :param module_name: the name of the module
+        :type module_name:  str
+        :return:            the parsed JSON response
+        :rtype:             dict
+        """
+        return await self.get(self.prepare_url(module_name), module_name)
+
+    async def refresh(self, module_name: str) -> dict:
+        """
+        Fetch the metadata of the module again and replace the cached payload.
+        :param module_name: the name of the module
+        :type module_name:  str
+        :return:            the parsed JSON response
+        :rtype:             dict
+        """
+        return await self.get(self.prepare_url(module_name), module_name, refresh=True)
+
+    async def get(self, url: str, module_name: str, refresh: bool = False) -> dict:
+        """
+        Get the parsed JSON of the URL from the cache, from an identical request already in flight,
+        or from a new request. The request is cancelled when every caller waiting for it was cancelled.
+        :param url:         the URL to fetch
+        :type url:          str
+        :param module_name: the name of the module, used for messages
+        :type module_name:  str
+        :param refresh:     skip the cached payload and store a fresh one; the cached payload stays
+                            available to other callers until then
+        :type refresh:      bool
+        :return:            the parsed JSON response
+        :rtype:             dict
+        :raises:            aiohttp.ClientError, asyncio.TimeoutError on exhausted retries
+        """
+        if self.cache is not None and not refresh:
+            cached = self.cache.get(url)
+            if isinstance(cached, ModuleNotFoundException):
+                raise ModuleNotFoundException(cached.message)
+            if cached is not None:
+                return cached
+        future = self.__in_flight.get(url)
+        if future is None or future.cancelled():
+            future = asyncio.ensure_future(self._request(url, module_name))
+            self.__in_flight[url] = future
+            future.add_done_callback(lambda done: self._forget(url, done))
+        self.__waiters[future] = self.__waiters.get(future, 0) + 1
+        try:
+            # shield the shared request so that one cancelled caller does not cancel it for the others
+            contents = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # the last caller gives up the request, e.g. at the deadline of the scan
+            if self.__waiters[future] == 1:
+                future.cancel()
+            raise
+        except ModuleNotFoundException as exc:
+            if self.cache is not None:
+                self.cache.set(url, exc)
+            raise
+        finally:
+            self.__waiters[future] -= 1
+            if not self.__waiters[future]:
+                del self.__waiters[future]
+        if self.cache is not None:
+            self.cache.set(url, contents)
+        return contents
+
+    async def prefetch(self, module_names: Iterable[str], semaphore: asyncio.Semaphore) -> None:
+        """
+        Fetch the metadata of the modules into the cache, each module once.
+        Failures are not raised here; they surface again when the module is fetched for a scan.
+        :param module_names:    the names of the modules
+        :type module_names:     Iterable[str]
+        :param semaphore:       the semaphore limiting concurrent requests
+        :type semaphore:        asyncio.Semaphore
+        """
+        async def fetch(module_name: str) -> None:
+            async with semaphore:
+                try:
+                    await self.fetch(module_name)
+                except (ModuleNotFoundException, aiohttp.ClientError, asyncio.TimeoutError):
+                    pass
+
+        async with asyncio.TaskGroup() as tg:
+            for module_name in set(module_names):
+                tg.create_task(fetch(module_name))
+
+    def validator(self, url: str) -> str | None:
+        """
+        Get the validator of the payload served for the URL: its ETag or Last-Modified header or,
+        without those, a number that changes with every new request. Results computed from a payload
+        can be cached under its validator.
+        :param url:     the URL
+        :type url:      str
+        :return:        the validator, or None if the URL was never fetched
+        :rtype:         str | None
+        """
+        return self.__validators.get(url)
+
+    def take_request_stats(self, url: str) -> dict | None:
+        """
+        Take the measurements of the latest network request for the URL.
+        Payloads served from the cache or by a request of another caller have no measurements.
+        :param url:     the URL
+        :type url:      str
+        :return:        the "latency" in seconds, including retries, the payload "size" in bytes, both None
+                        unless the request succeeded, and the number of "retries"; or None
+        :rtype:         dict | None
+        """
+        return self.__request_stats.pop(url, None)
+
+    def _forget(self, url: str, future: asyncio.Future) -> None:
+        if self.__in_flight.get(url) is future:
+            del self.__in_flight[url]
+        response_validator = self.__response_validators.pop(url, None)
+        # mark the exception as retrieved in case every waiting caller was cancelled
+        if not future.cancelled() and future.exception() is None:
+            self.__validators[url] = response_validator or "#{}".format(next(self.__generation))
+
+    def _open_session(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self.__owns_session and self.__session_loop is not loop:
+            # a session cannot outlive its event loop; the old one went away with it
+            self.session = None
+            self.__owns_session = False
+        if self.session is None:
+            self.session = aiohttp.ClientSession(timeout=_REQUEST_TIMEOUT)
+            self.__owns_session = True
+            self.__session_loop = loop
+
+    @contextlib.asynccontextmanager
+    async def _session(self) -> AsyncIterator[aiohttp.ClientSession]:
+        if self.keep_session:
+            self._open_session()
+        if self.session is not None:
+            yield self.session
+        else:
+            async with aiohttp.ClientSession(timeout=_REQUEST_TIMEOUT) as session:
+                yield session
+
+    async def _request(self, url: str, module_name: str) -> dict:
+        """
+        Perform an HTTP GET request with retry logic and full-jitter exponential backoff.
+        Retries on connection errors, timeouts, and server-side HTTP errors (5xx), as long as the retry budget,
+        if any, allows.
+        :param url:         the URL to fetch
+        :type url:          str
+        :param module_name: the name of the module, used for messages
+        :type module_name:  str
+        :return:            the parsed JSON response
+        :rtype:             dict
+        :raises:            aiohttp.ClientError, asyncio.TimeoutError on exhausted retries,
+                            CircuitOpenException when the circuit breaker stops the request
+        """
+        last_exception: BaseException | None = None
+        started_at = time.monotonic()
+        stats = self.__request_stats[url] = {"latency": None, "size": None, "retries": 0}
+        # the breaker counts requests, not attempts: the retries of one failing module are a single failure
+        if self.breaker is not None:
+            self.breaker.before_request()
+        for attempt in range(1, _MAX_RETRIES + 1):
+            if attempt > 1:
+                logger.warning(
+                    "Retrying module %s... attempt %d/%d",
+                    module_name, attempt, _MAX_RETRIES
+                )
+                await asyncio.sleep(full_jitter(attempt - 1))
+            try:
+                contents, size, validator = await self._hedged_attempt(url, module_name)
+            except ModuleNotFoundException:
+                # the upstream answered
+                if self.breaker is not None:
+                    self.breaker.record_success()
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                last_exception = exc
+                if attempt == _MAX_RETRIES:
+                    break
+                if self.breaker is not None and self.breaker.state == STATE_OPEN:
+                    logger.warning("The circuit breaker is open; module %s is not retried.", module_name)
+                    break
+                if isinstance(exc, aiohttp.ClientResponseError) and exc.status in _RETRY_STATUS_CODES:
+                    reason = "HTTP {}".format(exc.status)
+                else:
+                    reason = type(exc).__name__
+                if self.retry_budget is not None and not self.retry_budget.try_retry():
+                    logger.warning("The retry budget is spent; module %s is not retried (%s).", module_name, reason)
+                    break
+                stats["retries"] += 1
+                logger.warning(
+                    "Retrying module %s... attempt %d/%d (%s)",
+                    module_name, attempt + 1, _MAX_RETRIES, reason
+                )
+                continue
+            if self.breaker is not None:
+                self.breaker.record_success()
+            if self.retry_budget is not None:
+                self.retry_budget.record_success()
+            stats.update(latency=time.monotonic() - started_at, size=size)
+            if validator:
+                self.__response_validators[url] = validator
+            return contents
+        assert last_exception is not None
+        if self.breaker is not None:
+            self.breaker.record_failure()
+        raise last_exception
+
+    async def _hedged_attempt(self, url: str, module_name: str) -> tuple[dict, int, str | None]:
+        """
+        Perform one attempt of the request and, with a hedging policy, duplicate it once when it is slow.
+        The first response wins and the other request is cancelled; a failed request waits for the other.
+        :return:    the result of _attempt()
+        """
+        policy = self.hedging
+        delay = policy.delay() if policy is not None else None
+        if policy is not None:
+            policy.start_request()
+        if delay is None:
+            return await self._attempt(url, module_name)
+
+        primary = asyncio.ensure_future(self._attempt(url, module_name))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and policy.allow_hedge():
+                logger.debug("Hedging the request for module %s after %.3fs", module_name, delay)
+                tasks.add(asyncio.ensure_future(self._attempt(url, module_name)))
+            while True:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                # a missing package is a definite answer; other failures wait for the remaining request
+                winners = [task for task in done
+                           if task.exception() is None or isinstance(task.exception(), ModuleNotFoundException)]
+                if winners:
+                    if primary not in winners:
+                        policy.record_win()
+                    return (primary if primary in winners else winners[0]).result()
+                if not tasks:
+                    return done.pop().result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _attempt(self, url: str, module_name: str) -> tuple[dict, int, str | None]:
+        """
+        Perform a single request; with mirrors, on the best endpoint, failing over to the next
+        candidate when an endpoint errors. A mirror may lag behind packages.drupal.org, so a package
+        it does not have is looked up on the next candidate too; only packages.drupal.org decides
+        that a package does not exist.
+        :param url:         the URL to fetch
+        :type url:          str
+        :param module_name: the name of the module, used for messages
+        :type module_name:  str
+        :return:            the result of _download()
+        :rtype:             tuple
+        :raises:            ModuleNotFoundException on 404 from packages.drupal.org, aiohttp.ClientError,
+                            asyncio.TimeoutError when every endpoint failed
+        """
+        if self.endpoints is None:
+            return await self._download(url, module_name)
+        last_exception: BaseException | None = None
+        not_found: ModuleNotFoundException | None = None
+        for endpoint in self.endpoints.candidates():
+            started_at = time.monotonic()
+            try:
+                result = await self._download(endpoint.url_for(url), module_name)
+            except ModuleNotFoundException as exc:
+                # the endpoint answered, so it is healthy
+                self.endpoints.record_success(endpoint, time.monotonic() - started_at)
+                if endpoint.base_url == UPSTREAM_URL:
+                    raise
+                logger.debug("The metadata endpoint %s does not have module %s.", endpoint.base_url, module_name)
+                not_found = exc
+                continue
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                self.endpoints.record_failure(endpoint)
+                last_exception = exc
+                logger.warning("The metadata endpoint %s failed for module %s (%s).",
+                               endpoint.base_url, module_name, type(exc).__name__)
+                continue
+            self.endpoints.record_success(endpoint, time.monotonic() - started_at)
+            return result
+        # packages.drupal.org failed: a miss of the mirrors is not a definite answer, so the request is retried
+        if last_exception is not None:
+            raise last_exception
+        assert not_found is not None
+        raise not_found
+
+    async def _download(self, url: str, module_name: str) -> tuple[dict, int, str | None]:
+        """
+        Perform a single HTTP GET request.
+        :param url:         the URL to fetch
+        :type url:          str
+        :param module_name: the name of the module, used for messages
+        :type module_name:  str
+        :return:            the parsed JSON response, the payload size in bytes and the response validator
+        :rtype:             tuple
+        :raises:            ModuleNotFoundException on 404, aiohttp.ClientResponseError on a retryable status,
+                            aiohttp.ContentTypeError on a body that is not JSON,
+                            aiohttp.ClientError, asyncio.TimeoutError
+        """
+        started_at = time.monotonic()
+        async with self._session() as session:
+            async with session.get(url, timeout=_REQUEST_TIMEOUT) as response:
+                if response.status == 404:
+                    raise ModuleNotFoundException(
+                        "The module {} is not found. Possibly it is no more supported.".format(module_name))
+                if response.status in _RETRY_STATUS_CODES:
+                    raise aiohttp.ClientResponseError(
+                        response.request_info,
+                        response.history,
+                        status=response.status,
+                        message=f"HTTP {response.status} for {url}",
+                    )
+                body = await response.read()
+                try:
+                    contents = codec.loads(body)
+                except ValueError as exc:
+                    # a body that is not JSON, e.g. an error page served with 200, is retried like a failed request
+                    raise aiohttp.ContentTypeError(
+                        response.request_info,
+                        response.history,
+                        status=response.status,
+                        message=f"Invalid JSON for {url}: {exc}",
+                        headers=response.headers,
+                    ) from exc
+                if self.hedging is not None:
+                    self.hedging.observe(time.monotonic() - started_at)
+                return contents, len(body), response.headers.get("ETag") or response.headers.get("Last-Modified")
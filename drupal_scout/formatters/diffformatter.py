@@ -0,0 +1,101 @@
+from typing import Iterable
+
+from rich.table import Table
+from rich import box
+from .formatter import Formatter
+from .jsonformatter import JSONFormatter
+from drupal_scout import codec
+from drupal_scout.module import Module
+
+# the kind of a difference between two results of a module
+CHANGE_ADDED = "added"
+CHANGE_REMOVED = "removed"
+CHANGE_CHANGED = "changed"
+
+
+def describe_result(result: dict | None) -> str:
+    """
+    Describe the installed version and the outcome of a module result in a few words.
+    :param result:      the JSON result of the module, or None if the module was not scanned
+    :type result:       dict | None
+    :return:            the description
+    :rtype:             str
+    """
+    if result is None:
+        return "-"
+    if result.get("timed_out"):
+        outcome = "timed out"
+    elif result["failed"]:
+        outcome = "failed"
+    elif result["suitable_entries"]:
+        outcome = ", ".join(entry["version"] for entry in result["suitable_entries"])
+    else:
+        outcome = "no suitable entries"
+    return "{}: {}".format(result["version"] or "N/A", outcome)
+
+
+class DiffFormatter(Formatter):
+    """
+    Formats the differences between earlier results of the modules and the results of a scan.
+    """
+
+    def __init__(self, before: dict[str, dict], removed: Iterable[str] = (), as_json: bool = False):
+        """
+        :param before:      the earlier JSON results, by module name
+        :param removed:     the names of the modules that are no longer required
+        :param as_json:     whether to render JSON instead of a table
+        """
+        self.before = before
+        self.removed = list(removed)
+        self.as_json = as_json
+
+    def build(self, modules: list[Module]) -> list[dict]:
+        """
+        Compare the results of the scanned modules with the earlier ones.
+        The retry counts are left out of the comparison, since they change from scan to scan.
+        :param modules:     the scanned modules
+        :type modules:      list
+        :return:            a difference per added, removed or changed module: name, change, before, after
+        :rtype:             list
+        """
+        differences = []
+        for module in modules:
+            after = JSONFormatter.module_result(module)
+            before = self.before.get(module.name)
+            if before is None:
+                differences.append({"name": module.name, "change": CHANGE_ADDED, "before": None, "after": after})
+            elif self._comparable(before) != self._comparable(after):
+                differences.append({"name": module.name, "change": CHANGE_CHANGED, "before": before, "after": after})
+        for name in self.removed:
+            differences.append({"name": name, "change": CHANGE_REMOVED, "before": self.before.get(name), "after": None})
+        return differences
+
+    def render(self, result: list[dict]) -> str | Table:
+        """
+        Render the differences.
+        :param result:      the differences built by build()
+        :type result:       list
+        :return:            the JSON document or the rich Table object
+        """
+        if self.as_json:
+            return codec.dumps(result, indent=True)
+        table = Table(show_header=True, header_style="bold magenta", box=box.ROUNDED, padding=(0, 1))
+        table.add_column("Name", style="cyan", no_wrap=True)
+        table.add_column("Change")
+        table.add_column("Before", style="grey70")
+        table.add_column("After", style="white")
+        styles = {CHANGE_ADDED: "green", CHANGE_REMOVED: "red", CHANGE_CHANGED: "yellow"}
+        for difference in result:
+            table.add_row(
+                difference["name"],
+                "[{0}]{1}[/{0}]".format(styles[difference["change"]], difference["change"]),
+                describe_result(difference["before"]),
+                describe_result(difference["after"]),
+            )
+        if not result:
+            table.caption = "No differences"
+        return table
+
+    @staticmethod
+    def _comparable(result: dict) -> dict:
+        return {key: value for key, value in result.items() if key != "retries"}
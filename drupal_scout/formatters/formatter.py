@@ -5,8 +5,34 @@ from drupal_scout.module import Module
 
 class Formatter(ABC):
     """
-    Abstract class for formatters
+    Abstract class for formatters.
+    A formatter builds a structured result of plain Python values, which callers such as the MCP server
+    can consume directly, and renders it for the console.
     """
     @abstractmethod
-    def format(self, modules: list[Module]) -> Any:
+    def build(self, modules: list[Module]) -> Any:
+        """
+        Build the structured result.
+        :param modules:     the list of modules
+        :type modules:      list
+        :return:            the result, made of plain Python values
+        """
+        pass
+
+    @abstractmethod
+    def render(self, result: Any) -> Any:
+        """
+        Render a result of build() for the output.
+        :param result:      the structured result
+        :return:            the printable output
+        """
         pass
+
+    def format(self, modules: list[Module]) -> Any:
+        """
+        Build and render the result.
+        :param modules:     the list of modules
+        :type modules:      list
+        :return:            the printable output
+        """
+        return self.render(self.build(modules))
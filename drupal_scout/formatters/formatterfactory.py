@@ -4,6 +4,8 @@ from .formatter import Formatter
 from .jsonformatter import JSONFormatter
 from .tableformatter import TableFormatter
 from .suggestformatter import SuggestFormatter
+from .summaryformatter import SummaryFormatter
+from drupal_scout.summary import ScanSummary
 
 
 class FormatterFactory:
@@ -12,19 +14,23 @@ class FormatterFactory:
     """
 
     @staticmethod
-    def get_formatter(args: Namespace) -> Formatter | None:
+    def get_formatter(args: Namespace, summary: ScanSummary | None = None) -> Formatter | None:
         """
         Get the formatter object.
         :param args:    the arguments passed to the application
         :type args:     argparse.Namespace
+        :param summary: the summary of a summary-only scan
+        :type summary:  ScanSummary | None
         :return:        the formatter object
         :rtype:         Formatter
         """
         format_name = args.format
+        if summary is not None:
+            return SummaryFormatter(summary, as_json=format_name == 'json')
         if format_name == 'json':
             return JSONFormatter()
         elif format_name == 'table':
             return TableFormatter()
         elif format_name == 'suggest':
-            return SuggestFormatter(args)
+            return SuggestFormatter(args.directory, args.save_dump)
         return None
@@ -1,6 +1,7 @@
-import json
+from typing import Iterable, Iterator
 
 from .formatter import Formatter
+from drupal_scout import codec
 from drupal_scout.module import Module
 
 
@@ -9,31 +10,76 @@ class JSONFormatter(Formatter):
     Formats the output as JSON.
     """
 
-    def format(self, modules: list[Module]) -> str:
+    def build(self, modules: list[Module]) -> list[dict]:
         """
-        Format the output as JSON.
+        Build the JSON-compatible output, for callers that pass it on without serializing it.
         :param modules:     the list of modules
         :type modules:      list
+        :return:            the module results
+        :rtype:             list
+        """
+        return list(self.iter_results(modules))
+
+    def render(self, result: list[dict]) -> str:
+        """
+        Serialize the module results as indented JSON.
+        :param result:      the module results
+        :type result:       list
         :return:            the formatted output
         :rtype:             str
         """
-        output: list[dict] = []
+        return codec.dumps(result, indent=True)
+
+    def iter_results(self, modules: Iterable[Module]) -> Iterator[dict]:
+        """
+        Build the result of each module as it is consumed.
+        :param modules:     the modules
+        :type modules:      Iterable
+        :return:            the module results
+        :rtype:             Iterator
+        """
         for module in modules:
-            output.append({
-                'name': module.name,
-                'version': module.version,
-                'suitable_entries': [],
-                'failed': module.failed
-            })
+            yield self.module_result(module)
 
-            # omit modules that are not active or failed
-            if module.active is False or module.failed:
-                continue
+    @staticmethod
+    def module_result(module: Module) -> dict:
+        """
+        Build the result of a module.
+        :param module:      the module
+        :type module:       Module
+        :return:            the module result
+        :rtype:             dict
+        """
+        result = {
+            'name': module.name,
+            'version': module.version,
+            'suitable_entries': [],
+            'failed': module.failed
+        }
 
-            for entry in module.suitable_entries:
-                output[-1]['suitable_entries'].append({
-                    'version': entry['version'],
-                    'requirement': entry['requirement']
-                })
-        return json.dumps(output, indent=4)
+        # only present when the scan deadline expired before the module was fetched
+        if module.timed_out:
+            result['timed_out'] = True
+        # only present when requests for the module were retried
+        if module.retries:
+            result['retries'] = module.retries
 
+        # omit modules that are not active, failed or timed out
+        if module.active is False or module.failed or module.timed_out:
+            return result
+
+        for entry in module.suitable_entries:
+            result['suitable_entries'].append({
+                'version': entry['version'],
+                'requirement': entry['requirement']
+            })
+            # only present when the drupal/* dependencies were resolved
+            if 'resolved_dependencies' in entry:
+                result['suitable_entries'][-1]['dependencies'] = entry['resolved_dependencies']
+        if module.blocked_entries:
+            result['blocked_entries'] = [{
+                'version': entry['version'],
+                'requirement': entry['requirement'],
+                'unresolved_dependencies': entry['unresolved_dependencies']
+            } for entry in module.blocked_entries]
+        return result
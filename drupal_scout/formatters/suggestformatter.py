@@ -1,11 +1,12 @@
 # Specific formatter that will take the modules suitable entries, and replace with them the composer.json requirements.
 
-import json
+import copy
 import os
-from argparse import Namespace
 from .formatter import Formatter
 from packaging import version
+from drupal_scout import codec
 from drupal_scout.module import Module
+from drupal_scout.project import ProjectFileCache
 
 
 class SuggestFormatter(Formatter):
@@ -13,41 +14,57 @@ class SuggestFormatter(Formatter):
     Formats the output as composer.json contents based on real composer.json contents.
     """
 
-    def __init__(self, args: Namespace):
-        self.directory = args.directory
-        self.save_dump = args.save_dump
+    def __init__(self, directory: str, save_dump: bool = False, project_files: ProjectFileCache | None = None):
+        """
+        :param directory:       the directory of the project whose composer.json is suggested
+        :param save_dump:       whether to save the suggestion to the composer.json file of the project
+        :param project_files:   the cache of parsed project files
+        """
+        self.directory = directory
+        self.save_dump = save_dump
+        self.project_files = project_files or ProjectFileCache()
 
-    def format(self, modules: list[Module]) -> str:
+    def render(self, result: dict) -> str:
         """
-        Take the real composer.json contents, and module requirement versions with suitable entry versions.
-        :param modules:   the list of modules
-        :type modules:    list
+        Serialize the suggested composer.json contents, and save them to the project when save_dump is set.
+        :param result:    the suggested composer.json contents
+        :type result:     dict
         :return:          the formatted output
         :rtype:           str
         """
-        output: list[str] = []
-        with open(os.path.join(self.directory, "composer.json"), "r") as f:
-            composer_json = json.load(f)
-            for module in modules:
-                # module have more than one suitable entry, find the lowest version and replace the requirement version
-                if len(module.suitable_entries) > 1 and module.active is True:
-                    lowest_version = self.find_lowest_version(module.suitable_entries)
-                    # find the module in the composer.json
-                    for package in composer_json['require']:
-                        if package == module.name:
-                            # replace the version with the lowest version
-                            composer_json['require'][package] = f"^{lowest_version}"
-                # module have only one suitable entry, replace the requirement version with the suitable entry version
-                elif len(module.suitable_entries) == 1:
-                    for package in composer_json['require']:
-                        if package == module.name:
-                            composer_json['require'][package] = f"^{module.suitable_entries[0]['version']}"
-                elif len(module.suitable_entries) == 0:
-                    continue
+        contents = codec.dumps(result, indent=True)
         if self.save_dump:
             with open(os.path.join(self.directory, "composer.json"), "w") as f:
-                json.dump(composer_json, f, indent=4)
-        return json.dumps(composer_json, indent=4)
+                f.write(contents)
+        return contents
+
+    def build(self, modules: list[Module]) -> dict:
+        """
+        Build the suggested composer.json contents without serializing or saving them.
+        :param modules:   the list of modules
+        :type modules:    list
+        :return:          the suggested composer.json contents
+        :rtype:           dict
+        """
+        # the cached contents are shared, so the suggestion is built on a copy
+        composer_json = copy.deepcopy(self.project_files.load(os.path.join(self.directory, "composer.json")))
+        for module in modules:
+            # module have more than one suitable entry, find the lowest version and replace the requirement version
+            if len(module.suitable_entries) > 1 and module.active is True:
+                lowest_version = self.find_lowest_version(module.suitable_entries)
+                # find the module in the composer.json
+                for package in composer_json['require']:
+                    if package == module.name:
+                        # replace the version with the lowest version
+                        composer_json['require'][package] = f"^{lowest_version}"
+            # module have only one suitable entry, replace the requirement version with the suitable entry version
+            elif len(module.suitable_entries) == 1:
+                for package in composer_json['require']:
+                    if package == module.name:
+                        composer_json['require'][package] = f"^{module.suitable_entries[0]['version']}"
+            elif len(module.suitable_entries) == 0:
+                continue
+        return composer_json
 
     def find_lowest_version(self, suitable_entries: list[dict]) -> str | None:
         """
@@ -0,0 +1,46 @@
+from rich.table import Table
+from rich import box
+from .formatter import Formatter
+from drupal_scout import codec
+from drupal_scout.module import Module
+from drupal_scout.summary import ScanSummary
+
+
+class SummaryFormatter(Formatter):
+    """
+    Formats the aggregate counts of a scan, as a table or as JSON.
+    """
+
+    def __init__(self, summary: ScanSummary, as_json: bool = False):
+        """
+        :param summary:     the summary the modules were counted in during the scan
+        :param as_json:     whether to render JSON instead of a table
+        """
+        self.summary = summary
+        self.as_json = as_json
+
+    def build(self, modules: list[Module]) -> dict:
+        """
+        Get the counters of the summary; the modules were counted while they were evaluated.
+        :param modules:     the list of modules
+        :type modules:      list
+        :return:            the counters by name
+        :rtype:             dict
+        """
+        return self.summary.as_dict()
+
+    def render(self, result: dict) -> str | Table:
+        """
+        Render the counters.
+        :param result:      the counters by name
+        :type result:       dict
+        :return:            the JSON document or the rich Table object
+        """
+        if self.as_json:
+            return codec.dumps(result, indent=True)
+        table = Table(show_header=True, header_style="bold magenta", box=box.ROUNDED, padding=(0, 1))
+        table.add_column("Modules", style="cyan")
+        table.add_column("Count", justify="right")
+        for name, count in result.items():
+            table.add_row(name.replace("_", " ").capitalize(), str(count))
+        return table
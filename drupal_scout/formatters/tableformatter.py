@@ -4,47 +4,112 @@ from rich import box
 from .formatter import Formatter
 from drupal_scout.module import Module
 
+# the status of a table row, in the order of precedence
+STATUS_SUITABLE = "suitable"
+STATUS_FAILED = "failed"
+STATUS_TIMED_OUT = "timed_out"
+STATUS_INACTIVE = "inactive"
+STATUS_NONE = "none"
+STATUS_BLOCKED = "blocked"
+
+
 class TableFormatter(Formatter):
     """
     Formats the output as a beautiful Rich table.
     """
 
-    def format(self, modules: list[Module]) -> Table:
+    def build(self, modules: list[Module]) -> list[dict]:
         """
-        Format the output as a rich Table.
+        Build the rows of the table.
         :param modules:     the list of modules
+        :type modules:      list
+        :return:            a row per module: name, version, status, suitable and blocked entries, retries
+        :rtype:             list
+        """
+        rows = []
+        for module in modules:
+            if len(module.suitable_entries) > 0:
+                status = STATUS_SUITABLE
+            elif module.failed:
+                status = STATUS_FAILED
+            elif module.timed_out:
+                status = STATUS_TIMED_OUT
+            elif module.active is not True:
+                status = STATUS_INACTIVE
+            elif not module.blocked_entries:
+                status = STATUS_NONE
+            else:
+                status = STATUS_BLOCKED
+            rows.append({
+                'name': module.name,
+                'version': module.version,
+                'status': status,
+                'suitable_entries': [
+                    {'version': entry['version'], 'requirement': entry['requirement']}
+                    for entry in module.suitable_entries
+                ],
+                'blocked_entries': [
+                    {'version': entry['version'], 'unresolved_dependencies': entry['unresolved_dependencies']}
+                    for entry in module.blocked_entries
+                ],
+                'retries': module.retries,
+            })
+        return rows
+
+    def render(self, result: list[dict]) -> Table:
+        """
+        Render the rows as a rich Table.
+        :param result:      the rows built by build()
+        :type result:       list
         :return:            the rich Table object
         """
         table = Table(show_header=True, header_style="bold magenta", box=box.ROUNDED, padding=(0, 1))
         # Adding a border between rows for clarity
         table.show_edge = True
         table.show_lines = True
-        
+
         table.add_column("Name", style="cyan", no_wrap=True)
         table.add_column("Version", style="green")
         table.add_column("Suitable entries", style="white")
 
-        for module in modules:
+        for row in result:
             entries_text = Text()
-            
-            if len(module.suitable_entries) > 0:
-                for i, entry in enumerate(module.suitable_entries):
+
+            if row['status'] == STATUS_SUITABLE:
+                for i, entry in enumerate(row['suitable_entries']):
                     if i > 0:
                         entries_text.append("\n")
                     # Using Rich style instead of ANSI codes
                     entries_text.append(f"v{entry['version']} ", style="white")
                     entries_text.append(f"[{entry['requirement']}]", style="grey70")
-            elif module.failed:
+            elif row['status'] == STATUS_FAILED:
                 entries_text.append("Failed to fetch module data", style="red")
-            elif module.active is not True:
+            elif row['status'] == STATUS_TIMED_OUT:
+                entries_text.append("Timed out at the scan deadline", style="yellow")
+            elif row['status'] == STATUS_INACTIVE:
                 entries_text.append("Module possibly not active", style="yellow")
-            else:
+            elif row['status'] == STATUS_NONE:
                 entries_text.append("No suitable entries found", style="italic grey50")
-            
+
+            for entry in row['blocked_entries']:
+                if len(entries_text) > 0:
+                    entries_text.append("\n")
+                entries_text.append(f"v{entry['version']} ", style="red")
+                entries_text.append(f"[blocked by {', '.join(entry['unresolved_dependencies'])}]", style="grey70")
+
+            if row['retries']:
+                if len(entries_text) > 0:
+                    entries_text.append("\n")
+                entries_text.append(f"Retried {row['retries']}x", style="grey50")
+
             table.add_row(
-                module.name,
-                module.version or "[dim]N/A[/dim]",
+                row['name'],
+                row['version'] or "[dim]N/A[/dim]",
                 entries_text
             )
-            
+
+        total_retries = sum(row['retries'] for row in result)
+        if total_retries:
+            table.caption = f"{total_retries} request(s) retried in total"
+
         return table
@@ -0,0 +1,100 @@
+import math
+import threading
+from collections import deque
+
+
+class HedgePolicy:
+    """
+    Decides when a slow metadata request is duplicated.
+    A request that has not completed within a percentile of the recently observed latencies gets one
+    duplicate, and whichever response arrives first is used. The share of duplicated requests is capped,
+    so the extra upstream load stays within a few percent.
+    """
+
+    def __init__(self, percentile: float = 0.95, max_rate: float = 0.05, min_samples: int = 20,
+                 window: int = 512, min_delay: float = 0.05):
+        """
+        Initialize the policy.
+        :param percentile:      the percentile of the observed latencies after which a request is hedged
+        :type percentile:       float
+        :param max_rate:        the maximum share of requests that get a duplicate
+        :type max_rate:         float
+        :param min_samples:     the number of latencies observed before any request is hedged
+        :type min_samples:      int
+        :param window:          the number of most recent latencies the percentile is computed from
+        :type window:           int
+        :param min_delay:       the shortest delay, in seconds, before a request is hedged
+        :type min_delay:        float
+        """
+        if not 0 < percentile < 1:
+            raise ValueError("The hedging percentile must be between 0 and 1.")
+        self.percentile = percentile
+        self.max_rate = max_rate
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.__latencies: deque[float] = deque(maxlen=window)
+        self.__lock = threading.Lock()
+
+    def observe(self, latency: float) -> None:
+        """
+        Record the latency of a completed request.
+        :param latency:     the latency in seconds
+        :type latency:      float
+        """
+        with self.__lock:
+            self.__latencies.append(latency)
+
+    def delay(self) -> float | None:
+        """
+        Get the time after which a request is hedged.
+        :return:    the delay in seconds, or None while too few latencies were observed
+        :rtype:     float | None
+        """
+        with self.__lock:
+            if len(self.__latencies) < self.min_samples:
+                return None
+            latencies = sorted(self.__latencies)
+        index = min(len(latencies) - 1, math.ceil(self.percentile * len(latencies)) - 1)
+        return max(self.min_delay, latencies[index])
+
+    def start_request(self) -> None:
+        """
+        Count a request that may be hedged.
+        """
+        with self.__lock:
+            self.requests += 1
+
+    def allow_hedge(self) -> bool:
+        """
+        Take a hedge from the budget, if the share of hedged requests stays within max_rate.
+        :return:    whether the request may be duplicated
+        :rtype:     bool
+        """
+        with self.__lock:
+            if self.hedged + 1 > self.max_rate * self.requests:
+                return False
+            self.hedged += 1
+            return True
+
+    def record_win(self) -> None:
+        """
+        Count a hedge whose response arrived before the original one.
+        """
+        with self.__lock:
+            self.hedge_wins += 1
+
+    def stats(self) -> dict:
+        """
+        Get the statistics of the policy.
+        :return:    the requests, hedged requests, hedges that won and the current delay
+        :rtype:     dict
+        """
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "delay": self.delay(),
+        }
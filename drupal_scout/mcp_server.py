@@ -10,26 +10,140 @@ Each tool maps directly to a CLI command/mode:
   - perform_full_project_scan  → drupal-scout (default run)
   - scan_specific_modules      → drupal-scout --modules ... --core ...
   - generate_composer_upgrade_json → drupal-scout --format suggest
+
+  - scan_multiple_projects     → full scans of many projects in one call
+  - warm_metadata_cache        → drupal-scout cache warm
+
+The tools share one process-lifetime Scanner: one pooled HTTP session, a
+cache of parsed module metadata, a cache of evaluation results and a cache
+of parsed project files, so follow-up calls on the same project reuse the
+work of earlier ones.
 """
 
+import asyncio
+import contextlib
+import functools
 import io
-import json
+import logging
 import os
 import subprocess
 import sys
-from argparse import Namespace
-from typing import Optional
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
 
 from fastmcp import FastMCP
 
 from .application import Application
+from .breaker import CircuitBreaker
+from .cache import LRUCache
+from .fetcher import MetadataFetcher
+from .hedging import HedgePolicy
+from .mirrors import EndpointPool, configured_mirrors
+from .retries import RetryBudget
 from .output import SilentOutputHandler
 from .formatters.jsonformatter import JSONFormatter
 from .formatters.suggestformatter import SuggestFormatter
+from .exceptions import ComposerV1Exception, DirectoryNotFoundException, NoComposerJSONFileException
 from .module import Module
-from .workers_manager import WorkersManager
+from .project import ProjectFileCache
+from .scanner import METADATA_CACHE_SIZE, METADATA_CACHE_TTL, Scanner
+from .scheduling import ScanHistory
+from .summary import ScanSummary
+from .warmer import DEFAULT_RATE, CacheWarmer
+
+logger = logging.getLogger(__name__)
+
+# paginated scan results, kept for the follow-up calls with their cursor
+_SCAN_PAGES_SIZE = 32
+_SCAN_PAGES_TTL = 600
+# the background cache warmer is configured with these environment variables:
+# the seconds between two passes, the project directories (os.pathsep-separated; the recently
+# queried modules when unset) and the requests started per second
+WARM_INTERVAL_ENV = "DRUPAL_SCOUT_WARM_INTERVAL"
+WARM_PROJECTS_ENV = "DRUPAL_SCOUT_WARM_PROJECTS"
+WARM_RATE_ENV = "DRUPAL_SCOUT_WARM_RATE"
+# hedged metadata requests are enabled when this is set
+HEDGE_ENV = "DRUPAL_SCOUT_HEDGE"
+# threads for the disk- and CPU-bound stages (JSON parsing, jq, formatting)
+_BLOCKING_WORKERS = 4
+
+T = TypeVar("T")
+
+
+class _SharedState:
+    """State kept warm across tool calls for the lifetime of the server."""
+
+    def __init__(self):
+        mirrors = configured_mirrors()
+        self.scanner = Scanner(fetcher=MetadataFetcher(
+            cache=LRUCache(max_size=METADATA_CACHE_SIZE, ttl=METADATA_CACHE_TTL),
+            keep_session=True,
+            hedging=HedgePolicy() if os.environ.get(HEDGE_ENV) else None,
+            breaker=CircuitBreaker(),
+            retry_budget=RetryBudget(),
+            endpoints=EndpointPool(mirrors) if mirrors else None,
+        ))
+        self.scans = LRUCache(max_size=_SCAN_PAGES_SIZE, ttl=_SCAN_PAGES_TTL)
+        self.warmer = CacheWarmer(self.fetcher, self.project_files)
+        self.executor = ThreadPoolExecutor(max_workers=_BLOCKING_WORKERS, thread_name_prefix="drupal-scout")
+
+    @property
+    def fetcher(self) -> MetadataFetcher:
+        return self.scanner.fetcher
+
+    @property
+    def project_files(self) -> ProjectFileCache:
+        return self.scanner.project_files
+
+    @property
+    def results(self) -> LRUCache:
+        return self.scanner.results
+
+    @property
+    def history(self) -> ScanHistory:
+        return self.scanner.history
+
+    async def run_blocking(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Run a blocking stage in the bounded pool, keeping the event loop free for other calls."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    def application(self) -> Application:
+        """Create a silent Application wired to the shared scanner."""
+        return Application(output_handler=SilentOutputHandler(), scanner=self.scanner)
+
+    async def close(self) -> None:
+        await self.warmer.stop()
+        await self.scanner.close()
+        self.executor.shutdown(wait=False)
+
+
+_state = _SharedState()
+
+
+@contextlib.asynccontextmanager
+async def _lifespan(server):
+    # background cache warming is opt-in: it starts when a warm interval is configured
+    interval = os.environ.get(WARM_INTERVAL_ENV)
+    if interval:
+        projects = [path for path in os.environ.get(WARM_PROJECTS_ENV, "").split(os.pathsep) if path]
+        try:
+            _state.warmer.schedule(
+                projects or None,
+                rate=float(os.environ.get(WARM_RATE_ENV) or DEFAULT_RATE),
+                interval=float(interval),
+            )
+        except ValueError as exc:
+            logger.warning("Cache warming is disabled, %s or %s is invalid: %s",
+                           WARM_INTERVAL_ENV, WARM_RATE_ENV, exc)
+    try:
+        yield {}
+    finally:
+        await _state.close()
+
 
-mcp = FastMCP("drupal-scout")
+mcp = FastMCP("drupal-scout", lifespan=_lifespan)
 
 
 # ---------------------------------------------------------------------------
@@ -53,25 +167,18 @@ async def get_diagnostic_info(directory: str = ".") -> dict:
 
     Returns:
         A JSON object with diagnostic fields: version, jq_status,
-        composer_json, composer_lock, composer2, drupal_core_version.
+        composer_json, composer_lock, composer2, drupal_core_version, and
+        caches with the size, hits, misses, evictions and hit rate of the
+        metadata and evaluation result caches of the server.
     """
-    app = Application(output_handler=SilentOutputHandler())
+    app = _state.application()
     result = {}
 
     # Version
     result["version"] = app.get_version()
 
     # jq binary check
-    try:
-        subprocess.run(
-            ["jq", "--version"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            check=True,
-        )
-        result["jq_status"] = "FOUND and FUNCTIONAL"
-    except (subprocess.SubprocessError, FileNotFoundError):
-        result["jq_status"] = "NOT FOUND OR NOT FUNCTIONAL"
+    result["jq_status"] = await _state.run_blocking(_jq_status)
 
     # Composer file presence
     result["composer_json"] = os.path.isfile(
@@ -82,21 +189,24 @@ async def get_diagnostic_info(directory: str = ".") -> dict:
     )
 
     # Composer 2 detection
-    args_ns = Namespace(directory=directory)
-    result["composer2"] = app.is_composer2(args_ns)
+    result["composer2"] = _state.scanner.is_composer2(directory)
+
+    # Server cache statistics
+    result["caches"] = {
+        "metadata": _state.fetcher.cache.stats(),
+        "results": _state.results.stats(),
+        "hedging": _state.fetcher.hedging.stats() if _state.fetcher.hedging is not None else None,
+        "circuit_breaker": _state.fetcher.breaker.stats(),
+        "retry_budget": _state.fetcher.retry_budget.stats(),
+        "endpoints": _state.fetcher.endpoints.stats() if _state.fetcher.endpoints is not None else None,
+    }
 
     # Drupal core version
     result["drupal_core_version"] = None
     if result["composer_json"]:
-        try:
-            if result["composer_lock"]:
-                detect_args = Namespace(directory=directory, no_lock=False)
-            else:
-                detect_args = Namespace(directory=directory, no_lock=True)
-            app.determine_drupal_core_version(detect_args)
-            result["drupal_core_version"] = app.drupal_core_version
-        except Exception:
-            pass
+        result["drupal_core_version"] = await _state.run_blocking(
+            _state.scanner.detect_drupal_core_version, directory
+        )
 
     return result
 
@@ -111,6 +221,14 @@ async def perform_full_project_scan(
     directory: str = ".",
     no_lock: bool = False,
     limit: int = 10,
+    resolve_dependencies: bool = False,
+    deadline_seconds: Optional[float] = None,
+    fields: Optional[list[str]] = None,
+    only_incompatible: bool = False,
+    max_entries_per_module: Optional[int] = None,
+    page_size: Optional[int] = None,
+    cursor: Optional[str] = None,
+    summary_only: bool = False,
 ) -> dict:
     """Analyze an entire Drupal project for module upgrade compatibility.
 
@@ -125,6 +243,29 @@ async def perform_full_project_scan(
         no_lock: If True, skip using composer.lock for installed version
             detection. Defaults to False.
         limit: Maximum number of concurrent API requests. Defaults to 10.
+        resolve_dependencies: If True, also resolve the drupal/* dependencies
+            of the suitable entries and move the entries that cannot be
+            co-installed to blocked_entries. Defaults to False.
+        deadline_seconds: If given, stop the scan after this many seconds.
+            Modules fetched by then are reported as usual, the others with
+            "timed_out": true. Defaults to no deadline.
+        fields: Optional list of module fields to return, besides name
+            (see MODULE_FIELDS). Defaults to all fields.
+        only_incompatible: If True, return only the modules without a
+            suitable entry for the target core, including the modules that
+            failed, timed out or are not active. Defaults to False.
+        max_entries_per_module: If given, return at most this many suitable
+            and blocked entries per module; truncated modules carry
+            "suitable_entries_total". Defaults to all entries.
+        page_size: If given, return at most this many modules and a
+            next_cursor for the rest. The result is kept on the server for
+            10 minutes. Defaults to all modules in one response.
+        cursor: The next_cursor of a previous call. Returns the next page of
+            that scan without scanning again; the other arguments are
+            ignored.
+        summary_only: If True, return only the number of compatible,
+            incompatible, inactive, failed and timed out modules instead of
+            the modules. Defaults to False.
 
     Returns:
         A JSON object with keys:
@@ -132,69 +273,66 @@ async def perform_full_project_scan(
           suitable_entries, failed)
         - drupal_core_version: detected core version string
         - lock_file_used: whether composer.lock was used
+        - retries: the number of retried requests in total; the modules
+          whose requests were retried carry their own "retries" count
+        - total_modules: the number of modules across all pages
+        - next_cursor: the cursor of the next page, or null on the last page
+        - summary: with summary_only, the counts of total, compatible,
+          incompatible, inactive, failed, timed_out and upgradable_in_place
+          modules, in place of modules, total_modules and next_cursor
         - error: error message if the scan could not proceed
     """
-    app = Application(output_handler=SilentOutputHandler())
-
-    # Validate directory
-    if not os.path.isdir(directory):
-        return {"error": f"The directory {directory} does not exist."}
-
-    # Validate composer.json
-    if not os.path.isfile(os.path.join(directory, "composer.json")):
-        return {"error": "The directory does not contain a composer.json file."}
-
-    # Check Composer 2
-    args_ns = Namespace(directory=directory, no_lock=no_lock)
-    if not app.is_composer2(args_ns):
-        return {"error": "The Drupal project uses Composer v1. Please upgrade to Composer v2."}
-
-    # Determine Drupal core version
-    try:
-        app.determine_drupal_core_version(args_ns)
-    except Exception as e:
-        return {"error": f"Failed to determine Drupal core version: {e}"}
-
-    core_version = app.drupal_core_version
-
-    # Get required modules
-    app.get_required_modules(args_ns)
-    modules = app.modules
-
-    if len(modules) == 0:
+    if cursor is not None:
+        return _next_page(cursor)
+    projection_error = _check_projection(fields, max_entries_per_module, page_size)
+    if projection_error:
+        return {"error": projection_error}
+
+    # Read the project: core version, modules and their installed versions
+    project = await _state.run_blocking(_load_project, directory, no_lock, None)
+    if "error" in project:
+        return {"error": project["error"]}
+    project = project["project"]
+
+    if len(project.modules) == 0:
         return {
             "modules": [],
-            "drupal_core_version": core_version,
+            "drupal_core_version": project.drupal_core_version,
             "lock_file_used": False,
             "message": "No drupal/* modules were found in composer.json.",
         }
 
-    # Determine module versions from lock file
-    lock_file_used = False
-    composer_lock_path = os.path.join(directory, "composer.lock")
-    if not no_lock and os.path.isfile(composer_lock_path):
-        app.determine_module_versions(args_ns)
-        lock_file_used = True
-
     # Run workers
-    workers_manager = WorkersManager(
-        modules=list(modules.values()),
-        current_core=core_version,
-        use_lock_version=lock_file_used,
+    _state.warmer.record(project.modules)
+    summary = ScanSummary() if summary_only else None
+    workers_manager = await _state.scanner.scan_project(
+        project,
         concurrency_limit=limit,
-        output=app.output,
+        resolve_dependencies=resolve_dependencies,
+        deadline=deadline_seconds,
+        summary=summary,
     )
-    await workers_manager.run()
+    await _state.run_blocking(_state.history.save)
 
-    # Format output as JSON
-    formatter = JSONFormatter()
-    modules_json = json.loads(formatter.format(list(modules.values())))
+    if summary is not None:
+        return {
+            "summary": summary.as_dict(),
+            "drupal_core_version": project.drupal_core_version,
+            "lock_file_used": project.lock_file_used,
+            "retries": workers_manager.retries,
+        }
 
-    return {
+    # Format and project the output
+    modules_json = await _state.run_blocking(
+        _project_modules, list(project.modules.values()), fields, only_incompatible, max_entries_per_module
+    )
+
+    return _first_page({
         "modules": modules_json,
-        "drupal_core_version": core_version,
-        "lock_file_used": lock_file_used,
-    }
+        "drupal_core_version": project.drupal_core_version,
+        "lock_file_used": project.lock_file_used,
+        "retries": workers_manager.retries,
+    }, page_size)
 
 
 # ---------------------------------------------------------------------------
@@ -208,6 +346,8 @@ async def scan_specific_modules(
     core: Optional[str] = None,
     directory: str = ".",
     limit: int = 10,
+    resolve_dependencies: bool = False,
+    deadline_seconds: Optional[float] = None,
 ) -> dict:
     """Scan specific Drupal modules for upgrade compatibility.
 
@@ -230,22 +370,26 @@ async def scan_specific_modules(
         directory: Path to the Drupal project directory for auto-detection.
             Defaults to ".".
         limit: Maximum number of concurrent API requests. Defaults to 10.
+        resolve_dependencies: If True, also resolve the drupal/* dependencies
+            of the suitable entries. Defaults to False.
+        deadline_seconds: If given, stop the scan after this many seconds.
+            Modules fetched by then are reported as usual, the others with
+            "timed_out": true. Defaults to no deadline.
 
     Returns:
         A JSON object with keys:
         - modules: list of module scan results
         - drupal_core_version: resolved core version string
         - lock_file_used: whether composer.lock was used
+        - retries: the number of retried requests in total
         - error: error message if the scan could not proceed
     """
-    app = Application(output_handler=SilentOutputHandler())
-
     # Resolve core version
     if core:
         resolved_core = core.replace("^", "").replace("~", "")
     else:
         # Auto-detect from local project files
-        detected_core = _auto_detect_core(app, directory)
+        detected_core = await _state.run_blocking(_state.scanner.detect_drupal_core_version, directory)
         if detected_core is None:
             return {
                 "error": (
@@ -262,34 +406,35 @@ async def scan_specific_modules(
         module_objects[name] = Module(name)
 
     # Auto-detect lock file
-    lock_file_used = False
-    composer_lock_path = os.path.join(directory, "composer.lock")
-    if os.path.isfile(composer_lock_path):
-        # Use Application's method to populate versions from lock
-        app.modules = module_objects
-        args_ns = Namespace(directory=directory, no_lock=False)
-        app.determine_module_versions(args_ns)
-        module_objects = app.modules
-        lock_file_used = True
+    lock_file_used = os.path.isfile(os.path.join(directory, "composer.lock"))
+    hints = None
+    if lock_file_used:
+        versions = await _state.run_blocking(_state.scanner.installed_versions, directory)
+        for module in module_objects.values():
+            module.version = versions.get(module.name)
+        hints = await _state.run_blocking(_state.scanner.lock_hints, directory)
 
     # Run workers
-    workers_manager = WorkersManager(
-        modules=list(module_objects.values()),
-        current_core=resolved_core,
+    _state.warmer.record(module_objects)
+    workers_manager = await _state.scanner.scan(
+        module_objects.values(),
+        resolved_core,
         use_lock_version=lock_file_used,
         concurrency_limit=limit,
-        output=app.output,
+        resolve_dependencies=resolve_dependencies,
+        deadline=deadline_seconds,
+        hints=hints,
     )
-    await workers_manager.run()
+    await _state.run_blocking(_state.history.save)
 
     # Format output
-    formatter = JSONFormatter()
-    modules_json = json.loads(formatter.format(list(module_objects.values())))
+    modules_json = await _state.run_blocking(_modules_json, list(module_objects.values()))
 
     return {
         "modules": modules_json,
         "drupal_core_version": resolved_core,
         "lock_file_used": lock_file_used,
+        "retries": workers_manager.retries,
     }
 
 
@@ -302,6 +447,7 @@ async def scan_specific_modules(
 async def generate_composer_upgrade_json(
     directory: str = ".",
     core: Optional[str] = None,
+    deadline_seconds: Optional[float] = None,
 ) -> dict:
     """Generate a suggested composer.json with updated module versions.
 
@@ -317,6 +463,9 @@ async def generate_composer_upgrade_json(
     Args:
         directory: Path to the Drupal project directory. Defaults to ".".
         core: Optional Drupal core version override. If omitted, auto-detected.
+        deadline_seconds: If given, stop the scan after this many seconds.
+            Modules fetched by then are reported as usual, the others with
+            "timed_out": true. Defaults to no deadline.
 
     Returns:
         A JSON object with keys:
@@ -324,104 +473,306 @@ async def generate_composer_upgrade_json(
         - drupal_core_version: the core version used for the scan
         - error: error message if the scan could not proceed
     """
-    app = Application(output_handler=SilentOutputHandler())
-
-    # Validate directory
-    if not os.path.isdir(directory):
-        return {"error": f"The directory {directory} does not exist."}
+    # Read the project; the core version is read from composer.lock if it exists
+    project = await _state.run_blocking(_load_project, directory, False, core)
+    if "error" in project:
+        return {"error": project["error"]}
+    project = project["project"]
 
-    # Validate composer.json
-    if not os.path.isfile(os.path.join(directory, "composer.json")):
-        return {"error": "The directory does not contain a composer.json file."}
-
-    # Check Composer 2
-    args_ns = Namespace(directory=directory, no_lock=False)
-    if not app.is_composer2(args_ns):
-        return {"error": "The Drupal project uses Composer v1. Please upgrade to Composer v2."}
-
-    # Determine core version
-    if core:
-        app.drupal_core_version = core.replace("^", "").replace("~", "")
-    else:
-        try:
-            # Prefer lock file for core version detection
-            if os.path.isfile(os.path.join(directory, "composer.lock")):
-                detect_args = Namespace(directory=directory, no_lock=False)
-            else:
-                detect_args = Namespace(directory=directory, no_lock=True)
-            app.determine_drupal_core_version(detect_args)
-        except Exception as e:
-            return {"error": f"Failed to determine Drupal core version: {e}"}
-
-    core_version = app.drupal_core_version
-
-    # Get required modules
-    app.get_required_modules(args_ns)
-    modules_dict = app.modules
-
-    if len(modules_dict) == 0:
+    if len(project.modules) == 0:
         return {
             "suggested_composer_json": None,
-            "drupal_core_version": core_version,
+            "drupal_core_version": project.drupal_core_version,
             "message": "No drupal/* modules were found in composer.json.",
         }
 
-    # Determine module versions from lock file
-    lock_file_used = False
-    composer_lock_path = os.path.join(directory, "composer.lock")
-    if os.path.isfile(composer_lock_path):
-        app.determine_module_versions(
-            Namespace(directory=directory, no_lock=False)
-        )
-        lock_file_used = True
-
     # Run workers
-    workers_manager = WorkersManager(
-        modules=list(modules_dict.values()),
-        current_core=core_version,
-        use_lock_version=lock_file_used,
-        concurrency_limit=10,
-        output=app.output,
-    )
-    await workers_manager.run()
+    _state.warmer.record(project.modules)
+    await _state.scanner.scan_project(project, deadline=deadline_seconds)
+    await _state.run_blocking(_state.history.save)
 
     # Use SuggestFormatter to build the suggested composer.json
     # but WITHOUT writing to disk (save_dump=False)
-    suggest_args = Namespace(directory=directory, save_dump=False)
-    formatter = SuggestFormatter(suggest_args)
-    suggested_json_str = formatter.format(list(modules_dict.values()))
-    suggested_composer = json.loads(suggested_json_str)
+    formatter = SuggestFormatter(directory, save_dump=False, project_files=_state.project_files)
+    suggested_composer = await _state.run_blocking(formatter.build, list(project.modules.values()))
 
     return {
         "suggested_composer_json": suggested_composer,
-        "drupal_core_version": core_version,
+        "drupal_core_version": project.drupal_core_version,
     }
 
 
 # ---------------------------------------------------------------------------
-# Helpers
+# Tool 5: scan_multiple_projects
 # ---------------------------------------------------------------------------
 
+# module fields that can be requested with the ``fields`` argument; the name is always included
+MODULE_FIELDS = ("name", "version", "suitable_entries", "blocked_entries", "failed", "timed_out", "retries")
 
-def _auto_detect_core(app: Application, directory: str) -> Optional[str]:
-    """Attempt to auto-detect the Drupal core version from local project files.
 
-    Tries composer.lock first, then falls back to composer.json.
+@mcp.tool()
+async def scan_multiple_projects(
+    directories: list[str],
+    core_overrides: Optional[dict[str, str]] = None,
+    no_lock: bool = False,
+    limit: int = 10,
+    resolve_dependencies: bool = False,
+    fields: Optional[list[str]] = None,
+    deadline_seconds: Optional[float] = None,
+    summary_only: bool = False,
+) -> dict:
+    """Analyze several Drupal projects for module upgrade compatibility in one call.
+
+    The union of the modules of all projects is fetched once, under one
+    concurrency budget, and each project is then evaluated against its own
+    core version and composer.lock.
+
+    Args:
+        directories: Paths to the Drupal project directories.
+        core_overrides: Optional Drupal core version per directory
+            (e.g. {"/srv/site-a": "11.0.0"}). Projects without an override
+            use their detected core version.
+        no_lock: If True, skip using composer.lock for installed version
+            detection. Defaults to False.
+        limit: Maximum number of concurrent API requests across all
+            projects. Defaults to 10.
+        resolve_dependencies: If True, also resolve the drupal/* dependencies
+            of the suitable entries. Defaults to False.
+        fields: Optional module fields to return, out of "name", "version",
+            "suitable_entries", "blocked_entries", "failed" and "timed_out".
+            The name is always returned. Defaults to all fields.
+        deadline_seconds: If given, stop the whole batch after this many seconds.
+            Modules fetched by then are reported as usual, the others with
+            "timed_out": true. Defaults to no deadline.
+        summary_only: If True, return the counts of compatible,
+            incompatible, inactive, failed and timed out modules of each
+            project and of the whole fleet instead of the modules.
+            Defaults to False.
 
     Returns:
-        The detected core version string, or None if detection fails.
+        A JSON object with keys:
+        - projects: one result per directory, in the given order, with
+          directory, modules, drupal_core_version, lock_file_used and
+          retries, or
+          directory and error if the project could not be scanned;
+          with summary_only, summary replaces modules
+        - summary: with summary_only, the counts added up over the
+          scanned projects
+        - error: error message if the arguments are invalid
     """
+    projection_error = _check_projection(fields, None, None)
+    if projection_error:
+        return {"error": projection_error}
+
+    core_overrides = core_overrides or {}
+    projects = await asyncio.gather(*(
+        _state.run_blocking(_load_project, directory, no_lock, core_overrides.get(directory))
+        for directory in directories
+    ))
+    scanned = [project for project in projects if "error" not in project]
+
+    # one budget for every request of the batch; each module is fetched once into the shared cache
+    semaphore = asyncio.Semaphore(limit if limit >= 1 else (os.cpu_count() or 4))
+    module_names = {name for project in scanned for name in project["project"].modules}
+    _state.warmer.record(module_names)
+    started_at = asyncio.get_running_loop().time()
     try:
-        if os.path.isfile(os.path.join(directory, "composer.lock")):
-            detect_args = Namespace(directory=directory, no_lock=False)
-        elif os.path.isfile(os.path.join(directory, "composer.json")):
-            detect_args = Namespace(directory=directory, no_lock=True)
+        async with asyncio.timeout(deadline_seconds):
+            await _state.fetcher.prefetch(module_names, semaphore)
+    except TimeoutError:
+        # the scans below report the modules that were not fetched in time as timed out
+        pass
+    if deadline_seconds is not None:
+        deadline_seconds = max(0.0, deadline_seconds - (asyncio.get_running_loop().time() - started_at))
+
+    async with asyncio.TaskGroup() as tg:
+        for project in scanned:
+            project["summary"] = ScanSummary() if summary_only else None
+            tg.create_task(_state.scanner.scan_project(
+                project["project"],
+                concurrency_limit=limit,
+                resolve_dependencies=resolve_dependencies,
+                semaphore=semaphore,
+                deadline=deadline_seconds,
+                summary=project["summary"],
+            ))
+    await _state.run_blocking(_state.history.save)
+
+    results = []
+    fleet_summary = ScanSummary()
+    for project in projects:
+        if "error" in project:
+            results.append(project)
+            continue
+        scanned_project = project["project"]
+        result = {"directory": project["directory"]}
+        if summary_only:
+            fleet_summary.merge(project["summary"])
+            result["summary"] = project["summary"].as_dict()
         else:
-            return None
-        app.determine_drupal_core_version(detect_args)
-        return app.drupal_core_version
-    except Exception:
-        return None
+            modules_json = await _state.run_blocking(_modules_json, list(scanned_project.modules.values()))
+            result["modules"] = _project_fields(modules_json, fields)
+        result.update({
+            "drupal_core_version": scanned_project.drupal_core_version,
+            "lock_file_used": scanned_project.lock_file_used,
+            "retries": sum(module.retries for module in scanned_project.modules.values()),
+        })
+        results.append(result)
+    if summary_only:
+        return {"projects": results, "summary": fleet_summary.as_dict()}
+    return {"projects": results}
+
+
+# ---------------------------------------------------------------------------
+# Tool 6: warm_metadata_cache
+# ---------------------------------------------------------------------------
+
+
+@mcp.tool()
+async def warm_metadata_cache(
+    directories: Optional[list[str]] = None,
+    rate: float = DEFAULT_RATE,
+    interval: Optional[float] = None,
+) -> dict:
+    """Refresh the cached module metadata of the server in the background.
+
+    Later scans of the covered modules are then served from a warm cache.
+    Scheduling replaces the previously scheduled warming.
+
+    Equivalent to: drupal-scout cache warm [-p DIRECTORIES ...] [--rate RATE] [--interval INTERVAL]
+
+    Args:
+        directories: Project directories whose drupal/* modules are
+            refreshed. If omitted, the most recently queried modules are
+            refreshed.
+        rate: Number of metadata requests started per second. Defaults to 2.
+        interval: If given, repeat the refresh every `interval` seconds
+            until the server stops. Defaults to a single pass.
+
+    Returns:
+        A JSON object with keys:
+        - scheduled: whether the warming was started
+        - modules: the number of modules covered by the first pass
+        - error: error message if the arguments are invalid
+    """
+    if rate <= 0:
+        return {"error": "The rate must be positive."}
+    if interval is not None and interval <= 0:
+        return {"error": "The interval must be positive."}
+    if directories:
+        module_count = len(await _state.run_blocking(_state.warmer.modules_for, directories))
+    else:
+        module_count = len(_state.warmer.recent)
+    _state.warmer.schedule(directories, rate=rate, interval=interval)
+    return {"scheduled": True, "modules": module_count}
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def _jq_status() -> str:
+    """Check whether the jq binary is available."""
+    try:
+        subprocess.run(
+            ["jq", "--version"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        return "FOUND and FUNCTIONAL"
+    except (subprocess.SubprocessError, FileNotFoundError):
+        return "NOT FOUND OR NOT FUNCTIONAL"
+
+
+def _modules_json(modules: list[Module]) -> list:
+    """Format the scanned modules as JSON-compatible data."""
+    return JSONFormatter().build(modules)
+
+
+def _project_fields(modules_json: list, fields: Optional[list[str]]) -> list:
+    """Keep only the requested fields of the module results."""
+    if not fields:
+        return modules_json
+    keep = {"name", *fields}
+    if "suitable_entries" in keep:
+        keep.add("suitable_entries_total")
+    return [{key: value for key, value in module.items() if key in keep} for module in modules_json]
+
+
+def _check_projection(fields: Optional[list[str]], max_entries_per_module: Optional[int],
+                      page_size: Optional[int]) -> Optional[str]:
+    """Return an error message for invalid projection or pagination arguments."""
+    unknown_fields = set(fields or ()) - set(MODULE_FIELDS)
+    if unknown_fields:
+        return f"Unknown fields: {', '.join(sorted(unknown_fields))}."
+    if max_entries_per_module is not None and max_entries_per_module < 0:
+        return "max_entries_per_module must not be negative."
+    if page_size is not None and page_size < 1:
+        return "page_size must be at least 1."
+    return None
+
+
+def _project_modules(modules: list[Module], fields: Optional[list[str]], only_incompatible: bool,
+                     max_entries_per_module: Optional[int]) -> list:
+    """Build the module results, keeping only the requested modules, entries and fields."""
+    results = []
+    for result in JSONFormatter().iter_results(modules):
+        if only_incompatible and result["suitable_entries"]:
+            continue
+        if max_entries_per_module is not None:
+            if len(result["suitable_entries"]) > max_entries_per_module:
+                result["suitable_entries_total"] = len(result["suitable_entries"])
+                result["suitable_entries"] = result["suitable_entries"][:max_entries_per_module]
+            if "blocked_entries" in result:
+                result["blocked_entries"] = result["blocked_entries"][:max_entries_per_module]
+        results.append(result)
+    return _project_fields(results, fields)
+
+
+def _first_page(result: dict, page_size: Optional[int]) -> dict:
+    """Return the first page of a scan result, keeping the result on the server when there are more pages."""
+    if page_size is None or len(result["modules"]) <= page_size:
+        return {**result, "total_modules": len(result["modules"]), "next_cursor": None}
+    scan_id = uuid.uuid4().hex
+    scan = {**result, "page_size": page_size}
+    _state.scans.set(scan_id, scan)
+    return _page(scan_id, scan, 0)
+
+
+def _next_page(cursor: str) -> dict:
+    """Return the page of a kept scan result that the cursor points to."""
+    scan_id, _, offset = cursor.partition(":")
+    scan = _state.scans.get(scan_id)
+    if scan is None or not offset.isdigit():
+        return {"error": "The cursor is invalid or expired. Run the scan again."}
+    return _page(scan_id, scan, int(offset))
+
+
+def _page(scan_id: str, scan: dict, offset: int) -> dict:
+    end = offset + scan["page_size"]
+    page = {key: value for key, value in scan.items() if key not in ("modules", "page_size")}
+    page["modules"] = scan["modules"][offset:end]
+    page["total_modules"] = len(scan["modules"])
+    page["next_cursor"] = f"{scan_id}:{end}" if end < len(scan["modules"]) else None
+    return page
+
+
+def _load_project(directory: str, no_lock: bool, core: Optional[str]) -> dict:
+    """Read the modules, their installed versions and the core version of a project.
+
+    Returns:
+        The directory and the Project read by the shared scanner, or the
+        directory and an error message.
+    """
+    try:
+        project = _state.scanner.load_project(directory, use_lock=not no_lock, core=core)
+    except (DirectoryNotFoundException, NoComposerJSONFileException, ComposerV1Exception) as e:
+        return {"directory": directory, "error": e.message}
+    except Exception as e:
+        return {"directory": directory, "error": f"Failed to determine Drupal core version: {e}"}
+    return {"directory": directory, "project": project}
 
 
 # ---------------------------------------------------------------------------
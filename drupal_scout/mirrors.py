@@ -0,0 +1,124 @@
+import os
+import time
+
+# environment variable listing the metadata mirrors to prefer over packages.drupal.org, separated by spaces
+MIRRORS_ENV = "DRUPAL_SCOUT_MIRRORS"
+UPSTREAM_URL = 'https://packages.drupal.org/files/packages/8/p2/'
+
+# weight of the newest measurement in the moving average of the latency
+_SMOOTHING = 0.3
+
+
+def configured_mirrors() -> list[str]:
+    """
+    The mirrors listed in $DRUPAL_SCOUT_MIRRORS, in order of preference.
+    """
+    return os.environ.get(MIRRORS_ENV, "").split()
+
+
+class Endpoint:
+    """
+    A metadata endpoint: the base URL of a p2 repository, with its health and latency.
+    """
+
+    def __init__(self, base_url: str):
+        """
+        Initialize the endpoint.
+        :param base_url:    the URL the package paths are appended to
+        :type base_url:     str
+        """
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        # the moving average of the latency, None until a request succeeded
+        self.latency: float | None = None
+        self.unhealthy_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    def url_for(self, url: str) -> str:
+        """
+        Rewrite a packages.drupal.org URL to this endpoint.
+        :param url:     the upstream URL
+        :type url:      str
+        :return:        the URL on this endpoint
+        :rtype:         str
+        """
+        if url.startswith(UPSTREAM_URL):
+            return self.base_url + url[len(UPSTREAM_URL):]
+        return url
+
+    def record_success(self, latency: float) -> None:
+        self.requests += 1
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self.latency = latency if self.latency is None else _SMOOTHING * latency + (1 - _SMOOTHING) * self.latency
+
+    def record_failure(self, cooldown: float) -> None:
+        self.requests += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        # back off longer from an endpoint that keeps failing
+        self.unhealthy_until = time.monotonic() + cooldown * min(self.consecutive_failures, 10)
+
+    def stats(self) -> dict:
+        return {
+            "url": self.base_url,
+            "requests": self.requests,
+            "failures": self.failures,
+            "latency": round(self.latency, 4) if self.latency is not None else None,
+            "healthy": self.healthy,
+        }
+
+
+class EndpointPool:
+    """
+    An ordered list of metadata endpoints, ending with packages.drupal.org.
+    Every request goes to the healthy endpoint with the lowest latency; an endpoint that was not measured
+    yet is tried first, and ties go to the earlier endpoint. An endpoint that fails is skipped for a cooldown,
+    and the request fails over to the next candidate.
+    """
+
+    def __init__(self, mirrors: list[str], cooldown: float = 30.0):
+        """
+        Initialize the pool.
+        :param mirrors:     the base URLs of the mirrors, in order of preference
+        :type mirrors:      list[str]
+        :param cooldown:    the number of seconds a failed endpoint is skipped, growing with repeated failures
+        :type cooldown:     float
+        """
+        self.endpoints = [Endpoint(url) for url in dict.fromkeys(mirrors)]
+        if not any(endpoint.base_url == UPSTREAM_URL for endpoint in self.endpoints):
+            self.endpoints.append(Endpoint(UPSTREAM_URL))
+        self.cooldown = cooldown
+
+    def candidates(self) -> list[Endpoint]:
+        """
+        Get the endpoints in the order they are tried for a request: the healthy endpoints by latency,
+        then the unhealthy ones as a last resort, by the time they become healthy again.
+        :return:    the endpoints
+        :rtype:     list
+        """
+        order = {endpoint: index for index, endpoint in enumerate(self.endpoints)}
+        healthy = [endpoint for endpoint in self.endpoints if endpoint.healthy]
+        unhealthy = [endpoint for endpoint in self.endpoints if not endpoint.healthy]
+        healthy.sort(key=lambda endpoint: (endpoint.latency or 0.0, order[endpoint]))
+        unhealthy.sort(key=lambda endpoint: endpoint.unhealthy_until)
+        return healthy + unhealthy
+
+    def record_success(self, endpoint: Endpoint, latency: float) -> None:
+        endpoint.record_success(latency)
+
+    def record_failure(self, endpoint: Endpoint) -> None:
+        endpoint.record_failure(self.cooldown)
+
+    def stats(self) -> list[dict]:
+        """
+        Get the statistics of the endpoints.
+        :return:    the URL, requests, failures, latency and health of each endpoint, in configured order
+        :rtype:     list
+        """
+        return [endpoint.stats() for endpoint in self.endpoints]
@@ -5,6 +5,10 @@ class Module:
 
     active: bool = True
     failed: bool = False
+    # the scan deadline expired before the module was fetched
+    timed_out: bool = False
+    # the number of retried requests for the metadata of the module
+    retries: int = 0
 
     def __init__(self, name: str):
         """
@@ -16,3 +20,5 @@ class Module:
         self.version: str | None = None
         self.transitive_entries: list = []
         self.suitable_entries: list = []
+        # suitable entries whose drupal/* dependencies cannot be installed with the target core
+        self.blocked_entries: list = []
@@ -1,3 +1,4 @@
+import contextlib
 import io
 import sys
 import logging
@@ -46,9 +47,13 @@ class OutputHandler(ABC):
 class ConsoleOutputHandler(OutputHandler):
     """Outputs to standard streams natively, fully resolving streams dynamically at call-time."""
     
-    def __init__(self, out_stream=None, err_stream=None):
+    def __init__(self, out_stream=None, err_stream=None, force_terminal: Optional[bool] = None,
+                 width: Optional[int] = None):
         self._out_stream = out_stream
         self._err_stream = err_stream
+        # allow rendering for a remote terminal, e.g. when the scout daemon answers a thin client
+        self._force_terminal = force_terminal
+        self._width = width
 
     def _get_console(self, error: bool = False) -> Console:
         if error:
@@ -56,7 +61,7 @@ class ConsoleOutputHandler(OutputHandler):
         else:
             stream = self._out_stream if self._out_stream is not None else sys.stdout
         # rich Console handles stream formatting
-        return Console(file=stream)
+        return Console(file=stream, force_terminal=self._force_terminal, width=self._width)
 
     def print(self, message: str, error: bool = False):
         console = self._get_console(error)
@@ -93,12 +98,40 @@ class SilentOutputHandler(ConsoleOutputHandler):
 
     def progress_bar(self) -> ContextManager:
         """Silent output handler should not show a progress bar."""
-        import contextlib
-        @contextlib.contextmanager
-        def silent_progress():
-            class MockProgress:
-                def add_task(self, *args, **kwargs): return 0
-                def update(self, *args, **kwargs): pass
-                def advance(self, *args, **kwargs): pass
-            yield MockProgress()
         return silent_progress()
+
+class CapturedOutputHandler(ConsoleOutputHandler):
+    """Renders output into memory buffers for another terminal, e.g. a thin client of the scout daemon."""
+
+    def __init__(self, force_terminal: Optional[bool] = None, width: Optional[int] = None):
+        super().__init__(out_stream=io.StringIO(), err_stream=io.StringIO(),
+                         force_terminal=force_terminal, width=width)
+
+    @property
+    def out_stream(self) -> io.StringIO:
+        return self._out_stream
+
+    @property
+    def err_stream(self) -> io.StringIO:
+        return self._err_stream
+
+    @property
+    def stdout(self) -> str:
+        return self._out_stream.getvalue()
+
+    @property
+    def stderr(self) -> str:
+        return self._err_stream.getvalue()
+
+    def progress_bar(self) -> ContextManager:
+        """A live progress bar cannot be replayed by the client."""
+        return silent_progress()
+
+@contextlib.contextmanager
+def silent_progress():
+    """A progress bar stand-in that renders nothing."""
+    class MockProgress:
+        def add_task(self, *args, **kwargs): return 0
+        def update(self, *args, **kwargs): pass
+        def advance(self, *args, **kwargs): pass
+    yield MockProgress()
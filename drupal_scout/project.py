@@ -0,0 +1,99 @@
+import os
+import threading
+from typing import Any
+
+from . import codec
+from .cache import LRUCache
+
+
+def package_versions(composer_lock: dict) -> dict[str, str]:
+    """
+    Get the installed package versions recorded in the parsed contents of a composer.lock file.
+    :param composer_lock:   the parsed composer.lock file
+    :type composer_lock:    dict
+    :return:                the versions by package name
+    :rtype:                 dict
+    """
+    versions = {}
+    for package in composer_lock.get("packages") or []:
+        # keep the first occurrence, like the jq lookup it replaces
+        versions.setdefault(package.get("name"), package.get("version"))
+    return versions
+
+
+class ProjectFileCache:
+    """
+    Caches the parsed composer.json and composer.lock files of Drupal projects.
+    An entry is keyed by the file path and stays valid while the modification time and size of the file
+    are unchanged, so long-lived processes re-read a project only after it was edited.
+    The cache is safe to use from worker threads.
+    """
+
+    def __init__(self, max_size: int = 64):
+        """
+        Initialize the cache.
+        :param max_size:    the maximum number of cached files
+        :type max_size:     int
+        """
+        self.__entries = LRUCache(max_size=max_size)
+        self.__lock = threading.Lock()
+
+    def load(self, path: str) -> Any:
+        """
+        Get the parsed JSON contents of the file.
+        The returned object is shared between callers and must not be modified.
+        :param path:    the path to the JSON file
+        :type path:     str
+        :return:        the parsed contents
+        :raises:        FileNotFoundError, json.JSONDecodeError
+        """
+        return self._entry(path)["contents"]
+
+    def package_versions(self, path: str) -> dict[str, str]:
+        """
+        Get the installed package versions recorded in the composer.lock file.
+        :param path:    the path to the composer.lock file
+        :type path:     str
+        :return:        the versions by package name
+        :rtype:         dict
+        """
+        entry = self._entry(path)
+        versions = entry.get("package_versions")
+        if versions is None:
+            versions = package_versions(entry["contents"])
+            entry["package_versions"] = versions
+        return versions
+
+    def package_hints(self, path: str) -> dict[str, float]:
+        """
+        Get a rough hint of how large the metadata of each package recorded in the composer.lock file is:
+        the size of its lock entry. Packages with many releases and requirements tend to have large entries.
+        :param path:    the path to the composer.lock file
+        :type path:     str
+        :return:        the hints by package name
+        :rtype:         dict
+        """
+        entry = self._entry(path)
+        hints = entry.get("package_hints")
+        if hints is None:
+            hints = {package.get("name"): float(len(codec.dumps(package)))
+                     for package in entry["contents"].get("packages") or []}
+            entry["package_hints"] = hints
+        return hints
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+
+    def _entry(self, path: str) -> dict:
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self.__lock:
+            entry = self.__entries.get(path)
+        if entry is None or entry["signature"] != signature:
+            # parse outside the lock so that other files are not held up
+            entry = {"signature": signature, "contents": codec.load_file(path)}
+            with self.__lock:
+                self.__entries.set(path, entry)
+        return entry
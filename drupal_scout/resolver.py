@@ -0,0 +1,179 @@
+import asyncio
+import logging
+from typing import Iterable
+
+import aiohttp
+import jq
+
+from .constraints import VersionSet, parse_constraint, parse_version
+from .evaluation import parse_target
+from .exceptions import InvalidConstraintException, ModuleNotFoundException
+from .fetcher import MetadataFetcher
+from .module import Module
+from .worker import DEPENDENCIES_JQ
+
+logger = logging.getLogger(__name__)
+
+# marker for dependencies that could not be checked (fetch failure or a dependency cycle)
+_UNKNOWN = object()
+
+
+class DependencyResolver:
+    """
+    Resolves the drupal/* dependencies of the suitable entries of the modules.
+    The dependency graph is discovered from the p2 metadata in breadth-first waves: every wave
+    fetches the packages it discovered concurrently, and the shared fetcher deduplicates requests.
+    A suitable entry is kept only if each of its drupal/* dependencies has a release that is
+    compatible with the target core and whose own dependencies can be satisfied in turn.
+    """
+
+    def __init__(self, fetcher: MetadataFetcher, current_core: str, concurrency_limit: int = 10):
+        """
+        Initialize the resolver.
+        :param fetcher:             the metadata fetcher shared by the scan
+        :param current_core:        the target Drupal core version
+        :param concurrency_limit:   the maximum number of concurrent requests
+        """
+        self.fetcher = fetcher
+        self.current_core = current_core
+        self.concurrency_limit = concurrency_limit
+        # core-compatible releases per package, newest first; None when the package could not be fetched
+        self.releases: dict[str, list[tuple] | None] = {}
+        self.__memo: dict[tuple[str, VersionSet], object] = {}
+
+    async def resolve(self, modules: list[Module]) -> None:
+        """
+        Fetch the dependency graph and move the entries that cannot be co-installed
+        from module.suitable_entries to module.blocked_entries.
+        :param modules:     the evaluated modules
+        :type modules:      list[Module]
+        """
+        await self.prefetch(self._dependency_names(
+            entry.get('dependencies') for module in modules for entry in module.suitable_entries
+        ))
+        for module in modules:
+            suitable_entries = []
+            for entry in module.suitable_entries:
+                resolved, unresolved = self.resolve_entry(entry)
+                if unresolved:
+                    module.blocked_entries.append({**entry, 'unresolved_dependencies': unresolved})
+                else:
+                    suitable_entries.append({**entry, 'resolved_dependencies': resolved})
+            module.suitable_entries = suitable_entries
+
+    async def prefetch(self, names: Iterable[str]) -> None:
+        """
+        Fetch the packages and, wave by wave, the packages their compatible releases depend on.
+        :param names:   the names of the packages to start from
+        :type names:    Iterable[str]
+        """
+        semaphore = asyncio.Semaphore(self.concurrency_limit)
+        wave = set(names) - set(self.releases)
+        while wave:
+            async with asyncio.TaskGroup() as tg:
+                for name in wave:
+                    tg.create_task(self._load(name, semaphore))
+            wave = self._dependency_names(
+                dependencies for name in wave for _, _, dependencies in self.releases[name] or []
+            ) - set(self.releases)
+
+    def resolve_entry(self, entry: dict) -> tuple[dict, list]:
+        """
+        Pick an installable release for each drupal/* dependency of the entry.
+        :param entry:   the suitable entry
+        :type entry:    dict
+        :return:        the picked versions by dependency name, and the unresolvable dependency names
+        :rtype:         tuple
+        """
+        resolved, unresolved = {}, []
+        for name, constraint in (entry.get('dependencies') or {}).items():
+            picked, _ = self._pick(name, constraint, frozenset())
+            if picked is None:
+                unresolved.append(name)
+            elif picked is not _UNKNOWN:
+                resolved[name] = picked
+        return resolved, unresolved
+
+    def _pick(self, name: str, constraint: str, stack: frozenset) -> tuple[object, bool]:
+        """
+        Find the newest compatible release of the package allowed by the constraint,
+        whose own dependencies can be satisfied.
+        A dependency cycle is assumed satisfiable, so a result that met one depends on the packages
+        on the stack and is not memoized; the flag returned with the result tells whether it was.
+        """
+        releases = self.releases.get(name)
+        if releases is None:
+            return _UNKNOWN, True
+        if name in stack:
+            return _UNKNOWN, False
+        try:
+            allowed = parse_constraint(constraint)
+        except InvalidConstraintException:
+            allowed = VersionSet.any()
+        memo_key = (name, allowed)
+        if memo_key in self.__memo:
+            return self.__memo[memo_key], True
+        picked, memoizable = None, True
+        for key, release_version, dependencies in releases:
+            if key not in allowed:
+                continue
+            satisfied = True
+            for dependency, dependency_constraint in dependencies.items():
+                dependency_picked, dependency_memoizable = self._pick(
+                    dependency, dependency_constraint, stack | {name}
+                )
+                memoizable = memoizable and dependency_memoizable
+                if dependency_picked is None:
+                    satisfied = False
+                    break
+            if satisfied:
+                picked = release_version
+                break
+        if memoizable:
+            self.__memo[memo_key] = picked
+        return picked, memoizable
+
+    async def _load(self, name: str, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            try:
+                payload = await self.fetcher.fetch(name)
+            except ModuleNotFoundException:
+                self.releases[name] = []
+                return
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                logger.warning("Dependency %s could not be fetched, it is not checked: %s", name, exc)
+                self.releases[name] = None
+                return
+        self.releases[name] = self.find_compatible_releases(name, payload)
+
+    def find_compatible_releases(self, name: str, response_contents: dict) -> list[tuple]:
+        """
+        Find the releases of the package that are compatible with the target core.
+        :param name:                the name of the package
+        :type name:                 str
+        :param response_contents:   the p2 metadata of the package
+        :type response_contents:    dict
+        :return:                    (version key, version, dependencies) tuples, newest first
+        :rtype:                     list
+        """
+        core_key = parse_target(self.current_core)
+        releases = []
+        entries = jq.compile(
+            '.packages."' + name + '" // [] | .[] | select(.require != null) | {"version", '
+            '"requirement":.require."drupal/core", "dependencies":' + DEPENDENCIES_JQ + '}'
+        ).input(response_contents).all()
+        for entry in entries:
+            try:
+                key = parse_version(entry['version'])
+                requirement = entry['requirement']
+                if requirement and core_key is not None and core_key not in parse_constraint(requirement):
+                    continue
+            except InvalidConstraintException:
+                continue
+            releases.append((key, entry['version'], entry['dependencies'] or {}))
+        releases.sort(key=lambda release: release[0], reverse=True)
+        return releases
+
+    @staticmethod
+    def _dependency_names(dependency_maps: Iterable[dict | None]) -> set[str]:
+        return {name for dependencies in dependency_maps if dependencies for name in dependencies}
@@ -0,0 +1,77 @@
+import random
+import threading
+
+# the backoff before the n-th retry is drawn from [0, min(_MAX_BACKOFF, _BACKOFF_BASE * 2 ** (n - 1))]
+_BACKOFF_BASE = 1.0
+_MAX_BACKOFF = 30.0
+
+
+def full_jitter(retry: int, base: float = _BACKOFF_BASE, cap: float = _MAX_BACKOFF) -> float:
+    """
+    Get the backoff before a retry, drawn uniformly between zero and the exponential backoff,
+    so that the retries of concurrent requests do not arrive at the upstream together.
+    :param retry:   the number of the retry, starting at 1
+    :type retry:    int
+    :param base:    the exponential backoff of the first retry, in seconds
+    :type base:     float
+    :param cap:     the longest backoff, in seconds
+    :type cap:      float
+    :return:        the backoff in seconds
+    :rtype:         float
+    """
+    return random.uniform(0, min(cap, base * 2 ** (retry - 1)))
+
+
+class RetryBudget:
+    """
+    Limits the retries of all requests sharing the budget to a share of the successful requests.
+    Every successful request deposits `ratio` tokens and every retry withdraws one, so under partial
+    failure the retries add at most `ratio` to the upstream traffic, plus the initial tokens.
+    """
+
+    def __init__(self, ratio: float = 0.1, initial_tokens: float = 10, max_tokens: float = 100):
+        """
+        Initialize the budget.
+        :param ratio:           the number of retries earned by a successful request
+        :type ratio:            float
+        :param initial_tokens:  the number of retries available before any request succeeded
+        :type initial_tokens:   float
+        :param max_tokens:      the maximum number of retries saved up
+        :type max_tokens:       float
+        """
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = min(float(initial_tokens), max_tokens)
+        self.retries = 0
+        # the number of retries refused because the budget was spent
+        self.exhausted = 0
+        self.__lock = threading.Lock()
+
+    def record_success(self) -> None:
+        """
+        Deposit the tokens of a successful request.
+        """
+        with self.__lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_retry(self) -> bool:
+        """
+        Withdraw a token for a retry.
+        :return:    whether the retry may be sent
+        :rtype:     bool
+        """
+        with self.__lock:
+            if self.tokens < 1:
+                self.exhausted += 1
+                return False
+            self.tokens -= 1
+            self.retries += 1
+            return True
+
+    def stats(self) -> dict:
+        """
+        Get the statistics of the budget.
+        :return:    the available tokens, the retries sent and the retries refused
+        :rtype:     dict
+        """
+        return {"tokens": round(self.tokens, 2), "retries": self.retries, "exhausted": self.exhausted}
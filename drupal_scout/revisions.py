@@ -0,0 +1,51 @@
+import subprocess
+from typing import Any
+
+from . import codec
+from .exceptions import RevisionNotFoundException
+
+
+def resolve_revision(directory: str, revision: str) -> str:
+    """
+    Resolve a git revision of the repository containing the project to its commit.
+    :param directory:   the directory of the Drupal project
+    :type directory:    str
+    :param revision:    the revision, e.g. a branch, tag or commit
+    :type revision:     str
+    :return:            the commit hash
+    :rtype:             str
+    :raises:            RevisionNotFoundException if git is missing or the revision does not exist
+    """
+    try:
+        completed = subprocess.run(
+            ["git", "-C", directory, "rev-parse", "--verify", "--quiet", "{}^{{commit}}".format(revision)],
+            capture_output=True, text=True
+        )
+    except FileNotFoundError:
+        raise RevisionNotFoundException("git is not installed; it is needed to read the revision {}.".format(revision))
+    if completed.returncode != 0:
+        raise RevisionNotFoundException(
+            "{} is not a revision of a git repository containing {}.".format(revision, directory)
+        )
+    return completed.stdout.strip()
+
+
+def load_file_at_revision(directory: str, commit: str, filename: str) -> Any | None:
+    """
+    Read and parse a JSON file of the project as it was at a commit.
+    :param directory:   the directory of the Drupal project
+    :type directory:    str
+    :param commit:      the commit, see resolve_revision()
+    :type commit:       str
+    :param filename:    the path of the file relative to the project directory
+    :type filename:     str
+    :return:            the parsed contents, or None if the file did not exist at the commit
+    :raises:            json.JSONDecodeError
+    """
+    # "./" makes the path relative to the project directory instead of the repository root
+    completed = subprocess.run(
+        ["git", "-C", directory, "show", "{}:./{}".format(commit, filename)], capture_output=True
+    )
+    if completed.returncode != 0:
+        return None
+    return codec.loads(completed.stdout)
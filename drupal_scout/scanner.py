@@ -0,0 +1,340 @@
+"""
+The long-lived scanner: one object that owns the HTTP session, the metadata and result caches and the
+parsed project files, and runs any number of scans with explicit parameters.
+
+    async with Scanner() as scanner:
+        project = scanner.load_project("/srv/site")
+        workers_manager = await scanner.scan_project(project)
+        for module in project.modules.values():
+            print(module.name, [entry["version"] for entry in module.suitable_entries])
+
+The CLI, the scout daemon and the MCP server are built on it; the later scans of a process are served
+from the warm caches of the earlier ones.
+"""
+
+import asyncio
+import os
+from typing import AsyncIterator, Iterable
+
+import jq
+
+from .cache import LRUCache
+from .exceptions import ComposerV1Exception, DirectoryNotFoundException, NoComposerJSONFileException
+from .fetcher import MetadataFetcher
+from .module import Module
+from .output import SilentOutputHandler
+from .project import ProjectFileCache
+from .scanning import iter_scan
+from .scheduling import POLICY_LONGEST_FIRST, ScanHistory
+from .summary import ScanSummary
+from .workers_manager import WorkersManager
+
+# parsed module metadata is reused for this many seconds
+METADATA_CACHE_TTL = 900
+METADATA_CACHE_SIZE = 4096
+# evaluated module entries, keyed by module, payload validator, installed version, core and lock flag
+RESULTS_CACHE_SIZE = 4096
+# the default and minimal supported Drupal core version for upgrade
+DEFAULT_CORE_VERSION = "8.8"
+
+
+def module_requirements(composer_json: dict, versions: dict[str, str]) -> dict[str, tuple]:
+    """
+    Pair the requirement of each required drupal/* module, except the drupal/core* packages,
+    with its installed version.
+    :param composer_json:   the parsed composer.json file
+    :type composer_json:    dict
+    :param versions:        the installed versions by package name, see ProjectFileCache.package_versions()
+    :type versions:         dict
+    :return:                the (requirement, installed version) pair by module name
+    :rtype:                 dict
+    """
+    return {
+        name: (constraint, versions.get(name))
+        for name, constraint in (composer_json.get("require") or {}).items()
+        if name.startswith("drupal/") and not name.startswith("drupal/core")
+    }
+
+
+class Project:
+    """
+    A Drupal project read for a scan: its core version, its required modules with their installed versions,
+    and the scheduling hints of its composer.lock file.
+    """
+
+    def __init__(self, directory: str, drupal_core_version: str, modules: dict[str, Module],
+                 lock_file_used: bool, hints: dict[str, float] | None = None):
+        """
+        :param directory:               the directory of the project
+        :param drupal_core_version:     the core version the modules are evaluated against
+        :param modules:                 the required modules by name
+        :param lock_file_used:          whether the installed versions were read from composer.lock
+        :param hints:                   the lock-file scheduling hints, see ProjectFileCache.package_hints()
+        """
+        self.directory = directory
+        self.drupal_core_version = drupal_core_version
+        self.modules = modules
+        self.lock_file_used = lock_file_used
+        self.hints = hints
+
+
+class Scanner:
+    """
+    Scans Drupal projects and modules with one warm HTTP session, metadata cache, result cache and
+    project file cache. Use it as an async context manager, or call close() when done.
+    """
+
+    def __init__(self, fetcher: MetadataFetcher | None = None, project_files: ProjectFileCache | None = None,
+                 results: LRUCache | None = None, history: ScanHistory | None = None):
+        """
+        Initialize the scanner.
+        :param fetcher:         the metadata fetcher; by default one with a pooled session and a metadata cache
+        :type fetcher:          MetadataFetcher | None
+        :param project_files:   the cache of parsed composer files
+        :type project_files:    ProjectFileCache | None
+        :param results:         the cache of evaluation results
+        :type results:          LRUCache | None
+        :param history:         the request measurements of previous scans, used to start the slowest modules first
+        :type history:          ScanHistory | None
+        """
+        self.fetcher = fetcher or MetadataFetcher(
+            cache=LRUCache(max_size=METADATA_CACHE_SIZE, ttl=METADATA_CACHE_TTL), keep_session=True
+        )
+        self.project_files = project_files or ProjectFileCache()
+        self.results = results if results is not None else LRUCache(max_size=RESULTS_CACHE_SIZE)
+        self.history = history or ScanHistory()
+
+    async def __aenter__(self) -> 'Scanner':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        Close the pooled session of the fetcher.
+        """
+        await self.fetcher.close()
+
+    @staticmethod
+    def is_composer2(directory: str) -> bool:
+        """
+        Check if the Drupal project uses Composer 2.
+        :param directory:   the directory of the project
+        :type directory:    str
+        :return:            True if the Drupal project uses Composer 2, False otherwise
+        :rtype:             bool
+        """
+        # the vendor/composer/platform_check.php file is only written by Composer 2
+        return os.path.isfile(os.path.join(directory, "vendor", "composer", "platform_check.php"))
+
+    def drupal_core_version(self, directory: str, use_lock: bool = True) -> str | None:
+        """
+        Get the Drupal core version of the project: the installed one from composer.lock,
+        or the drupal/core or drupal/core-recommended requirement of composer.json.
+        :param directory:   the directory of the project
+        :type directory:    str
+        :param use_lock:    whether to read composer.lock rather than composer.json
+        :type use_lock:     bool
+        :return:            the core version, or None if composer.json does not require the core
+        :rtype:             str | None
+        """
+        if use_lock:
+            composer_lock = self.project_files.load(os.path.join(directory, "composer.lock"))
+            return jq.compile(".packages[] | select(.name == \"drupal/core\") | .version").input(composer_lock).first()
+        require = self.project_files.load(os.path.join(directory, "composer.json"))["require"]
+        constraint = require.get("drupal/core") or require.get("drupal/core-recommended")
+        # clear special characters from the version
+        return constraint.replace("^", "").replace("~", "") if constraint else None
+
+    def detect_drupal_core_version(self, directory: str) -> str | None:
+        """
+        Get the Drupal core version from composer.lock if it exists, from composer.json otherwise.
+        :param directory:   the directory of the project
+        :type directory:    str
+        :return:            the core version, or None if it cannot be determined
+        :rtype:             str | None
+        """
+        try:
+            if os.path.isfile(os.path.join(directory, "composer.lock")):
+                return self.drupal_core_version(directory, use_lock=True)
+            if os.path.isfile(os.path.join(directory, "composer.json")):
+                return self.drupal_core_version(directory, use_lock=False)
+        except Exception:
+            pass
+        return None
+
+    def required_modules(self, directory: str) -> dict[str, Module]:
+        """
+        Get the drupal/* modules required by composer.json, except the drupal/core* packages.
+        :param directory:   the directory of the project
+        :type directory:    str
+        :return:            the modules by name
+        :rtype:             dict
+        """
+        composer_json = self.project_files.load(os.path.join(directory, "composer.json"))
+        found_modules = jq.compile(".require | keys | map(select(startswith(\"drupal/\"))) | map(select("
+                                   "startswith(\"drupal/core\") | not))").input(composer_json).first()
+        return {name: Module(name) for name in found_modules}
+
+    def installed_versions(self, directory: str) -> dict[str, str]:
+        """
+        Get the installed package versions recorded in the composer.lock file of the project.
+        :param directory:   the directory of the project
+        :type directory:    str
+        :return:            the versions by package name
+        :rtype:             dict
+        """
+        return self.project_files.package_versions(os.path.join(directory, "composer.lock"))
+
+    def module_requirements(self, directory: str, use_lock: bool = True) -> dict[str, tuple]:
+        """
+        Get the requirement in composer.json and the version in composer.lock of each required module.
+        :param directory:   the directory of the project
+        :type directory:    str
+        :param use_lock:    whether to read the installed versions from composer.lock, if it exists
+        :type use_lock:     bool
+        :return:            the (requirement, installed version) pair by module name
+        :rtype:             dict
+        """
+        composer_json = self.project_files.load(os.path.join(directory, "composer.json"))
+        use_lock = use_lock and os.path.isfile(os.path.join(directory, "composer.lock"))
+        return module_requirements(composer_json, self.installed_versions(directory) if use_lock else {})
+
+    def lock_hints(self, directory: str) -> dict[str, float]:
+        """
+        Get the scheduling hints of the composer.lock file of the project, see ProjectFileCache.package_hints().
+        :param directory:   the directory of the project
+        :type directory:    str
+        :return:            the hints by package name
+        :rtype:             dict
+        """
+        return self.project_files.package_hints(os.path.join(directory, "composer.lock"))
+
+    def load_project(self, directory: str, use_lock: bool = True, core: str | None = None) -> Project:
+        """
+        Read the core version, the required modules and their installed versions of a project.
+        Without composer.lock, the core version is read from the requirements of composer.json.
+        :param directory:   the directory of the project
+        :type directory:    str
+        :param use_lock:    whether to read the installed versions from composer.lock, if it exists
+        :type use_lock:     bool
+        :param core:        the core version to evaluate the modules against instead of the installed one
+        :type core:         str | None
+        :return:            the project
+        :rtype:             Project
+        :raises DirectoryNotFoundException:     if the directory does not exist
+        :raises NoComposerJSONFileException:    if the directory does not contain composer.json
+        :raises ComposerV1Exception:            if the project uses Composer v1
+        """
+        if not os.path.isdir(directory):
+            raise DirectoryNotFoundException("The directory {} does not exist.".format(directory))
+        if not os.path.isfile(os.path.join(directory, "composer.json")):
+            raise NoComposerJSONFileException()
+        if not self.is_composer2(directory):
+            raise ComposerV1Exception()
+
+        lock_file_used = use_lock and os.path.isfile(os.path.join(directory, "composer.lock"))
+        if core:
+            core_version = core.replace("^", "").replace("~", "")
+        else:
+            core_version = self.drupal_core_version(directory, use_lock=lock_file_used) or DEFAULT_CORE_VERSION
+        modules = self.required_modules(directory)
+        if lock_file_used and modules:
+            versions = self.installed_versions(directory)
+            for module in modules.values():
+                module.version = versions.get(module.name)
+        return Project(
+            directory, core_version, modules, lock_file_used,
+            hints=self.lock_hints(directory) if lock_file_used else None
+        )
+
+    async def scan(self, modules: Iterable[Module], current_core: str, *, use_lock_version: bool = False,
+                   concurrency_limit: int = 10, output=None, resolve_dependencies: bool = False,
+                   deadline: float | None = None, order: str = POLICY_LONGEST_FIRST,
+                   hints: dict[str, float] | None = None, summary: ScanSummary | None = None,
+                   fail_fast: bool = False, semaphore: asyncio.Semaphore | None = None) -> WorkersManager:
+        """
+        Scan the modules and fill in their results. The history is updated but not saved; save it with
+        history.save() when convenient, e.g. off the event loop.
+        :param modules:                 the modules
+        :type modules:                  Iterable[Module]
+        :param current_core:            the target Drupal core version
+        :type current_core:             str
+        :param use_lock_version:        whether the installed versions of the modules limit the suitable entries
+        :type use_lock_version:         bool
+        :param concurrency_limit:       the maximum number of concurrent requests
+        :type concurrency_limit:        int
+        :param output:                  the output handler; silent by default
+        :param resolve_dependencies:    whether to resolve the drupal/* dependencies of the suitable entries
+        :type resolve_dependencies:     bool
+        :param deadline:                the number of seconds after which the remaining modules time out
+        :type deadline:                 float | None
+        :param order:                   the scheduling policy, see scheduling.ORDER_POLICIES
+        :type order:                    str
+        :param hints:                   the lock-file scheduling hints
+        :type hints:                    dict | None
+        :param summary:                 the summary counting the modules, which then drop their entries
+        :type summary:                  ScanSummary | None
+        :param fail_fast:               whether to stop at the first module without a compatible release
+        :type fail_fast:                bool
+        :param semaphore:               the semaphore shared with other scans, instead of concurrency_limit
+        :type semaphore:                asyncio.Semaphore | None
+        :return:                        the workers manager that ran the scan, with its profile and retries
+        :rtype:                         WorkersManager
+        """
+        workers_manager = WorkersManager(
+            modules=list(modules),
+            current_core=current_core,
+            use_lock_version=use_lock_version,
+            concurrency_limit=concurrency_limit,
+            output=output or SilentOutputHandler(),
+            resolve_dependencies=resolve_dependencies,
+            fetcher=self.fetcher,
+            semaphore=semaphore,
+            results=self.results,
+            deadline=deadline,
+            order=order,
+            history=self.history,
+            hints=hints,
+            summary=summary,
+            fail_fast=fail_fast
+        )
+        await workers_manager.run()
+        return workers_manager
+
+    async def scan_project(self, project: Project, **options) -> WorkersManager:
+        """
+        Scan the modules of a project against its core version, see scan() for the options.
+        :param project:     the project, see load_project()
+        :type project:      Project
+        :return:            the workers manager that ran the scan
+        :rtype:             WorkersManager
+        """
+        return await self.scan(
+            project.modules.values(), project.drupal_core_version,
+            use_lock_version=project.lock_file_used, hints=project.hints, **options
+        )
+
+    def iter_scan(self, modules: Iterable[Module | str], current_core: str, *, concurrency_limit: int = 10,
+                  deadline: float | None = None, order: str = POLICY_LONGEST_FIRST) -> AsyncIterator[dict]:
+        """
+        Scan the modules and yield the JSON result of each module as soon as it is evaluated,
+        see scanning.iter_scan().
+        :param modules:             the modules, or their names
+        :type modules:              Iterable[Module | str]
+        :param current_core:        the target Drupal core version
+        :type current_core:         str
+        :param concurrency_limit:   the maximum number of concurrent requests
+        :type concurrency_limit:    int
+        :param deadline:            the number of seconds after which the remaining modules are yielded as timed out
+        :type deadline:             float | None
+        :param order:               the scheduling policy, see scheduling.ORDER_POLICIES
+        :type order:                str
+        :return:                    the JSON result of each module, in completion order
+        :rtype:                     AsyncIterator[dict]
+        """
+        return iter_scan(
+            modules, current_core, fetcher=self.fetcher, results=self.results, history=self.history,
+            concurrency_limit=concurrency_limit, deadline=deadline, order=order
+        )
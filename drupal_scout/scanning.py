@@ -0,0 +1,77 @@
+"""
+The library API: scan modules and consume their results as they complete.
+
+    async with aiohttp.ClientSession() as session:
+        async for result in iter_scan(["drupal/token", "drupal/webform"], "11.0.0", session=session):
+            print(result["name"], [entry["version"] for entry in result["suitable_entries"]])
+"""
+
+import contextlib
+from typing import AsyncIterator, Iterable
+
+import aiohttp
+
+from .cache import LRUCache
+from .fetcher import MetadataFetcher
+from .formatters.jsonformatter import JSONFormatter
+from .module import Module
+from .output import SilentOutputHandler
+from .scheduling import POLICY_LONGEST_FIRST, ScanHistory
+from .workers_manager import WorkersManager
+
+
+async def iter_scan(modules: Iterable[Module | str], current_core: str, *,
+                    session: aiohttp.ClientSession | None = None, metadata_cache: LRUCache | None = None,
+                    results: LRUCache | None = None, fetcher: MetadataFetcher | None = None,
+                    concurrency_limit: int = 10, deadline: float | None = None,
+                    order: str = POLICY_LONGEST_FIRST, history: ScanHistory | None = None) -> AsyncIterator[dict]:
+    """
+    Scan the modules and yield the result of each module as soon as it is evaluated, in completion order.
+    Breaking out of the loop or cancelling the consuming task cancels the remaining requests; use
+    contextlib.aclosing() to cancel them right away rather than when the iterator is garbage-collected.
+    Pass a session and caches, or a configured fetcher, to reuse connections and metadata across scans.
+    :param modules:             the modules, or their names
+    :type modules:              Iterable[Module | str]
+    :param current_core:        the target Drupal core version
+    :type current_core:         str
+    :param session:             the HTTP session for the requests; by default one is opened for the scan
+    :type session:              aiohttp.ClientSession | None
+    :param metadata_cache:      the cache of parsed metadata payloads shared across scans
+    :type metadata_cache:       LRUCache | None
+    :param results:             the cache of evaluation results shared across scans
+    :type results:              LRUCache | None
+    :param fetcher:             the fetcher to use instead of session and metadata_cache
+    :type fetcher:              MetadataFetcher | None
+    :param concurrency_limit:   the maximum number of concurrent requests
+    :type concurrency_limit:    int
+    :param deadline:            the number of seconds after which the remaining modules are yielded as timed out
+    :type deadline:             float | None
+    :param order:               the scheduling policy, see scheduling.ORDER_POLICIES
+    :type order:                str
+    :param history:             the request measurements of previous scans, updated with this scan
+    :type history:              ScanHistory | None
+    :return:                    the JSON result of each module, as in the JSON output
+    :rtype:                     AsyncIterator[dict]
+    """
+    owns_fetcher = fetcher is None
+    if fetcher is None:
+        # without a session of the caller, one pooled session serves the whole scan
+        fetcher = MetadataFetcher(session=session, cache=metadata_cache, keep_session=session is None)
+    workers_manager = WorkersManager(
+        modules=[module if isinstance(module, Module) else Module(module) for module in modules],
+        concurrency_limit=concurrency_limit,
+        output=SilentOutputHandler(),
+        current_core=current_core,
+        fetcher=fetcher,
+        results=results,
+        deadline=deadline,
+        order=order,
+        history=history,
+    )
+    try:
+        async with contextlib.aclosing(workers_manager.iter_completed()) as completed:
+            async for module in completed:
+                yield JSONFormatter.module_result(module)
+    finally:
+        if owns_fetcher:
+            await fetcher.close()
@@ -0,0 +1,166 @@
+import logging
+import os
+import tempfile
+import threading
+from typing import Iterable
+
+from . import codec
+from .module import Module
+
+logger = logging.getLogger(__name__)
+
+# the order in which the workers are started
+POLICY_LONGEST_FIRST = "longest-first"
+POLICY_DECLARED = "declared"
+ORDER_POLICIES = (POLICY_LONGEST_FIRST, POLICY_DECLARED)
+
+# environment variable overriding the location of the scan history
+HISTORY_ENV = "DRUPAL_SCOUT_HISTORY"
+# weight of the newest measurement in the moving average of the latency
+_SMOOTHING = 0.5
+
+
+def default_history_path() -> str:
+    """
+    The scan history file: $DRUPAL_SCOUT_HISTORY, or drupal-scout/history.json in the user cache directory.
+    """
+    if os.environ.get(HISTORY_ENV):
+        return os.environ[HISTORY_ENV]
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_dir, "drupal-scout", "history.json")
+
+
+class ScanHistory:
+    """
+    The payload sizes and request latencies of the modules, recorded by previous scans.
+    The history is loaded lazily and written back with save(); it is safe to use from worker threads.
+    """
+
+    def __init__(self, path: str | None = None):
+        """
+        Initialize the history.
+        :param path:    the history file, defaults to default_history_path() at the time of use
+        :type path:     str | None
+        """
+        self.__path = path
+        self.__modules: dict[str, dict] | None = None
+        self.__dirty = False
+        self.__lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        return self.__path or default_history_path()
+
+    def get(self, name: str) -> dict | None:
+        """
+        Get the recorded measurements of the module.
+        :param name:    the name of the module
+        :type name:     str
+        :return:        the "latency" in seconds and the payload "size" in bytes, or None
+        :rtype:         dict | None
+        """
+        return self._modules().get(name)
+
+    def record(self, name: str, latency: float, size: int) -> None:
+        """
+        Record a measurement of the module; the latency is smoothed over the runs.
+        :param name:        the name of the module
+        :type name:         str
+        :param latency:     the request latency in seconds
+        :type latency:      float
+        :param size:        the payload size in bytes
+        :type size:         int
+        """
+        modules = self._modules()
+        with self.__lock:
+            previous = modules.get(name)
+            if previous is not None and previous.get("latency") is not None:
+                latency = _SMOOTHING * latency + (1 - _SMOOTHING) * previous["latency"]
+            modules[name] = {"latency": latency, "size": size}
+            self.__dirty = True
+
+    def save(self) -> None:
+        """
+        Write the history back to its file, if it changed. Failures are logged, not raised.
+        """
+        with self.__lock:
+            if not self.__dirty or self.__modules is None:
+                return
+            contents = codec.dumps({"modules": self.__modules})
+            self.__dirty = False
+        try:
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            # replace the file atomically, so that concurrent scans never read a partial history
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".history-")
+            with os.fdopen(fd, "w") as f:
+                f.write(contents)
+            os.replace(tmp_path, self.path)
+        except OSError as exc:
+            logger.debug("The scan history could not be saved to %s: %s", self.path, exc)
+
+    def _modules(self) -> dict[str, dict]:
+        with self.__lock:
+            if self.__modules is None:
+                try:
+                    self.__modules = dict(codec.load_file(self.path).get("modules") or {})
+                except (OSError, ValueError, AttributeError):
+                    self.__modules = {}
+            return self.__modules
+
+
+def expected_cost(module: Module, history: ScanHistory | None, hints: dict[str, float]) -> tuple[str, float]:
+    """
+    Estimate how long the module takes to scan.
+    :param module:      the module
+    :type module:       Module
+    :param history:     the scan history, if any
+    :type history:      ScanHistory | None
+    :param hints:       the lock-file hints by module name
+    :type hints:        dict
+    :return:            the source of the estimate ("history", "lock" or "none") and its value: the latency
+                        in seconds for the history, the relative size of the lock entry for the lock hints
+    :rtype:             tuple
+    """
+    measured = history.get(module.name) if history is not None else None
+    if measured is not None:
+        return "history", measured.get("latency") or 0.0
+    if module.name in hints:
+        return "lock", hints[module.name]
+    return "none", 0.0
+
+
+def order_modules(modules: Iterable[Module], policy: str = POLICY_LONGEST_FIRST,
+                  history: ScanHistory | None = None, hints: dict[str, float] | None = None) -> list[Module]:
+    """
+    Order the modules in which the workers are started.
+    The longest-first policy starts the modules without history first, as any of them may be long,
+    largest lock entry first; then the modules with history, by latency, longest first, and by payload size,
+    largest first, between equal latencies.
+    The declared policy keeps the composer.json order.
+    :param modules:     the modules in declared order
+    :type modules:      Iterable[Module]
+    :param policy:      one of ORDER_POLICIES
+    :type policy:       str
+    :param history:     the scan history, if any
+    :type history:      ScanHistory | None
+    :param hints:       the lock-file hints by module name
+    :type hints:        dict | None
+    :return:            the modules in scheduling order
+    :rtype:             list
+    """
+    modules = list(modules)
+    if policy == POLICY_DECLARED:
+        return modules
+    if policy != POLICY_LONGEST_FIRST:
+        raise ValueError("Unknown scheduling policy: {}".format(policy))
+    hints = hints or {}
+
+    def key(module: Module) -> tuple[int, float, int]:
+        source, value = expected_cost(module, history, hints)
+        if source != "history":
+            return 0, -value, 0
+        return 1, -value, -(history.get(module.name).get("size") or 0)
+
+    # sorted() is stable, so ties keep the declared order
+    return sorted(modules, key=key)
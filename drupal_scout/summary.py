@@ -0,0 +1,59 @@
+from packaging import version
+
+from .module import Module
+
+# the counters of a summary, in output order
+SUMMARY_FIELDS = ("total", "compatible", "incompatible", "inactive", "failed", "timed_out", "upgradable_in_place")
+
+
+def _major(text: str | None) -> int | None:
+    try:
+        return version.parse(text).release[0] if text else None
+    except (version.InvalidVersion, TypeError):
+        return None
+
+
+class ScanSummary:
+    """
+    Running aggregates of a scan: how many modules are compatible with the target core, incompatible,
+    not active, failed or timed out, and how many compatible modules have a suitable release in the major
+    version that is installed, which a plain composer update reaches.
+    The summary only keeps the counters, so its size does not grow with the scanned modules.
+    """
+
+    def __init__(self):
+        self.counts = dict.fromkeys(SUMMARY_FIELDS, 0)
+
+    def add(self, module: Module) -> None:
+        """
+        Count an evaluated module.
+        :param module:  the module
+        :type module:   Module
+        """
+        self.counts["total"] += 1
+        if module.timed_out:
+            self.counts["timed_out"] += 1
+        elif module.failed:
+            self.counts["failed"] += 1
+        elif module.active is not True:
+            self.counts["inactive"] += 1
+        elif module.suitable_entries:
+            self.counts["compatible"] += 1
+            installed_major = _major(module.version)
+            if installed_major is not None and any(
+                    _major(entry["version"]) == installed_major for entry in module.suitable_entries):
+                self.counts["upgradable_in_place"] += 1
+        else:
+            self.counts["incompatible"] += 1
+
+    def merge(self, other: 'ScanSummary') -> None:
+        """
+        Add the counters of another summary, e.g. of another project.
+        :param other:   the other summary
+        :type other:    ScanSummary
+        """
+        for field in SUMMARY_FIELDS:
+            self.counts[field] += other.counts[field]
+
+    def as_dict(self) -> dict:
+        return dict(self.counts)
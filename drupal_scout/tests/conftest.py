@@ -18,3 +18,9 @@ def _patch_aiohttp_clientresponse_init_stream_writer():
         yield
     finally:
         ClientResponse.__init__ = original_init  # type: ignore[method-assign]
+
+
+@pytest.fixture(autouse=True)
+def _isolate_scan_history(tmp_path, monkeypatch):
+    """Keep the scan history of the tests out of the user cache directory."""
+    monkeypatch.setenv("DRUPAL_SCOUT_HISTORY", str(tmp_path / "history.json"))
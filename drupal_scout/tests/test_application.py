@@ -1,3 +1,4 @@
+import asyncio
 import argparse
 import tempfile
 import json
@@ -147,7 +148,7 @@ async def test_run_success_flow():
         json.dump(composer_data, f)
         
     with patch('drupal_scout.application.FormatterFactory') as MockFormatterFactory, \
-         patch('drupal_scout.application.WorkersManager') as MockWorkersManager:
+         patch('drupal_scout.scanner.WorkersManager') as MockWorkersManager:
         MockWorkersManager.return_value.run = AsyncMock()
         # Mock sys.argv to emulate CLI run
         with patch('sys.argv', ['drupal-scout', '-d', temp_dir.name, '-n']):
@@ -349,7 +350,7 @@ async def test_run_with_lock_file():
             json.dump(lock_data, f)
 
         with patch('drupal_scout.application.FormatterFactory') as MockFormatterFactory, \
-             patch('drupal_scout.application.WorkersManager') as MockWorkersManager:
+             patch('drupal_scout.scanner.WorkersManager') as MockWorkersManager:
             MockWorkersManager.return_value.run = AsyncMock()
             with patch('sys.argv', ['drupal-scout', '-d', temp_dir]):
                 await app.run()
@@ -510,7 +511,7 @@ async def test_run_single_module_targeted_scan():
     """Passing one module via CLI triggers a targeted scan."""
     app = Application()
     with patch('drupal_scout.application.FormatterFactory') as MockFormatterFactory, \
-         patch('drupal_scout.application.WorkersManager') as MockWorkersManager:
+         patch('drupal_scout.scanner.WorkersManager') as MockWorkersManager:
         MockWorkersManager.return_value.run = AsyncMock()
         with patch('sys.argv', ['drupal-scout', '--core', '10.0.0', '--modules', 'drupal/paragraphs']):
             await app.run()
@@ -528,7 +529,7 @@ async def test_run_multiple_modules_targeted_scan():
     """Passing multiple modules triggers concurrent processing of all specified modules."""
     app = Application()
     with patch('drupal_scout.application.FormatterFactory') as MockFormatterFactory, \
-         patch('drupal_scout.application.WorkersManager') as MockWorkersManager:
+         patch('drupal_scout.scanner.WorkersManager') as MockWorkersManager:
         MockWorkersManager.return_value.run = AsyncMock()
         with patch('sys.argv', ['drupal-scout', '--core', '10.0.0', '--modules', 'drupal/webform', 'drupal/ctools']):
             await app.run()
@@ -555,7 +556,7 @@ async def test_run_targeted_scan_requires_core_version():
             }, f)
 
         with patch('drupal_scout.application.FormatterFactory') as MockFormatterFactory, \
-             patch('drupal_scout.application.WorkersManager') as MockWorkersManager:
+             patch('drupal_scout.scanner.WorkersManager') as MockWorkersManager:
             MockWorkersManager.return_value.run = AsyncMock()
             with patch('sys.argv', ['drupal-scout', '-d', temp_dir, '--modules', 'drupal/webform']):
                 await app.run()
@@ -573,7 +574,7 @@ async def test_run_targeted_scan_skips_composer_parsing():
     """Targeted scan should not parse project required modules or check Composer 2."""
     app = Application()
     with patch('drupal_scout.application.FormatterFactory') as MockFormatterFactory, \
-         patch('drupal_scout.application.WorkersManager') as MockWorkersManager:
+         patch('drupal_scout.scanner.WorkersManager') as MockWorkersManager:
         MockWorkersManager.return_value.run = AsyncMock()
         with patch('sys.argv', ['drupal-scout', '--core', '10.0.0', '--modules', 'drupal/webform']):
             with patch.object(app, 'get_required_modules') as mock_get_modules, \
@@ -590,7 +591,7 @@ async def test_run_targeted_scan_with_format_json():
     """Targeted scan respects --format flag."""
     app = Application()
     with patch('drupal_scout.application.FormatterFactory') as MockFormatterFactory, \
-         patch('drupal_scout.application.WorkersManager') as MockWorkersManager:
+         patch('drupal_scout.scanner.WorkersManager') as MockWorkersManager:
         MockWorkersManager.return_value.run = AsyncMock()
         with patch('sys.argv', ['drupal-scout', '--core', '10.0.0', '-f', 'json', '--modules', 'drupal/webform']):
             await app.run()
@@ -612,7 +613,7 @@ async def test_run_targeted_scan_core_override_wins_over_auto_detection():
             }, f)
 
         with patch('drupal_scout.application.FormatterFactory') as MockFormatterFactory, \
-             patch('drupal_scout.application.WorkersManager') as MockWorkersManager:
+             patch('drupal_scout.scanner.WorkersManager') as MockWorkersManager:
             MockWorkersManager.return_value.run = AsyncMock()
             with patch('sys.argv', [
                 'drupal-scout', '-d', temp_dir, '--core', '10.0.0', '--modules', 'drupal/webform'
@@ -639,7 +640,7 @@ async def test_run_targeted_scan_without_local_module_version_keeps_upstream_onl
             }, f)
 
         with patch('drupal_scout.application.FormatterFactory') as MockFormatterFactory, \
-             patch('drupal_scout.application.WorkersManager') as MockWorkersManager:
+             patch('drupal_scout.scanner.WorkersManager') as MockWorkersManager:
             MockWorkersManager.return_value.run = AsyncMock()
             with patch('sys.argv', [
                 'drupal-scout', '-d', temp_dir, '--modules', 'drupal/webform'
@@ -666,3 +667,342 @@ async def test_run_targeted_scan_exits_when_core_cannot_be_detected():
                 assert exc_info.value.code == 1
                 output = mock_stderr.getvalue()
                 assert "Unable to determine Drupal core version" in output
+
+
+@pytest.mark.asyncio
+async def test_cache_warm_requires_daemon():
+    """Without the daemon's warmer there is no long-lived cache to warm."""
+    app = Application()
+    with patch('sys.stderr', new_callable=StringIO) as mock_stderr:
+        with pytest.raises(SystemExit) as exc_info:
+            await app.run(['cache', 'warm'])
+    assert exc_info.value.code == 1
+    assert "drupal-scout serve" in mock_stderr.getvalue()
+
+
+@pytest.mark.asyncio
+async def test_cache_warm_schedules_daemon_warmer():
+    warmer = MagicMock(recent=[])
+    app = Application(output_handler=MagicMock(), warmer=warmer)
+    await app.run(['cache', 'warm', '-p', 'site-a', 'site-b', '--rate', '5', '--interval', '600'], cwd='/srv')
+    warmer.schedule.assert_called_once_with(['/srv/site-a', '/srv/site-b'], rate=5.0, interval=600.0)
+
+
+@pytest.mark.asyncio
+async def test_cache_warm_rejects_an_interval_that_is_not_positive():
+    warmer = MagicMock(recent=[])
+    app = Application(output_handler=MagicMock(), warmer=warmer)
+    with patch('sys.stderr', new_callable=StringIO) as mock_stderr:
+        with pytest.raises(SystemExit) as exc_info:
+            await app.run(['cache', 'warm', '--interval', '0'])
+    assert exc_info.value.code == 1
+    assert "The interval must be positive." in mock_stderr.getvalue()
+    warmer.schedule.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_run_targeted_scan_passes_schedule_and_prints_profile():
+    """--schedule selects the scheduling policy and --profile prints the timings to stderr."""
+    from drupal_scout.output import CapturedOutputHandler
+
+    output = CapturedOutputHandler(width=200)
+    app = Application(output_handler=output)
+    with patch('drupal_scout.application.FormatterFactory'), \
+         patch('drupal_scout.scanner.WorkersManager') as MockWorkersManager:
+        manager = MockWorkersManager.return_value
+        manager.run = AsyncMock()
+        manager.order = "declared"
+        manager.elapsed = 1.5
+        manager.retries = 1
+        manager.profile = [{
+            "module": "drupal/webform", "position": 1, "estimate_source": "history", "estimate": 1.2,
+            "finished_after": 1.4, "latency": 1.3, "size": 4096, "retries": 1, "timed_out": False,
+            "cancelled": False,
+        }]
+        await app.run(['--core', '10.0.0', '--schedule', 'declared', '--profile', '--modules', 'drupal/webform'])
+
+    assert MockWorkersManager.call_args.kwargs['order'] == 'declared'
+    assert MockWorkersManager.call_args.kwargs['history'] is app.history
+    assert "Scan profile: declared order, makespan 1.50s, 1 retries" in output.stderr
+    assert "drupal/webform" in output.stderr
+    assert "1.20s (history)" in output.stderr
+
+
+@pytest.mark.asyncio
+async def test_run_caches_the_metadata_for_the_dependency_resolution():
+    """The resolver reads the payloads fetched by the workers instead of downloading them again."""
+    app = Application(output_handler=MagicMock())
+    with patch('drupal_scout.application.FormatterFactory'), \
+         patch('drupal_scout.scanner.WorkersManager') as MockWorkersManager:
+        MockWorkersManager.return_value.run = AsyncMock()
+        await app.run(['--core', '10.0.0', '-r', '--modules', 'drupal/webform'])
+
+    assert app.scanner.fetcher.cache is not None
+    assert app.scanner.fetcher.keep_session is False
+
+
+@pytest.mark.asyncio
+async def test_run_in_the_daemon_warns_about_an_ignored_retry_budget():
+    """The scans in the daemon share its retry budget; a different --retry-budget is reported, not dropped."""
+    from drupal_scout.fetcher import MetadataFetcher
+    from drupal_scout.retries import RetryBudget
+    from drupal_scout.scanner import Scanner
+
+    app = Application(output_handler=MagicMock(),
+                      scanner=Scanner(fetcher=MetadataFetcher(retry_budget=RetryBudget())))
+    with patch('drupal_scout.application.FormatterFactory'), \
+         patch('drupal_scout.scanner.WorkersManager') as MockWorkersManager, \
+         patch('drupal_scout.application.logger') as mock_logger:
+        MockWorkersManager.return_value.run = AsyncMock()
+        await app.run(['--core', '10.0.0', '--modules', 'drupal/webform'])
+        assert not any("--retry-budget" in call.args[0] for call in mock_logger.warning.call_args_list)
+        await app.run(['--core', '10.0.0', '--retry-budget', '50', '--modules', 'drupal/webform'])
+
+    mock_logger.warning.assert_any_call(
+        "--retry-budget is ignored: the scans in the scout daemon share its retry budget of %g%%.", 10.0
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_in_the_daemon_warns_about_ignored_mirrors_and_breaker():
+    from drupal_scout.breaker import CircuitBreaker
+    from drupal_scout.fetcher import MetadataFetcher
+    from drupal_scout.mirrors import EndpointPool
+    from drupal_scout.scanner import Scanner
+
+    fetcher = MetadataFetcher(breaker=CircuitBreaker(), endpoints=EndpointPool(["https://mirror.example/p2"]))
+    app = Application(output_handler=MagicMock(), scanner=Scanner(fetcher=fetcher))
+    with patch('drupal_scout.application.FormatterFactory'), \
+         patch('drupal_scout.scanner.WorkersManager') as MockWorkersManager, \
+         patch('drupal_scout.application.logger') as mock_logger:
+        MockWorkersManager.return_value.run = AsyncMock()
+        await app.run(['--core', '10.0.0', '--mirror', 'https://mirror.example/p2/', '--modules', 'drupal/webform'])
+        assert not any("ignored" in call.args[0] for call in mock_logger.warning.call_args_list)
+        await app.run(['--core', '10.0.0', '--breaker-threshold', '0', '--mirror', 'https://other.example/p2/',
+                       '--modules', 'drupal/webform'])
+
+    mock_logger.warning.assert_any_call(
+        "--breaker-threshold is ignored: the scout daemon uses a threshold of %d (0: disabled).", 5
+    )
+    mock_logger.warning.assert_any_call(
+        "--mirror is ignored: the scout daemon sends the requests to %s. Set DRUPAL_SCOUT_MIRRORS for the daemon "
+        "instead.", "https://mirror.example/p2/, https://packages.drupal.org/files/packages/8/p2/"
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_targeted_scan_fail_fast_exits_with_the_blocking_module():
+    """--fail-fast exits with status 1 at the blocking module, without printing the results."""
+    from drupal_scout.output import CapturedOutputHandler
+
+    app = Application(output_handler=CapturedOutputHandler(width=200))
+    with patch('drupal_scout.application.FormatterFactory') as MockFormatterFactory, \
+         patch('drupal_scout.scanner.WorkersManager') as MockWorkersManager, \
+         patch('drupal_scout.application.logger') as mock_logger:
+        manager = MockWorkersManager.return_value
+        manager.run = AsyncMock()
+        manager.blocking = Module('drupal/webform')
+        with pytest.raises(SystemExit) as exc_info:
+            await app.run(['--core', '11.0.0', '--fail-fast', '--modules', 'drupal/webform', 'drupal/token'])
+
+    assert exc_info.value.code == 1
+    assert MockWorkersManager.call_args.kwargs['fail_fast'] is True
+    mock_logger.error.assert_called_once_with(
+        "Module drupal/webform has no release compatible with Drupal core 11.0.0."
+    )
+    MockFormatterFactory.get_formatter.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_rescan_changes_scans_only_changed_modules_and_prints_the_differences():
+    """After a change of the composer files, only the modules with a new requirement or locked version are scanned."""
+    from drupal_scout.output import CapturedOutputHandler
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        def write_project(token_version, webform=True):
+            require = {"drupal/core": "^10.0", "drupal/token": "^1.0", "drupal/ctools": "^4.0"}
+            if webform:
+                require["drupal/webform"] = "^6.0"
+            packages = [{"name": "drupal/core", "version": "10.2.0"},
+                        {"name": "drupal/token", "version": token_version},
+                        {"name": "drupal/ctools", "version": "4.0.0"},
+                        {"name": "drupal/webform", "version": "6.2.0"}]
+            with open(join(temp_dir, "composer.json"), "w") as f:
+                json.dump({"require": require}, f)
+            with open(join(temp_dir, "composer.lock"), "w") as f:
+                json.dump({"packages": packages}, f)
+
+        args = argparse.Namespace(directory=temp_dir, no_lock=False, limit=10, resolve_dependencies=False,
+                                  deadline=None, schedule="declared", format="table")
+        output = CapturedOutputHandler(width=200)
+        app = Application(output_handler=output)
+        write_project("1.5.0")
+        app.determine_drupal_core_version(args)
+        requirements = app._module_requirements(args)
+        results = {name: {"name": name, "version": version, "suitable_entries": [], "failed": False}
+                   for name, (constraint, version) in requirements.items()}
+
+        # a rewrite of the files with a new size, so the project file cache sees the change
+        write_project("1.15.0", webform=False)
+        with patch('drupal_scout.scanner.WorkersManager') as MockWorkersManager:
+            async def run():
+                for module in MockWorkersManager.call_args.kwargs['modules']:
+                    module.suitable_entries = [{"version": "1.16.0", "requirement": "^10 || ^11"}]
+            MockWorkersManager.return_value.run = run
+            requirements, results = await app._rescan_changes(args, requirements, results)
+
+    scanned = [module.name for module in MockWorkersManager.call_args.kwargs['modules']]
+    assert scanned == ["drupal/token"]
+    assert set(requirements) == {"drupal/token", "drupal/ctools"}
+    assert results["drupal/token"]["suitable_entries"][0]["version"] == "1.16.0"
+    assert "drupal/webform" not in results
+    assert "1.5.0: no suitable entries" in output.stdout
+    assert "1.15.0: 1.16.0" in output.stdout
+    assert "removed" in output.stdout
+
+
+@pytest.mark.asyncio
+async def test_rescan_changes_keeps_the_core_change_after_a_failed_read():
+    """A core update seen while composer.json cannot be read still rescans every module at the next change."""
+    from drupal_scout.output import CapturedOutputHandler
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        def write_lock(core_version):
+            packages = [{"name": "drupal/core", "version": core_version},
+                        {"name": "drupal/token", "version": "1.5.0"},
+                        {"name": "drupal/ctools", "version": "4.0.0"}]
+            with open(join(temp_dir, "composer.lock"), "w") as f:
+                json.dump({"packages": packages}, f)
+
+        def write_json(contents):
+            with open(join(temp_dir, "composer.json"), "w") as f:
+                f.write(contents)
+
+        args = argparse.Namespace(directory=temp_dir, no_lock=False, limit=10, resolve_dependencies=False,
+                                  deadline=None, schedule="declared", format="table")
+        app = Application(output_handler=CapturedOutputHandler(width=200))
+        require = json.dumps({"require": {"drupal/core": "^10.0", "drupal/token": "^1.0", "drupal/ctools": "^4.0"}})
+        write_json(require)
+        write_lock("10.2.0")
+        app.determine_drupal_core_version(args)
+        requirements = app._module_requirements(args)
+        results = {name: {"name": name, "version": version, "suitable_entries": [], "failed": False}
+                   for name, (constraint, version) in requirements.items()}
+
+        # the core is updated while composer.json is half-written
+        write_lock("11.0.0")
+        write_json("{")
+        with pytest.raises(ValueError):
+            await app._rescan_changes(args, requirements, results)
+        assert app._Application__drupal_core_version == "10.2.0"
+
+        write_json(require + " ")
+        with patch('drupal_scout.scanner.WorkersManager') as MockWorkersManager:
+            MockWorkersManager.return_value.run = AsyncMock()
+            await app._rescan_changes(args, requirements, results)
+
+    scanned = [module.name for module in MockWorkersManager.call_args.kwargs['modules']]
+    assert scanned == ["drupal/token", "drupal/ctools"]
+    assert MockWorkersManager.call_args.kwargs['current_core'] == "11.0.0"
+
+
+def test_watch_cannot_be_combined_with_targeted_scans():
+    """--watch only watches full project scans."""
+    app = Application()
+    with pytest.raises(SystemExit):
+        asyncio.run(app.run(['--watch', '--modules', 'drupal/token']))
+
+
+@pytest.mark.asyncio
+async def test_run_diff_scans_only_modules_changed_since_the_revision(tmp_path):
+    """--diff scans the added and changed modules at both revisions and prints the differences."""
+    import subprocess
+    from drupal_scout.output import CapturedOutputHandler
+
+    def write_project(require, packages):
+        (tmp_path / "composer.json").write_text(json.dumps({"require": {"drupal/core": "^10.0", **require}}))
+        (tmp_path / "composer.lock").write_text(json.dumps({"packages": [
+            {"name": "drupal/core", "version": "10.2.0"}, *packages
+        ]}))
+
+    def git(*args):
+        subprocess.run(["git", "-C", str(tmp_path), *args], check=True, capture_output=True)
+
+    write_project({"drupal/token": "^1.0", "drupal/ctools": "^4.0", "drupal/gone": "^1.0"}, [
+        {"name": "drupal/token", "version": "1.5.0"}, {"name": "drupal/ctools", "version": "4.0.0"},
+        {"name": "drupal/gone", "version": "1.0.0"},
+    ])
+    git("init", "-q")
+    git("add", "composer.json", "composer.lock")
+    git("-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-q", "-m", "base")
+    write_project({"drupal/token": "^1.0", "drupal/ctools": "^4.0", "drupal/webform": "^6.0"}, [
+        {"name": "drupal/token", "version": "1.15.0"}, {"name": "drupal/ctools", "version": "4.0.0"},
+        {"name": "drupal/webform", "version": "6.2.0"},
+    ])
+    (tmp_path / "vendor" / "composer").mkdir(parents=True)
+    (tmp_path / "vendor" / "composer" / "platform_check.php").touch()
+
+    output = CapturedOutputHandler(width=200)
+    app = Application(output_handler=output)
+    scanned = []
+    with patch('drupal_scout.scanner.WorkersManager') as MockWorkersManager:
+        async def run():
+            modules = MockWorkersManager.call_args.kwargs['modules']
+            scanned.append(sorted(module.name for module in modules))
+            for module in modules:
+                if module.version != "1.5.0":
+                    module.suitable_entries = [{"version": module.version, "requirement": "^10 || ^11"}]
+        MockWorkersManager.return_value.run = run
+        MockWorkersManager.return_value.blocking = None
+        await app.run(['-d', str(tmp_path), '--diff', 'HEAD'])
+
+    # the current revision first, then the base revision of the modules that existed there
+    assert scanned == [["drupal/token", "drupal/webform"], ["drupal/token"]]
+    assert "1.5.0: no suitable entries" in output.stdout
+    assert "1.15.0: 1.15.0" in output.stdout
+    assert "drupal/webform" in output.stdout
+    assert "drupal/gone" in output.stdout
+    assert "drupal/ctools" not in output.stdout
+
+
+@pytest.mark.asyncio
+async def test_run_diff_with_an_unknown_revision_exits(tmp_path):
+    (tmp_path / "composer.json").write_text(json.dumps({"require": {}}))
+    (tmp_path / "vendor" / "composer").mkdir(parents=True)
+    (tmp_path / "vendor" / "composer" / "platform_check.php").touch()
+    app = Application()
+    with patch('drupal_scout.application.logger') as mock_logger, pytest.raises(SystemExit) as exc_info:
+        await app.run(['-d', str(tmp_path), '--diff', 'no-such-branch'])
+    assert exc_info.value.code == 1
+    assert "no-such-branch" in mock_logger.error.call_args.args[0]
+
+
+@pytest.mark.asyncio
+async def test_matrix_exports_the_modules_of_the_projects(tmp_path):
+    """The matrix command fetches the modules of all projects once and exports the matrix."""
+    from aioresponses import aioresponses
+    from drupal_scout.output import CapturedOutputHandler
+
+    for site, version in (("site_a", "1.5.0"), ("site_b", "1.15.0")):
+        (tmp_path / site).mkdir()
+        (tmp_path / site / "composer.json").write_text(json.dumps({"require": {"drupal/token": "^1.0"}}))
+        (tmp_path / site / "composer.lock").write_text(json.dumps({"packages": [
+            {"name": "drupal/token", "version": version},
+        ]}))
+    output = CapturedOutputHandler(width=200)
+    app = Application(output_handler=output)
+    base = "https://packages.drupal.org/files/packages/8/p2/"
+    with aioresponses() as mocked:
+        mocked.get(base + "drupal/token.json", payload={"packages": {"drupal/token": [
+            {"version": "1.5.0", "require": {"drupal/core": "^9 || ^10"}},
+            {"version": "1.15.0", "require": {"drupal/core": "^10 || ^11"}},
+        ]}})
+        await app.run(['-f', 'json', 'matrix', '--projects', str(tmp_path / "site_a"), str(tmp_path / "site_b"),
+                       '--cores', '9.5', '11.0', '--csv', str(tmp_path / "matrix.csv")])
+
+    rows = json.loads(output.stdout)
+    assert [(row["installed_version"], row["cores"]["9.5"], row["cores"]["11.0"]) for row in rows] == [
+        ("1.5.0", {"1.5.x": "1.5.0"}, {"1.15.x": "1.15.0"}),
+        ("1.15.0", {"1.5.x": "1.5.0"}, {"1.15.x": "1.15.0"}),
+    ]
+    assert (tmp_path / "matrix.csv").read_text().splitlines()[0] == "project,module,installed_version,status,9.5,11.0"
@@ -0,0 +1,101 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import AsyncMock, patch
+
+import aiohttp
+import pytest
+
+from drupal_scout.breaker import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker
+from drupal_scout.exceptions import CircuitOpenException
+from drupal_scout.fetcher import MetadataFetcher
+from drupal_scout.module import Module
+from drupal_scout.worker import Worker
+
+
+class TestCircuitBreaker(TestCase):
+    def setUp(self):
+        self.now = 100.0
+        patcher = patch("drupal_scout.breaker.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(threshold=3, probe_interval=10)
+
+    def fail(self, times):
+        for _ in range(times):
+            self.breaker.before_request()
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.fail(2)
+        self.breaker.record_success()
+        self.fail(2)
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+        self.fail(1)
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+        with self.assertRaises(CircuitOpenException):
+            self.breaker.before_request()
+        self.assertEqual(self.breaker.stats(), {
+            "state": STATE_OPEN, "consecutive_failures": 3, "opened": 1, "rejected": 1,
+        })
+
+    def test_probe_closes_the_circuit(self):
+        self.fail(3)
+        self.now += 10
+        self.breaker.before_request()
+        self.assertEqual(self.breaker.state, STATE_HALF_OPEN)
+        # only one probe at a time
+        with self.assertRaises(CircuitOpenException):
+            self.breaker.before_request()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, STATE_CLOSED)
+        self.breaker.before_request()
+
+    def test_failed_probe_keeps_the_circuit_open(self):
+        self.fail(3)
+        self.now += 10
+        self.breaker.before_request()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, STATE_OPEN)
+        self.now += 5
+        with self.assertRaises(CircuitOpenException):
+            self.breaker.before_request()
+        self.now += 5
+        self.breaker.before_request()
+        self.assertEqual(self.breaker.stats()["opened"], 1)
+
+    def test_invalid_threshold(self):
+        with self.assertRaises(ValueError):
+            CircuitBreaker(threshold=0)
+
+
+async def test_retries_of_one_module_count_as_one_failure():
+    fetcher = MetadataFetcher(breaker=CircuitBreaker(threshold=2, probe_interval=60))
+    attempt = AsyncMock(side_effect=aiohttp.ClientConnectionError())
+
+    with patch.object(fetcher, "_attempt", attempt), patch("asyncio.sleep", new_callable=AsyncMock):
+        with pytest.raises(aiohttp.ClientConnectionError):
+            await fetcher.fetch("drupal/first")
+
+    assert attempt.await_count == 3
+    assert fetcher.breaker.stats()["consecutive_failures"] == 1
+    assert fetcher.breaker.state == STATE_CLOSED
+
+
+async def test_open_circuit_fails_the_remaining_modules_fast():
+    fetcher = MetadataFetcher(breaker=CircuitBreaker(threshold=2, probe_interval=60))
+    attempt = AsyncMock(side_effect=aiohttp.ClientConnectionError())
+
+    with patch.object(fetcher, "_attempt", attempt), patch("asyncio.sleep", new_callable=AsyncMock):
+        for name in ("drupal/first", "drupal/second"):
+            with pytest.raises(aiohttp.ClientConnectionError):
+                await fetcher.fetch(name)
+        assert attempt.await_count == 6
+        assert fetcher.breaker.state == STATE_OPEN
+
+        module = Module("drupal/third")
+        worker = Worker(module=module, current_core="10", fetcher=fetcher)
+        await worker.run(asyncio.Semaphore(1))
+
+    assert attempt.await_count == 6
+    assert module.failed is True
+    assert fetcher.breaker.stats()["rejected"] == 1
@@ -0,0 +1,47 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from drupal_scout.cache import LRUCache
+
+
+class TestLRUCache(TestCase):
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        # touching "a" makes "b" the least recently used entry
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(len(cache), 2)
+
+    def test_expires_entries_after_ttl(self):
+        cache = LRUCache(ttl=10)
+        with patch("drupal_scout.cache.time.monotonic", return_value=100):
+            cache.set("a", 1)
+        with patch("drupal_scout.cache.time.monotonic", return_value=105):
+            self.assertEqual(cache.get("a"), 1)
+        with patch("drupal_scout.cache.time.monotonic", return_value=111):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_pop_and_clear(self):
+        cache = LRUCache()
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.pop("a"), 1)
+        self.assertEqual(cache.pop("a", "missing"), "missing")
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_stats_count_hits_misses_and_evictions(self):
+        cache = LRUCache(max_size=1)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+        cache.set("b", 2)
+        self.assertEqual(cache.stats(), {
+            "size": 1, "max_size": 1, "hits": 1, "misses": 1, "evictions": 1, "hit_rate": 0.5
+        })
@@ -0,0 +1,51 @@
+import importlib
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from drupal_scout import codec
+
+SAMPLE = {"require": {"drupal/core": "^10", "drupal/token": "^1.5"}, "extra": {"patches": {}}, "list": [],
+          "nested": [1, {"name": "Café  au lait", "ok": True, "none": None}]}
+
+
+def _available(name):
+    if name == "json":
+        return True
+    try:
+        importlib.import_module(name)
+        return True
+    except ImportError:
+        return False
+
+
+@pytest.fixture(params=[name for name in codec.BACKENDS if _available(name)])
+def backend(request):
+    with patch.dict(os.environ, {codec.BACKEND_ENV: request.param}):
+        module = importlib.reload(codec)
+    yield module
+    importlib.reload(codec)
+
+
+def test_backend_is_selected(backend):
+    assert backend.BACKEND == os.environ.get(backend.BACKEND_ENV, backend.BACKEND)
+
+
+def test_pretty_output_matches_composer_style(backend):
+    """Every backend indents like json.dumps(indent=4), which is how composer.json files are written."""
+    assert backend.dumps(SAMPLE, indent=True) == json.dumps(SAMPLE, indent=4, ensure_ascii=False) \
+        or backend.dumps(SAMPLE, indent=True) == json.dumps(SAMPLE, indent=4)
+
+
+def test_round_trip(backend, tmp_path):
+    path = tmp_path / "composer.json"
+    path.write_text(backend.dumps(SAMPLE))
+    assert backend.load_file(str(path)) == SAMPLE
+    assert backend.loads(backend.dumps(SAMPLE).encode()) == SAMPLE
+
+
+def test_invalid_json_raises_stdlib_error(backend):
+    with pytest.raises(json.JSONDecodeError):
+        backend.loads(b"{not json")
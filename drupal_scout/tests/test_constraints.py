@@ -0,0 +1,95 @@
+from unittest import TestCase
+
+from drupal_scout.constraints import VersionSet, parse_constraint, parse_version
+from drupal_scout.exceptions import InvalidConstraintException
+
+
+class TestParseVersion(TestCase):
+    def test_version_ordering(self):
+        """
+        Test that version keys follow Composer stability ordering.
+        """
+        self.assertLess(parse_version('10.2.0-dev'), parse_version('10.2.0-alpha1'))
+        self.assertLess(parse_version('10.2.0-alpha1'), parse_version('10.2.0-beta2'))
+        self.assertLess(parse_version('10.2.0-beta2'), parse_version('10.2.0-rc1'))
+        self.assertLess(parse_version('10.2.0-rc1'), parse_version('10.2.0'))
+        self.assertEqual(parse_version('10.2'), parse_version('10.2.0.0'))
+        self.assertEqual(parse_version('v10.2.0'), parse_version('10.2.0'))
+
+    def test_invalid_version(self):
+        """
+        Test that an invalid version raises InvalidConstraintException.
+        """
+        with self.assertRaises(InvalidConstraintException):
+            parse_version('not-a-version')
+
+
+class TestParseConstraint(TestCase):
+    def test_caret(self):
+        constraint = parse_constraint('^9.4 || ^10')
+        self.assertIn('9.4.0', constraint)
+        self.assertIn('10.3.1', constraint)
+        self.assertNotIn('9.3.9', constraint)
+        self.assertNotIn('11.0.0', constraint)
+        self.assertNotIn('11.0.0-rc1', constraint)
+
+    def test_caret_zero_major(self):
+        self.assertNotIn('0.4.0', parse_constraint('^0.3'))
+        self.assertNotIn('0.0.4', parse_constraint('^0.0.3'))
+        self.assertIn('0.3.9', parse_constraint('^0.3'))
+
+    def test_tilde(self):
+        self.assertIn('9.9.0', parse_constraint('~9.2'))
+        self.assertNotIn('10.0.0', parse_constraint('~9.2'))
+        self.assertIn('9.2.9', parse_constraint('~9.2.1'))
+        self.assertNotIn('9.3.0', parse_constraint('~9.2.1'))
+
+    def test_conjunction_and_single_pipe(self):
+        constraint = parse_constraint('>=9.5 <11|^11.1')
+        self.assertIn('10.6.3', constraint)
+        self.assertNotIn('11.0.0', constraint)
+        self.assertIn('11.1.0', constraint)
+        self.assertIn('10.0.0', parse_constraint('>= 9.5, < 11'))
+
+    def test_wildcards(self):
+        self.assertIn('10.6.3', parse_constraint('10.x'))
+        self.assertIn('10.6.3', parse_constraint('10.x.x'))
+        self.assertNotIn('11.0.0', parse_constraint('10.*'))
+        self.assertIn('10.2.5', parse_constraint('10.2.*'))
+        self.assertNotIn('10.3.0', parse_constraint('10.2.*'))
+        self.assertIn('99.0.0', parse_constraint('*'))
+
+    def test_hyphen_range(self):
+        self.assertIn('10.1.9', parse_constraint('9.5 - 10.1'))
+        self.assertNotIn('10.2.0', parse_constraint('9.5 - 10.1'))
+        self.assertIn('10.1.0', parse_constraint('9.5.0 - 10.1.0'))
+        self.assertNotIn('10.1.1', parse_constraint('9.5.0 - 10.1.0'))
+
+    def test_stability_flags_and_exact(self):
+        self.assertIn('10.1.0', parse_constraint('^10@beta'))
+        self.assertIn('10.1.0', parse_constraint('10.1.0'))
+        self.assertNotIn('10.1.1', parse_constraint('10.1.0'))
+        self.assertNotIn('10.1.0', parse_constraint('!=10.1.0'))
+        self.assertTrue(parse_constraint('dev-main').is_empty)
+
+    def test_invalid_constraint(self):
+        with self.assertRaises(InvalidConstraintException):
+            parse_constraint('invalid_specifier_!@#')
+        with self.assertRaises(InvalidConstraintException):
+            parse_constraint('')
+
+
+class TestVersionSet(TestCase):
+    def test_union_merges_intervals(self):
+        merged = parse_constraint('^8.8') | parse_constraint('^9') | parse_constraint('^10')
+        self.assertEqual(len(merged.intervals), 1)
+        self.assertEqual(merged, parse_constraint('^8.8 || ^9 || ^10'))
+
+    def test_intersection(self):
+        overlap = parse_constraint('^9.4 || ^10') & parse_constraint('>=10.2 <11.1')
+        self.assertEqual(overlap, parse_constraint('>=10.2 <11'))
+        self.assertTrue((parse_constraint('^9') & parse_constraint('^10')).is_empty)
+
+    def test_any(self):
+        self.assertIn('8.8.0', VersionSet.any())
+        self.assertNotIn('8.8.0', VersionSet())
@@ -0,0 +1,89 @@
+import asyncio
+import csv
+import sqlite3
+
+import pytest
+from aioresponses import aioresponses
+
+from drupal_scout.corematrix import (
+    STATUS_FAILED,
+    STATUS_INACTIVE,
+    STATUS_OK,
+    CoreSupportMatrix,
+    core_releases,
+    fetch_releases,
+    write_csv,
+    write_sqlite,
+)
+from drupal_scout.fetcher import MetadataFetcher
+
+WEBFORM = {"packages": {"drupal/webform": [
+    {"version": "6.1.4", "require": {"drupal/core": "^8.8 || ^9"}},
+    {"version": "6.2.0", "require": {"drupal/core": "^9.3 || ^10"}},
+    {"version": "6.2.5", "require": {"drupal/core": "^9.3 || ^10"}},
+    {"version": "6.3.0", "require": {"drupal/core": "^10.3 || ^11"}},
+    {"version": "dev-6.x", "require": {"drupal/core": "^11"}},
+    {"version": "5.0.0"},
+]}}
+
+
+def _matrix():
+    releases = {"drupal/webform": core_releases(WEBFORM, "drupal/webform"), "drupal/broken": STATUS_FAILED}
+    return CoreSupportMatrix(releases, ["8.9", "9.4", "10.2", "10.3", "11.0"])
+
+
+def test_core_releases_are_sorted_newest_first():
+    releases = core_releases(WEBFORM, "drupal/webform")
+    assert [release["version"] for release in releases] == ["6.3.0", "6.2.5", "6.2.0", "6.1.4"]
+
+
+def test_newest_release_of_each_supporting_line_per_core():
+    matrix = _matrix()
+    assert matrix.support["drupal/webform"] == {
+        "8.9": {"6.1.x": "6.1.4"},
+        "9.4": {"6.2.x": "6.2.5", "6.1.x": "6.1.4"},
+        "10.2": {"6.2.x": "6.2.5"},
+        "10.3": {"6.3.x": "6.3.0", "6.2.x": "6.2.5"},
+        "11.0": {"6.3.x": "6.3.0"},
+    }
+    assert matrix.statuses == {"drupal/webform": STATUS_OK, "drupal/broken": STATUS_FAILED}
+
+
+def test_rows_and_exports(tmp_path):
+    rows = _matrix().rows({"/srv/site": {"drupal/webform": "6.1.4", "drupal/broken": None}})
+    assert [row["status"] for row in rows] == [STATUS_OK, STATUS_FAILED]
+    assert rows[1]["cores"]["11.0"] == {}
+
+    write_csv(rows, ["9.4", "11.0"], str(tmp_path / "matrix.csv"))
+    with open(tmp_path / "matrix.csv", newline="") as f:
+        exported = list(csv.reader(f))
+    assert exported[0] == ["project", "module", "installed_version", "status", "9.4", "11.0"]
+    assert exported[1] == ["/srv/site", "drupal/webform", "6.1.4", "ok", "6.2.x 6.1.x", "6.3.x"]
+
+    database = str(tmp_path / "matrix.sqlite")
+    write_sqlite(rows, database)
+    # a second export replaces the first
+    write_sqlite(rows, database)
+    connection = sqlite3.connect(database)
+    try:
+        assert connection.execute("SELECT COUNT(*) FROM modules").fetchone() == (2,)
+        assert connection.execute(
+            "SELECT release_line, latest_release FROM support WHERE module = ? AND core = ? ORDER BY release_line",
+            ("drupal/webform", "10.3")
+        ).fetchall() == [("6.2.x", "6.2.5"), ("6.3.x", "6.3.0")]
+    finally:
+        connection.close()
+
+
+@pytest.mark.asyncio
+async def test_fetch_releases_fetches_each_module_once():
+    base = "https://packages.drupal.org/files/packages/8/p2/"
+    fetcher = MetadataFetcher()
+    with aioresponses() as mocked:
+        mocked.get(base + "drupal/webform.json", payload=WEBFORM)
+        mocked.get(base + "drupal/gone.json", status=404)
+        releases = await fetch_releases(
+            ["drupal/webform", "drupal/gone", "drupal/webform"], fetcher, asyncio.Semaphore(2)
+        )
+    assert len(releases["drupal/webform"]) == 4
+    assert releases["drupal/gone"] == STATUS_INACTIVE
@@ -0,0 +1,141 @@
+import asyncio
+import os
+import socket
+import stat
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from drupal_scout import client
+from drupal_scout.cache import LRUCache
+from drupal_scout.daemon import ScoutDaemon
+from drupal_scout.fetcher import MetadataFetcher
+
+
+async def test_run_command_captures_output_and_exit_code():
+    """The daemon runs the invocation with its warm fetcher and returns what it printed."""
+    daemon = ScoutDaemon()
+
+    async def run(app, argv, cwd=None):
+        assert app.fetcher is daemon.fetcher
+        assert argv == ["--modules", "drupal/webform"]
+        assert cwd == "/srv/project"
+        app.output.print("scanned")
+        print("raw output")
+        raise SystemExit(3)
+
+    with patch("drupal_scout.application.Application.run", autospec=True, side_effect=run):
+        result = await daemon.run_command(["--modules", "drupal/webform"], cwd="/srv/project", terminal=False)
+
+    assert result["exit_code"] == 3
+    assert "scanned" in result["stdout"]
+    assert "raw output" in result["stdout"]
+
+
+async def test_run_endpoint():
+    daemon = ScoutDaemon()
+    daemon.run_command = AsyncMock(return_value={"stdout": "ok\n", "stderr": "", "exit_code": 0})
+    async with TestClient(TestServer(daemon.create_app())) as http:
+        response = await http.post("/run", json={"argv": ["info"], "cwd": "/tmp", "terminal": True, "width": 80})
+        assert response.status == 200
+        assert await response.json() == {"stdout": "ok\n", "stderr": "", "exit_code": 0}
+        health = await http.get("/health")
+        assert (await health.json())["status"] == "ok"
+    daemon.run_command.assert_awaited_once_with(["info"], cwd="/tmp", terminal=True, width=80)
+
+
+async def test_serve_listens_on_a_private_socket(tmp_path):
+    """The socket only admits the daemon user, from the moment it exists, and is removed on shutdown."""
+    socket_path = str(tmp_path / "scout.sock")
+    umask = os.umask(0o022)
+    try:
+        task = asyncio.create_task(ScoutDaemon().serve(socket_path=socket_path))
+        for _ in range(100):
+            if os.path.exists(socket_path):
+                break
+            await asyncio.sleep(0.01)
+        assert stat.S_IMODE(os.stat(socket_path).st_mode) & 0o077 == 0
+        # the umask of the process is left as it was
+        assert os.umask(0o022) == 0o022
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    finally:
+        os.umask(umask)
+    assert not os.path.exists(socket_path)
+
+
+def test_forward_runs_locally_for_a_network_address():
+    """The daemon does not listen on the network, so network addresses are not forwarded to."""
+    with patch.dict(os.environ, {client.DAEMON_ENV: "http://127.0.0.1:8765"}), \
+            patch("drupal_scout.client._connect") as connect:
+        assert client.forward(["--modules", "drupal/webform"]) is None
+    connect.assert_not_called()
+
+
+async def test_fetcher_serves_cached_payloads():
+    fetcher = MetadataFetcher(cache=LRUCache())
+    fetcher._request = AsyncMock(return_value={"packages": {}})
+    await fetcher.fetch("drupal/webform")
+    await fetcher.fetch("drupal/webform")
+    fetcher._request.assert_awaited_once()
+
+
+async def test_fetcher_owns_pooled_session():
+    fetcher = MetadataFetcher()
+    async with fetcher:
+        session = fetcher.session
+        assert session is not None and not session.closed
+    assert session.closed
+    assert fetcher.session is None
+
+
+def test_forward_runs_locally_without_daemon(tmp_path):
+    with patch.dict(os.environ, {client.DAEMON_ENV: "unix:" + str(tmp_path / "missing.sock")}):
+        assert client.forward(["--modules", "drupal/webform"]) is None
+
+
+def test_forward_runs_locally_when_the_daemon_does_not_answer(tmp_path, capsys):
+    """A daemon that accepts the connection but is stuck does not hang the client."""
+    socket_path = str(tmp_path / "stuck.sock")
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen()
+    try:
+        with patch.dict(os.environ, {client.DAEMON_ENV: "unix:" + socket_path}), \
+                patch("drupal_scout.client._DEADLINE_MARGIN", 0.1):
+            assert client.forward(["--deadline", "0", "--modules", "drupal/webform"]) is None
+    finally:
+        server.close()
+    assert "did not answer within 0.1 seconds; running locally" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("argv, timeout", [
+    (["--modules", "drupal/webform"], 600),
+    (["--deadline", "60", "--modules", "drupal/webform"], 90),
+    (["--deadline=5"], 35),
+])
+def test_read_timeout_follows_the_deadline(argv, timeout):
+    assert client._read_timeout(argv) == timeout
+
+
+@pytest.mark.parametrize("argv, env", [
+    (["serve"], {}),
+    (["info"], {client.NO_DAEMON_ENV: "1"}),
+])
+def test_forward_skips_local_invocations(argv, env):
+    with patch.dict(os.environ, env), patch("drupal_scout.client.request") as request:
+        assert client.forward(argv) is None
+    request.assert_not_called()
+
+
+async def test_fetcher_keeps_session_across_requests():
+    fetcher = MetadataFetcher(keep_session=True)
+    async with fetcher._session() as first:
+        pass
+    async with fetcher._session() as second:
+        pass
+    assert first is second and not first.closed
+    await fetcher.close()
+    assert first.closed
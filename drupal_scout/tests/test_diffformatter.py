@@ -0,0 +1,66 @@
+import json
+from unittest import TestCase
+
+from rich.table import Table
+
+from drupal_scout.formatters.diffformatter import DiffFormatter, describe_result
+from drupal_scout.formatters.jsonformatter import JSONFormatter
+from drupal_scout.module import Module
+
+
+def _module(name, version, suitable=()):
+    module = Module(name)
+    module.version = version
+    module.suitable_entries = [{"version": entry, "requirement": "^10 || ^11"} for entry in suitable]
+    return module
+
+
+class TestDiffFormatter(TestCase):
+    def setUp(self):
+        self.before = {
+            "drupal/same": JSONFormatter.module_result(_module("drupal/same", "1.0.0", ["1.1.0"])),
+            "drupal/upgraded": JSONFormatter.module_result(_module("drupal/upgraded", "1.0.0")),
+            "drupal/gone": JSONFormatter.module_result(_module("drupal/gone", "2.0.0")),
+        }
+
+    def test_build(self):
+        """
+        Test that build reports the added, changed and removed modules, and skips the unchanged ones.
+        """
+        same = _module("drupal/same", "1.0.0", ["1.1.0"])
+        same.retries = 2
+        modules = [same, _module("drupal/upgraded", "2.0.0", ["2.1.0"]), _module("drupal/new", "3.0.0")]
+        differences = DiffFormatter(self.before, removed=["drupal/gone"]).build(modules)
+        self.assertEqual(
+            [(difference["name"], difference["change"]) for difference in differences],
+            [("drupal/upgraded", "changed"), ("drupal/new", "added"), ("drupal/gone", "removed")]
+        )
+        self.assertEqual(differences[0]["after"]["suitable_entries"][0]["version"], "2.1.0")
+        self.assertIsNone(differences[2]["after"])
+
+    def test_render_json(self):
+        """
+        Test that the JSON output lists the differences.
+        """
+        output = DiffFormatter(self.before, as_json=True).format([_module("drupal/new", None)])
+        self.assertEqual(json.loads(output)[0]["change"], "added")
+
+    def test_render_table(self):
+        """
+        Test that the table has a row per difference, and a caption without differences.
+        """
+        table = DiffFormatter(self.before, removed=["drupal/gone"]).format([])
+        self.assertIsInstance(table, Table)
+        self.assertEqual(table.row_count, 1)
+        self.assertEqual(DiffFormatter(self.before).format([]).caption, "No differences")
+
+    def test_describe_result(self):
+        """
+        Test the description of a result: installed version and suitable versions, or the outcome.
+        """
+        self.assertEqual(describe_result(self.before["drupal/same"]), "1.0.0: 1.1.0")
+        self.assertEqual(describe_result(self.before["drupal/gone"]), "2.0.0: no suitable entries")
+        failed = _module("drupal/failed", None)
+        failed.failed = True
+        self.assertEqual(describe_result(JSONFormatter.module_result(failed)), "N/A: failed")
+        self.assertEqual(describe_result(None), "-")
@@ -0,0 +1,61 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+import pytest
+
+from drupal_scout import evaluation
+from drupal_scout.constraints import parse_constraint
+from drupal_scout.evaluation import CompatibilityMatrix, requirement_set
+from drupal_scout.module import Module
+
+
+def _module_with_entries(name, requirements):
+    module = Module(name)
+    module.transitive_entries = [
+        {'version': '{}.0.0'.format(index + 1), 'requirement': requirement, 'constraint': requirement}
+        for index, requirement in enumerate(requirements)
+    ]
+    return module
+
+
+class TestRequirementSet(TestCase):
+    def test_prefers_raw_constraint(self):
+        entry = {'requirement': '9.4 || 10', 'requirement_parts': ['9.4', '10'], 'constraint': '^9.4 || ^10'}
+        self.assertEqual(requirement_set(entry), parse_constraint('^9.4 || ^10'))
+
+    def test_requirement_parts_restore_caret(self):
+        entry = {'requirement': '9.4 || 10', 'requirement_parts': ['9.4', '10']}
+        self.assertEqual(requirement_set(entry), parse_constraint('^9.4 || ^10'))
+
+    def test_unparseable_parts_are_skipped(self):
+        entry = {'requirement': 'garbage!! || ^10', 'requirement_parts': ['garbage!!', '^10']}
+        self.assertEqual(requirement_set(entry), parse_constraint('^10'))
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_matrix_deduplicates_and_evaluates_all_targets(use_numpy):
+    """The matrix holds one row per distinct requirement and one column per target."""
+    if use_numpy and evaluation.np is None:
+        pytest.skip("numpy is not installed")
+    modules = [
+        _module_with_entries('drupal/a', ['^9 || ^10', '^10 || ^11']),
+        _module_with_entries('drupal/b', ['^9 || ^10', '^10.3 || ^11', '>=9.5 <11']),
+    ]
+    targets = ['9.5.0', '10.2.0', '11.0.0', 'not-a-version']
+    with patch.object(evaluation, 'np', evaluation.np if use_numpy else None):
+        matrix = CompatibilityMatrix.for_modules(modules, targets)
+
+    assert len(matrix) == 4
+    assert matrix.row(parse_constraint('^9 || ^10')) == [True, True, False, False]
+    assert matrix.row(parse_constraint('^10 || ^11')) == [False, True, True, False]
+    assert matrix.row(parse_constraint('^10.3 || ^11')) == [False, False, True, False]
+    assert matrix.row(parse_constraint('>=9.5 <11')) == [True, True, False, False]
+    assert matrix.is_satisfied(parse_constraint('^10 || ^11'), '^10.2.0') is True
+    # unknown requirements and targets fall back to direct evaluation
+    assert matrix.is_satisfied(parse_constraint('^8'), '8.9.0') is True
+    assert matrix.row(parse_constraint('^8')) == [False, False, False, False]
+
+
+def test_matrix_without_requirements():
+    matrix = CompatibilityMatrix([], ['10.0.0'])
+    assert len(matrix) == 0
@@ -4,7 +4,11 @@ from drupal_scout.exceptions import (
     DirectoryNotFoundException,
     NoComposerJSONFileException,
     ModuleNotFoundException,
+    CircuitOpenException,
+    BlockingModuleException,
+    RevisionNotFoundException,
 )
+from drupal_scout.module import Module
 
 class TestExceptions(TestCase):
 
@@ -38,3 +42,19 @@ class TestExceptions(TestCase):
         self.assertEqual(exc.message, "Module X not found")
         self.assertEqual(str(exc), "Module X not found")
 
+    def test_circuit_open_exception_is_a_client_error(self):
+        import aiohttp
+        exc = CircuitOpenException()
+        self.assertIsInstance(exc, aiohttp.ClientError)
+        self.assertEqual(exc.message, "The metadata upstream is failing; the request was not sent.")
+
+    def test_blocking_module_exception_names_the_module(self):
+        module = Module("drupal/webform")
+        exc = BlockingModuleException(module, "11.0.0")
+        self.assertIs(exc.module, module)
+        self.assertEqual(exc.message, "Module drupal/webform has no release compatible with Drupal core 11.0.0.")
+
+    def test_revision_not_found_exception(self):
+        exc = RevisionNotFoundException("main is not a revision")
+        self.assertEqual(exc.message, "main is not a revision")
+        self.assertEqual(str(exc), "main is not a revision")
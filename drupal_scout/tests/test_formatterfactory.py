@@ -5,6 +5,8 @@ from drupal_scout.formatters.formatterfactory import FormatterFactory
 from drupal_scout.formatters.jsonformatter import JSONFormatter
 from drupal_scout.formatters.tableformatter import TableFormatter
 from drupal_scout.formatters.suggestformatter import SuggestFormatter
+from drupal_scout.formatters.summaryformatter import SummaryFormatter
+from drupal_scout.summary import ScanSummary
 
 
 class TestFormatterFactory(TestCase):
@@ -39,3 +41,14 @@ class TestFormatterFactory(TestCase):
         args = Namespace(format='unknown')
         formatter = FormatterFactory.get_formatter(args)
         self.assertIsNone(formatter)
+
+    def test_get_summary_formatter(self):
+        """
+        Test that get_formatter returns SummaryFormatter for a summary-only scan, in the requested format.
+        """
+        summary = ScanSummary()
+        formatter = FormatterFactory.get_formatter(Namespace(format='json'), summary)
+        self.assertIsInstance(formatter, SummaryFormatter)
+        self.assertTrue(formatter.as_json)
+        self.assertIs(formatter.summary, summary)
+        self.assertFalse(FormatterFactory.get_formatter(Namespace(format='table'), summary).as_json)
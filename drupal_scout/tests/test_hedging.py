@@ -0,0 +1,119 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+
+from drupal_scout.exceptions import ModuleNotFoundException
+from drupal_scout.fetcher import MetadataFetcher
+from drupal_scout.hedging import HedgePolicy
+
+
+class TestHedgePolicy(TestCase):
+    def test_no_delay_before_enough_samples(self):
+        policy = HedgePolicy(min_samples=3)
+        policy.observe(0.1)
+        policy.observe(0.2)
+        self.assertIsNone(policy.delay())
+        policy.observe(0.3)
+        self.assertIsNotNone(policy.delay())
+
+    def test_delay_follows_the_percentile_of_the_window(self):
+        policy = HedgePolicy(percentile=0.9, min_samples=10, window=10, min_delay=0)
+        for latency in range(1, 11):
+            policy.observe(latency / 10)
+        self.assertAlmostEqual(policy.delay(), 0.9)
+        # older latencies leave the window
+        for _ in range(10):
+            policy.observe(0.05)
+        self.assertAlmostEqual(policy.delay(), 0.05)
+
+    def test_delay_has_a_floor(self):
+        policy = HedgePolicy(min_samples=1, min_delay=0.5)
+        policy.observe(0.01)
+        self.assertEqual(policy.delay(), 0.5)
+
+    def test_hedge_rate_is_capped(self):
+        policy = HedgePolicy(max_rate=0.1)
+        allowed = 0
+        for _ in range(100):
+            policy.start_request()
+            allowed += policy.allow_hedge()
+        self.assertEqual(allowed, 10)
+        self.assertEqual(policy.stats()["hedged"], 10)
+
+    def test_invalid_percentile(self):
+        with self.assertRaises(ValueError):
+            HedgePolicy(percentile=95)
+
+
+def _trained_policy(delay: float) -> HedgePolicy:
+    policy = HedgePolicy(min_samples=1, max_rate=1.0, min_delay=delay)
+    policy.observe(0.0)
+    return policy
+
+
+async def test_slow_request_is_hedged_and_first_response_wins():
+    policy = _trained_policy(0.01)
+    fetcher = MetadataFetcher(hedging=policy)
+    calls = []
+
+    async def attempt(url, module_name):
+        calls.append(url)
+        if len(calls) == 1:
+            await asyncio.sleep(60)
+        return {"packages": {}}, 10, None
+
+    with patch.object(fetcher, "_attempt", side_effect=attempt):
+        contents = await asyncio.wait_for(fetcher.fetch("drupal/token"), timeout=5)
+
+    assert contents == {"packages": {}}
+    assert len(calls) == 2
+    assert policy.stats()["hedged"] == 1
+    assert policy.stats()["hedge_wins"] == 1
+
+
+async def test_fast_request_is_not_hedged():
+    policy = _trained_policy(1.0)
+    fetcher = MetadataFetcher(hedging=policy)
+    calls = []
+
+    async def attempt(url, module_name):
+        calls.append(url)
+        return {"packages": {}}, 10, None
+
+    with patch.object(fetcher, "_attempt", side_effect=attempt):
+        await fetcher.fetch("drupal/token")
+
+    assert len(calls) == 1
+    assert policy.stats()["hedged"] == 0
+
+
+async def test_failed_request_waits_for_the_hedge():
+    policy = _trained_policy(0.01)
+    fetcher = MetadataFetcher(hedging=policy)
+    calls = []
+
+    async def attempt(url, module_name):
+        calls.append(url)
+        if len(calls) == 1:
+            await asyncio.sleep(0.05)
+            raise aiohttp.ClientConnectionError()
+        await asyncio.sleep(0.1)
+        return {"packages": {}}, 10, None
+
+    with patch.object(fetcher, "_attempt", side_effect=attempt):
+        assert await fetcher.fetch("drupal/token") == {"packages": {}}
+    assert len(calls) == 2
+
+
+async def test_missing_module_is_a_definite_answer():
+    fetcher = MetadataFetcher(hedging=_trained_policy(0.01))
+
+    async def attempt(url, module_name):
+        raise ModuleNotFoundException("missing")
+
+    with patch.object(fetcher, "_attempt", side_effect=attempt):
+        with pytest.raises(ModuleNotFoundException):
+            await fetcher.fetch("drupal/missing")
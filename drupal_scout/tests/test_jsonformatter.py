@@ -1,5 +1,6 @@
 import json
 from unittest import TestCase
+from unittest.mock import patch
 
 from drupal_scout.formatters.jsonformatter import JSONFormatter
 from drupal_scout.module import Module
@@ -99,3 +100,68 @@ class TestJSONFormatter(TestCase):
         self.assertEqual(len(result[1]['suitable_entries']), 0)
         # Failed module should have no entries
         self.assertEqual(len(result[2]['suitable_entries']), 0)
+
+    def test_format_resolved_and_blocked_entries(self):
+        """
+        Test that resolved dependencies and blocked entries are included when dependencies were resolved.
+        """
+        module = Module(name='drupal/commerce')
+        module.suitable_entries = [
+            {'version': '2.0.0', 'requirement': '10 || 11', 'resolved_dependencies': {'drupal/address': '2.0.0'}},
+        ]
+        module.blocked_entries = [
+            {'version': '3.0.0', 'requirement': '10 || 11', 'unresolved_dependencies': ['drupal/profile']},
+        ]
+
+        result = json.loads(self.formatter.format([module]))
+
+        self.assertEqual(result[0]['suitable_entries'][0]['dependencies'], {'drupal/address': '2.0.0'})
+        self.assertEqual(result[0]['blocked_entries'], [
+            {'version': '3.0.0', 'requirement': '10 || 11', 'unresolved_dependencies': ['drupal/profile']}
+        ])
+        self.assertNotIn('blocked_entries', json.loads(self.formatter.format([Module(name='drupal/plain')]))[0])
+
+    def test_format_timed_out_module(self):
+        """
+        Test that modules cut off by the scan deadline carry the timed_out status and no entries.
+        """
+        module = Module(name='drupal/slow')
+        module.timed_out = True
+
+        result = json.loads(self.formatter.format([module, Module(name='drupal/plain')]))
+
+        self.assertTrue(result[0]['timed_out'])
+        self.assertEqual(result[0]['suitable_entries'], [])
+        self.assertNotIn('timed_out', result[1])
+
+    def test_format_retried_module(self):
+        """
+        Test that the retry count is only present for modules whose requests were retried.
+        """
+        module = Module(name='drupal/flaky')
+        module.retries = 2
+
+        result = json.loads(self.formatter.format([module, Module(name='drupal/plain')]))
+
+        self.assertEqual(result[0]['retries'], 2)
+        self.assertNotIn('retries', result[1])
+
+    def test_build_returns_structures_without_serializing(self):
+        """
+        Test that build() and iter_results() return plain structures and format() renders the same result.
+        """
+        module = Module(name='drupal/token')
+        module.suitable_entries = [{'version': '1.15.0', 'requirement': '^10 || ^11'}]
+
+        with patch('drupal_scout.formatters.jsonformatter.codec.dumps') as dumps:
+            result = self.formatter.build([module])
+            dumps.assert_not_called()
+
+        self.assertEqual(result, [{
+            'name': 'drupal/token', 'version': None, 'failed': False,
+            'suitable_entries': [{'version': '1.15.0', 'requirement': '^10 || ^11'}],
+        }])
+        results = self.formatter.iter_results(iter([module, Module(name='drupal/plain')]))
+        self.assertEqual(next(results)['name'], 'drupal/token')
+        self.assertEqual(next(results)['name'], 'drupal/plain')
+        self.assertEqual(json.loads(self.formatter.format([module])), result)
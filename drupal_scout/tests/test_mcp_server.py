@@ -6,6 +6,7 @@ without needing a running MCP server. Uses pytest-asyncio, aioresponses,
 and temporary directories following the project's existing test patterns.
 """
 
+import asyncio
 import json
 import sys
 import tempfile
@@ -16,12 +17,14 @@ from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from aioresponses import aioresponses
 
 from drupal_scout.mcp_server import (
     get_diagnostic_info,
     perform_full_project_scan,
     scan_specific_modules,
     generate_composer_upgrade_json,
+    scan_multiple_projects,
 )
 
 
@@ -121,7 +124,7 @@ async def test_perform_full_project_scan_success():
         }
         _make_composer2_project(temp_dir, composer_data, lock_data)
 
-        with patch("drupal_scout.mcp_server.WorkersManager") as MockWM:
+        with patch("drupal_scout.scanner.WorkersManager") as MockWM:
             MockWM.return_value.run = AsyncMock()
             result = await perform_full_project_scan(directory=temp_dir)
 
@@ -151,7 +154,7 @@ async def test_perform_full_project_scan_no_lock():
         }
         _make_composer2_project(temp_dir, composer_data, lock_data)
 
-        with patch("drupal_scout.mcp_server.WorkersManager") as MockWM:
+        with patch("drupal_scout.scanner.WorkersManager") as MockWM:
             MockWM.return_value.run = AsyncMock()
             result = await perform_full_project_scan(
                 directory=temp_dir, no_lock=True
@@ -215,7 +218,7 @@ async def test_perform_full_project_scan_no_modules():
 async def test_scan_specific_modules_with_core():
     """Targeted scan with explicit core version."""
     with tempfile.TemporaryDirectory() as temp_dir:
-        with patch("drupal_scout.mcp_server.WorkersManager") as MockWM:
+        with patch("drupal_scout.scanner.WorkersManager") as MockWM:
             MockWM.return_value.run = AsyncMock()
             result = await scan_specific_modules(
                 modules=["drupal/webform"],
@@ -245,7 +248,7 @@ async def test_scan_specific_modules_auto_detect_core():
                 f,
             )
 
-        with patch("drupal_scout.mcp_server.WorkersManager") as MockWM:
+        with patch("drupal_scout.scanner.WorkersManager") as MockWM:
             MockWM.return_value.run = AsyncMock()
             result = await scan_specific_modules(
                 modules=["drupal/webform"],
@@ -274,7 +277,7 @@ async def test_scan_specific_modules_no_core_no_files():
 async def test_scan_specific_modules_multiple():
     """Targeted scan handles multiple modules."""
     with tempfile.TemporaryDirectory() as temp_dir:
-        with patch("drupal_scout.mcp_server.WorkersManager") as MockWM:
+        with patch("drupal_scout.scanner.WorkersManager") as MockWM:
             MockWM.return_value.run = AsyncMock()
             result = await scan_specific_modules(
                 modules=["drupal/webform", "drupal/ctools"],
@@ -292,7 +295,7 @@ async def test_scan_specific_modules_lock_auto_detect():
     """Verify lock_file_used reflects actual file presence."""
     # Case 1: No lock file
     with tempfile.TemporaryDirectory() as temp_dir:
-        with patch("drupal_scout.mcp_server.WorkersManager") as MockWM:
+        with patch("drupal_scout.scanner.WorkersManager") as MockWM:
             MockWM.return_value.run = AsyncMock()
             result = await scan_specific_modules(
                 modules=["drupal/webform"],
@@ -313,7 +316,7 @@ async def test_scan_specific_modules_lock_auto_detect():
                 },
                 f,
             )
-        with patch("drupal_scout.mcp_server.WorkersManager") as MockWM:
+        with patch("drupal_scout.scanner.WorkersManager") as MockWM:
             MockWM.return_value.run = AsyncMock()
             result = await scan_specific_modules(
                 modules=["drupal/webform"],
@@ -346,7 +349,7 @@ async def test_generate_composer_upgrade_json_success():
         }
         _make_composer2_project(temp_dir, composer_data, lock_data)
 
-        with patch("drupal_scout.mcp_server.WorkersManager") as MockWM:
+        with patch("drupal_scout.scanner.WorkersManager") as MockWM:
             MockWM.return_value.run = AsyncMock()
             result = await generate_composer_upgrade_json(directory=temp_dir)
 
@@ -402,7 +405,7 @@ async def test_generate_composer_upgrade_json_does_not_write_to_disk():
         with open(join(temp_dir, "composer.json"), "r") as f:
             original_content = f.read()
 
-        with patch("drupal_scout.mcp_server.WorkersManager") as MockWM:
+        with patch("drupal_scout.scanner.WorkersManager") as MockWM:
             MockWM.return_value.run = AsyncMock()
             await generate_composer_upgrade_json(directory=temp_dir)
 
@@ -454,3 +457,270 @@ async def test_output_purity_restored_after_error():
 
     assert sys.stdout is original_stdout
     assert sys.stderr is original_stderr
+
+
+# ---------------------------------------------------------------------------
+# Shared state across tool calls
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_follow_up_calls_reuse_shared_state():
+    """Project files are parsed once and every scan shares the warm fetcher."""
+    from drupal_scout import codec
+    from drupal_scout.mcp_server import _state
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        composer_data = {"require": {"drupal/core": "^10.0", "drupal/token": "^1.0"}}
+        lock_data = {
+            "packages": [
+                {"name": "drupal/core", "version": "10.2.0"},
+                {"name": "drupal/token", "version": "1.5.0"},
+            ]
+        }
+        _make_composer2_project(temp_dir, composer_data, lock_data)
+
+        with patch("drupal_scout.scanner.WorkersManager") as MockWM, \
+                patch("drupal_scout.project.codec.load_file", wraps=codec.load_file) as load:
+            MockWM.return_value.run = AsyncMock()
+            await scan_specific_modules(modules=["drupal/token"], directory=temp_dir)
+            await perform_full_project_scan(directory=temp_dir)
+            result = await generate_composer_upgrade_json(directory=temp_dir)
+
+        # composer.json and composer.lock, once each
+        assert load.call_count == 2
+        assert {call.kwargs["fetcher"] for call in MockWM.call_args_list} == {_state.fetcher}
+        assert result["suggested_composer_json"]["require"]["drupal/token"] == "^1.0"
+
+
+@pytest.mark.asyncio
+async def test_blocking_stages_run_off_the_event_loop():
+    """Parsing the project files happens in the worker pool, so the loop keeps serving other calls."""
+    import threading
+    import time
+
+    from drupal_scout.scanner import Scanner
+
+    threads = []
+
+    def slow_detect(self, directory, use_lock=True):
+        threads.append(threading.current_thread())
+        time.sleep(0.2)
+        return "10.2.0"
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        _make_composer2_project(temp_dir, {"require": {"drupal/core": "^10.0"}})
+        with patch.object(Scanner, "drupal_core_version", slow_detect):
+            tick_task = asyncio.create_task(ticker())
+            result = await perform_full_project_scan(directory=temp_dir, no_lock=True)
+            tick_task.cancel()
+
+    assert result["drupal_core_version"] == "10.2.0"
+    assert threads and threads[0] is not threading.main_thread()
+    assert ticks > 5
+
+
+# ---------------------------------------------------------------------------
+# Tool 5: scan_multiple_projects
+# ---------------------------------------------------------------------------
+
+
+def _release(version, core):
+    return {"version": version, "require": {"drupal/core": core}}
+
+
+@pytest.mark.asyncio
+async def test_scan_multiple_projects_fetches_union_once():
+    """Modules shared by the projects are fetched once and evaluated per project core."""
+    from drupal_scout.mcp_server import _state
+
+    _state.fetcher.cache.clear()
+    base = "https://packages.drupal.org/files/packages/8/p2/"
+    with tempfile.TemporaryDirectory() as site_a, tempfile.TemporaryDirectory() as site_b:
+        _make_composer2_project(
+            site_a,
+            {"require": {"drupal/core": "^10.0", "drupal/token": "^1.0"}},
+            {"packages": [{"name": "drupal/core", "version": "10.2.0"},
+                          {"name": "drupal/token", "version": "1.5.0"}]},
+        )
+        _make_composer2_project(
+            site_b,
+            {"require": {"drupal/core": "^10.0", "drupal/token": "^1.0", "drupal/gone": "^1.0"}},
+        )
+        with aioresponses() as mocked:
+            mocked.get(base + "drupal/token.json", payload={"packages": {"drupal/token": [
+                _release("1.5.0", "^9 || ^10"),
+                _release("1.15.0", "^10 || ^11"),
+            ]}})
+            mocked.get(base + "drupal/gone.json", status=404)
+            result = await scan_multiple_projects(
+                directories=[site_a, site_b, "/nonexistent/site"],
+                core_overrides={site_b: "11.0.0"},
+                fields=["suitable_entries"],
+            )
+            requested = [url for (method, url), calls in mocked.requests.items() for _ in calls]
+    await _state.fetcher.close()
+
+    assert len(requested) == 2
+    site_a_result, site_b_result, missing = result["projects"]
+    assert site_a_result["drupal_core_version"] == "10.2.0"
+    assert site_a_result["lock_file_used"] is True
+    assert [e["version"] for e in site_a_result["modules"][0]["suitable_entries"]] == ["1.5.0", "1.15.0"]
+    assert site_a_result["modules"][0].keys() == {"name", "suitable_entries"}
+    assert site_b_result["drupal_core_version"] == "11.0.0"
+    token = next(m for m in site_b_result["modules"] if m["name"] == "drupal/token")
+    assert [e["version"] for e in token["suitable_entries"]] == ["1.15.0"]
+    assert "does not exist" in missing["error"]
+
+
+@pytest.mark.asyncio
+async def test_scan_multiple_projects_rejects_unknown_fields():
+    result = await scan_multiple_projects(directories=["."], fields=["secrets"])
+    assert "secrets" in result["error"]
+
+
+# ---------------------------------------------------------------------------
+# Pagination and projection of perform_full_project_scan
+# ---------------------------------------------------------------------------
+
+
+async def _scan_five_modules(temp_dir, **kwargs):
+    """Run a full scan of five modules; drupal/m0 and drupal/m3 have no suitable entry."""
+    composer_data = {"require": {"drupal/core": "^10.0", **{f"drupal/m{i}": "^1.0" for i in range(5)}}}
+    _make_composer2_project(temp_dir, composer_data, {"packages": [{"name": "drupal/core", "version": "10.2.0"}]})
+
+    with patch("drupal_scout.scanner.WorkersManager") as MockWM:
+        async def run():
+            for module in MockWM.call_args.kwargs["modules"]:
+                if module.name not in ("drupal/m0", "drupal/m3"):
+                    module.suitable_entries = [
+                        {"version": f"1.{minor}.0", "requirement": "^10 || ^11"} for minor in range(3)
+                    ]
+        MockWM.return_value.run = run
+        MockWM.return_value.retries = 0
+        return await perform_full_project_scan(directory=temp_dir, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_perform_full_project_scan_pages_through_a_kept_result():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        first = await _scan_five_modules(temp_dir, page_size=2)
+        assert [module["name"] for module in first["modules"]] == ["drupal/m0", "drupal/m1"]
+        assert first["total_modules"] == 5
+        assert first["drupal_core_version"] == "10.2.0"
+
+        with patch("drupal_scout.scanner.WorkersManager") as MockWM:
+            second = await perform_full_project_scan(cursor=first["next_cursor"])
+            third = await perform_full_project_scan(cursor=second["next_cursor"])
+            MockWM.assert_not_called()
+
+    assert [module["name"] for module in second["modules"]] == ["drupal/m2", "drupal/m3"]
+    assert [module["name"] for module in third["modules"]] == ["drupal/m4"]
+    assert third["next_cursor"] is None
+    assert "error" in await perform_full_project_scan(cursor="unknown:0")
+
+
+@pytest.mark.asyncio
+async def test_perform_full_project_scan_projection():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        incompatible = await _scan_five_modules(temp_dir, only_incompatible=True, fields=["failed"])
+    assert incompatible["modules"] == [
+        {"name": "drupal/m0", "failed": False}, {"name": "drupal/m3", "failed": False},
+    ]
+    assert incompatible["next_cursor"] is None
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        truncated = await _scan_five_modules(temp_dir, max_entries_per_module=1, fields=["suitable_entries"])
+    assert truncated["modules"][1] == {
+        "name": "drupal/m1",
+        "suitable_entries": [{"version": "1.0.0", "requirement": "^10 || ^11"}],
+        "suitable_entries_total": 3,
+    }
+
+
+@pytest.mark.asyncio
+async def test_perform_full_project_scan_rejects_invalid_projection():
+    assert "error" in await perform_full_project_scan(directory=".", fields=["nope"])
+    assert "error" in await perform_full_project_scan(directory=".", page_size=0)
+
+
+@pytest.mark.asyncio
+async def test_perform_full_project_scan_summary_only():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with patch("drupal_scout.mcp_server.ScanSummary") as MockSummary:
+            MockSummary.return_value.as_dict.return_value = {"total": 5}
+            result = await _scan_five_modules(temp_dir, summary_only=True)
+    assert result["summary"] == {"total": 5}
+    assert "modules" not in result
+    assert result["drupal_core_version"] == "10.2.0"
+
+
+@pytest.mark.asyncio
+async def test_scan_multiple_projects_summary_only():
+    """The summaries of the projects are added up into a fleet summary."""
+    from drupal_scout.mcp_server import _state
+
+    _state.fetcher.cache.clear()
+    base = "https://packages.drupal.org/files/packages/8/p2/"
+    with tempfile.TemporaryDirectory() as site_a, tempfile.TemporaryDirectory() as site_b:
+        _make_composer2_project(site_a, {"require": {"drupal/core": "^10.0", "drupal/token": "^1.0"}})
+        _make_composer2_project(site_b, {"require": {"drupal/core": "^10.0", "drupal/token": "^1.0"}})
+        with aioresponses() as mocked:
+            mocked.get(base + "drupal/token.json", payload={"packages": {"drupal/token": [
+                _release("1.5.0", "^9 || ^10"),
+                _release("1.15.0", "^10 || ^11"),
+            ]}})
+            result = await scan_multiple_projects(
+                directories=[site_a, site_b], core_overrides={site_b: "12.0.0"}, summary_only=True,
+            )
+    # the session of the shared fetcher cannot outlive the event loop of the test
+    await _state.fetcher.close()
+
+    site_a_result, site_b_result = result["projects"]
+    assert "modules" not in site_a_result
+    assert site_a_result["summary"]["compatible"] == 1
+    assert site_b_result["summary"]["incompatible"] == 1
+    assert result["summary"]["total"] == 2
+    assert result["summary"]["compatible"] == 1
+
+
+# ---------------------------------------------------------------------------
+# Cache warming
+# ---------------------------------------------------------------------------
+
+@pytest.mark.asyncio
+async def test_warm_metadata_cache_rejects_an_interval_that_is_not_positive():
+    from drupal_scout.mcp_server import _state, warm_metadata_cache
+
+    with patch.object(_state.warmer, "schedule") as schedule:
+        result = await warm_metadata_cache(interval=0)
+    assert result == {"error": "The interval must be positive."}
+    schedule.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_lifespan_skips_warming_on_an_invalid_environment(monkeypatch):
+    """A malformed warm setting is reported instead of failing the server start."""
+    from drupal_scout.mcp_server import WARM_INTERVAL_ENV, WARM_RATE_ENV, _lifespan, _state
+
+    monkeypatch.setenv(WARM_INTERVAL_ENV, "600")
+    monkeypatch.setenv(WARM_RATE_ENV, "fast")
+    with patch.object(_state, "close", new=AsyncMock()), \
+            patch("drupal_scout.mcp_server.logger") as mock_logger:
+        async with _lifespan(None):
+            assert not _state.warmer.running
+    mock_logger.warning.assert_called_once()
+
+    monkeypatch.setenv(WARM_INTERVAL_ENV, "-1")
+    monkeypatch.delenv(WARM_RATE_ENV)
+    with patch.object(_state, "close", new=AsyncMock()):
+        async with _lifespan(None):
+            assert not _state.warmer.running
@@ -0,0 +1,102 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+from aioresponses import aioresponses
+
+from drupal_scout.exceptions import ModuleNotFoundException
+
+from drupal_scout.fetcher import MetadataFetcher
+from drupal_scout.mirrors import UPSTREAM_URL, EndpointPool, configured_mirrors
+
+MIRROR = "https://mirror.example.com/p2/"
+
+
+class TestEndpointPool(TestCase):
+    def setUp(self):
+        self.now = 100.0
+        patcher = patch("drupal_scout.mirrors.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def urls(self, pool):
+        return [endpoint.base_url for endpoint in pool.candidates()]
+
+    def test_upstream_is_the_last_fallback(self):
+        pool = EndpointPool(["https://mirror.example.com/p2"])
+        self.assertEqual(self.urls(pool), [MIRROR, UPSTREAM_URL])
+        self.assertEqual(len(EndpointPool([MIRROR, UPSTREAM_URL]).endpoints), 2)
+
+    def test_rewrites_upstream_urls(self):
+        endpoint = EndpointPool([MIRROR]).endpoints[0]
+        self.assertEqual(endpoint.url_for(UPSTREAM_URL + "drupal/token.json"), MIRROR + "drupal/token.json")
+
+    def test_selects_the_fastest_endpoint(self):
+        pool = EndpointPool([MIRROR])
+        mirror, upstream = pool.endpoints
+        pool.record_success(mirror, 0.5)
+        # the upstream was not measured yet and is tried
+        self.assertEqual(self.urls(pool), [UPSTREAM_URL, MIRROR])
+        pool.record_success(upstream, 0.2)
+        self.assertEqual(self.urls(pool), [UPSTREAM_URL, MIRROR])
+        pool.record_success(upstream, 2.0)
+        self.assertEqual(self.urls(pool), [MIRROR, UPSTREAM_URL])
+
+    def test_failed_endpoint_is_skipped_for_a_cooldown(self):
+        pool = EndpointPool([MIRROR], cooldown=30)
+        mirror = pool.endpoints[0]
+        pool.record_failure(mirror)
+        self.assertEqual(self.urls(pool), [UPSTREAM_URL, MIRROR])
+        self.now += 30
+        self.assertEqual(self.urls(pool), [MIRROR, UPSTREAM_URL])
+        self.assertEqual(pool.stats()[0], {
+            "url": MIRROR, "requests": 1, "failures": 1, "latency": None, "healthy": True,
+        })
+
+    def test_configured_mirrors(self):
+        with patch.dict("os.environ", {"DRUPAL_SCOUT_MIRRORS": "https://a.example/p2/ https://b.example/p2/"}):
+            self.assertEqual(configured_mirrors(), ["https://a.example/p2/", "https://b.example/p2/"])
+
+
+async def test_fetch_fails_over_to_the_next_endpoint():
+    pool = EndpointPool([MIRROR])
+    fetcher = MetadataFetcher(endpoints=pool)
+    payload = {"packages": {"drupal/token": []}}
+
+    with aioresponses() as mocked:
+        mocked.get(MIRROR + "drupal/token.json", exception=aiohttp.ClientConnectionError())
+        mocked.get(UPSTREAM_URL + "drupal/token.json", payload=payload)
+        assert await fetcher.fetch("drupal/token") == payload
+
+    mirror, upstream = pool.stats()
+    assert (mirror["failures"], mirror["healthy"]) == (1, False)
+    assert (upstream["requests"], upstream["failures"]) == (1, 0)
+    # the failover happened within one attempt
+    assert fetcher.take_request_stats(fetcher.prepare_url("drupal/token"))["retries"] == 0
+
+
+async def test_fetch_looks_up_a_package_missing_on_a_mirror_upstream():
+    pool = EndpointPool([MIRROR])
+    fetcher = MetadataFetcher(endpoints=pool)
+    payload = {"packages": {"drupal/token": []}}
+
+    with aioresponses() as mocked:
+        mocked.get(MIRROR + "drupal/token.json", status=404)
+        mocked.get(UPSTREAM_URL + "drupal/token.json", payload=payload)
+        assert await fetcher.fetch("drupal/token") == payload
+
+    mirror, upstream = pool.stats()
+    # a lagging mirror is not failing
+    assert (mirror["requests"], mirror["failures"], mirror["healthy"]) == (1, 0, True)
+    assert (upstream["requests"], upstream["failures"]) == (1, 0)
+
+
+async def test_fetch_raises_not_found_when_upstream_does_not_have_the_package():
+    fetcher = MetadataFetcher(endpoints=EndpointPool([MIRROR]))
+
+    with aioresponses() as mocked:
+        mocked.get(MIRROR + "drupal/gone.json", status=404)
+        mocked.get(UPSTREAM_URL + "drupal/gone.json", status=404)
+        with pytest.raises(ModuleNotFoundException):
+            await fetcher.fetch("drupal/gone")
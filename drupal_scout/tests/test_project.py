@@ -0,0 +1,43 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from drupal_scout.project import ProjectFileCache
+
+
+class TestProjectFileCache(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "composer.lock")
+        self._write({"packages": [
+            {"name": "drupal/core", "version": "10.2.0"},
+            {"name": "drupal/token", "version": "1.5.0"},
+        ]})
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _write(self, contents, mtime_ns=None):
+        with open(self.path, "w") as f:
+            json.dump(contents, f)
+        if mtime_ns is not None:
+            os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_reuses_parse_while_file_is_unchanged(self):
+        cache = ProjectFileCache()
+        first = cache.load(self.path)
+        with patch("drupal_scout.project.codec.loads") as load:
+            self.assertIs(cache.load(self.path), first)
+            load.assert_not_called()
+
+    def test_reparses_after_the_file_changes(self):
+        cache = ProjectFileCache()
+        self.assertEqual(cache.package_versions(self.path)["drupal/token"], "1.5.0")
+        self._write({"packages": [{"name": "drupal/token", "version": "1.6.0"}]}, mtime_ns=10 ** 18)
+        self.assertEqual(cache.package_versions(self.path), {"drupal/token": "1.6.0"})
+
+    def test_missing_file_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            ProjectFileCache().load(os.path.join(self.temp_dir.name, "composer.json"))
@@ -0,0 +1,148 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from drupal_scout.exceptions import ModuleNotFoundException
+from drupal_scout.fetcher import MetadataFetcher
+from drupal_scout.module import Module
+from drupal_scout.resolver import DependencyResolver
+
+PAYLOADS = {
+    "drupal/address": {"packages": {"drupal/address": [
+        {"version": "1.12.0", "require": {"drupal/core": "^9 || ^10"}},
+        {"version": "2.0.0", "require": {"drupal/core": "^10 || ^11"}},
+    ]}},
+    "drupal/profile": {"packages": {"drupal/profile": [
+        {"version": "1.4.0", "require": {"drupal/core": "^9 || ^10", "drupal/address": "^1.0"}},
+    ]}},
+}
+
+
+def _fetcher():
+    async def fetch(name):
+        if name not in PAYLOADS:
+            raise ModuleNotFoundException("The module {} is not found.".format(name))
+        return PAYLOADS[name]
+
+    fetcher = MetadataFetcher()
+    fetcher.fetch = AsyncMock(side_effect=fetch)
+    return fetcher
+
+
+def _commerce(*entries):
+    module = Module("drupal/commerce")
+    module.suitable_entries = [
+        {"version": version, "requirement": "10 || 11", "dependencies": dependencies}
+        for version, dependencies in entries
+    ]
+    return module
+
+
+@pytest.mark.asyncio
+async def test_resolve_blocks_entries_with_incompatible_dependencies():
+    """On core 11, drupal/profile only has ^10 releases, so the entry depending on it is blocked."""
+    module = _commerce(
+        ("2.0.0", {"drupal/address": "^1.0 || ^2.0"}),
+        ("3.0.0", {"drupal/address": "^2.0", "drupal/profile": "^1.4"}),
+    )
+    resolver = DependencyResolver(_fetcher(), "11.0.0")
+    await resolver.resolve([module])
+
+    assert [entry["version"] for entry in module.suitable_entries] == ["2.0.0"]
+    assert module.suitable_entries[0]["resolved_dependencies"] == {"drupal/address": "2.0.0"}
+    assert module.blocked_entries[0]["version"] == "3.0.0"
+    assert module.blocked_entries[0]["unresolved_dependencies"] == ["drupal/profile"]
+
+
+@pytest.mark.asyncio
+async def test_resolve_follows_dependencies_in_waves_without_duplicate_fetches():
+    """Dependencies of dependencies are fetched, each package once, and nested constraints apply."""
+    module = _commerce(
+        ("2.0.0", {"drupal/profile": "^1.4"}),
+        ("2.1.0", {"drupal/profile": "^1.4", "drupal/address": "^1.0"}),
+    )
+    fetcher = _fetcher()
+    resolver = DependencyResolver(fetcher, "10.1.0")
+    await resolver.resolve([module])
+
+    fetched = [call.args[0] for call in fetcher.fetch.call_args_list]
+    assert sorted(fetched) == ["drupal/address", "drupal/profile"]
+    assert module.blocked_entries == []
+    assert module.suitable_entries[0]["resolved_dependencies"] == {"drupal/profile": "1.4.0"}
+    assert module.suitable_entries[1]["resolved_dependencies"] == {
+        "drupal/profile": "1.4.0", "drupal/address": "1.12.0"
+    }
+
+
+@pytest.mark.asyncio
+async def test_resolve_treats_missing_dependency_as_unresolved():
+    module = _commerce(("2.0.0", {"drupal/gone": "^1.0"}))
+    resolver = DependencyResolver(_fetcher(), "10.1.0")
+    await resolver.resolve([module])
+
+    assert module.suitable_entries == []
+    assert module.blocked_entries[0]["unresolved_dependencies"] == ["drupal/gone"]
+
+
+@pytest.mark.asyncio
+async def test_resolve_skips_dependencies_that_failed_to_fetch():
+    """A network failure leaves the dependency unchecked instead of blocking the entry."""
+    fetcher = MetadataFetcher()
+    fetcher.fetch = AsyncMock(side_effect=asyncio.TimeoutError())
+    module = _commerce(("2.0.0", {"drupal/address": "^2.0"}))
+    resolver = DependencyResolver(fetcher, "10.1.0")
+    await resolver.resolve([module])
+
+    assert module.suitable_entries[0]["resolved_dependencies"] == {}
+    assert module.blocked_entries == []
+
+
+@pytest.mark.asyncio
+async def test_fetcher_deduplicates_in_flight_requests():
+    """Concurrent fetches of the same package share one request."""
+    fetcher = MetadataFetcher()
+    started = asyncio.Event()
+
+    async def slow_request(url, module_name):
+        started.set()
+        await asyncio.sleep(0)
+        return {"packages": {}}
+
+    fetcher._request = AsyncMock(side_effect=slow_request)
+    results = await asyncio.gather(*(fetcher.fetch("drupal/webform") for _ in range(3)))
+
+    assert results == [{"packages": {}}] * 3
+    fetcher._request.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_resolve_does_not_reuse_results_that_met_a_dependency_cycle():
+    """drupal/cart needs drupal/checkout, which cannot be installed: the cycle between them must not hide it."""
+    payloads = {
+        "drupal/cart": {"packages": {"drupal/cart": [
+            {"version": "1.0.0", "require": {"drupal/core": "^10", "drupal/checkout": "^1.0"}},
+        ]}},
+        "drupal/checkout": {"packages": {"drupal/checkout": [
+            {"version": "1.0.0", "require": {"drupal/core": "^10", "drupal/cart": "^1.0", "drupal/gone": "^1.0"}},
+        ]}},
+    }
+
+    async def fetch(name):
+        if name not in payloads:
+            raise ModuleNotFoundException("The module {} is not found.".format(name))
+        return payloads[name]
+
+    fetcher = MetadataFetcher()
+    fetcher.fetch = AsyncMock(side_effect=fetch)
+    module = _commerce(
+        ("2.0.0", {"drupal/checkout": "^1.0"}),
+        ("2.1.0", {"drupal/cart": "^1.0"}),
+    )
+    resolver = DependencyResolver(fetcher, "10.1.0")
+    await resolver.resolve([module])
+
+    assert module.suitable_entries == []
+    assert [entry["unresolved_dependencies"] for entry in module.blocked_entries] == [
+        ["drupal/checkout"], ["drupal/cart"],
+    ]
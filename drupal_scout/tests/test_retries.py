@@ -0,0 +1,76 @@
+from unittest import TestCase
+from unittest.mock import AsyncMock, patch
+
+import aiohttp
+import pytest
+
+from drupal_scout.fetcher import MetadataFetcher
+from drupal_scout.module import Module
+from drupal_scout.output import SilentOutputHandler
+from drupal_scout.retries import RetryBudget, full_jitter
+from drupal_scout.workers_manager import WorkersManager
+
+
+class TestRetryBudget(TestCase):
+    def test_initial_tokens_then_refused(self):
+        budget = RetryBudget(ratio=0.1, initial_tokens=2)
+        self.assertTrue(budget.try_retry())
+        self.assertTrue(budget.try_retry())
+        self.assertFalse(budget.try_retry())
+        self.assertEqual(budget.stats(), {"tokens": 0.0, "retries": 2, "exhausted": 1})
+
+    def test_successes_earn_retries(self):
+        budget = RetryBudget(ratio=0.25, initial_tokens=0)
+        for _ in range(4):
+            budget.record_success()
+        self.assertTrue(budget.try_retry())
+        self.assertFalse(budget.try_retry())
+
+    def test_tokens_are_capped(self):
+        budget = RetryBudget(ratio=1, initial_tokens=0, max_tokens=3)
+        for _ in range(10):
+            budget.record_success()
+        self.assertEqual(budget.tokens, 3)
+
+    def test_full_jitter_stays_within_the_exponential_backoff(self):
+        with patch("drupal_scout.retries.random.uniform", side_effect=lambda low, high: high) as uniform:
+            self.assertEqual(full_jitter(1), 1.0)
+            self.assertEqual(full_jitter(3), 4.0)
+            self.assertEqual(full_jitter(10), 30.0)
+        self.assertEqual(uniform.call_args.args[0], 0)
+
+
+async def test_spent_budget_stops_the_retries():
+    fetcher = MetadataFetcher(retry_budget=RetryBudget(initial_tokens=1))
+    attempt = AsyncMock(side_effect=aiohttp.ClientConnectionError())
+
+    with patch.object(fetcher, "_attempt", attempt), patch("asyncio.sleep", new_callable=AsyncMock):
+        with pytest.raises(aiohttp.ClientConnectionError):
+            await fetcher.fetch("drupal/first")
+        with pytest.raises(aiohttp.ClientConnectionError):
+            await fetcher.fetch("drupal/second")
+
+    # one retry for the first module, none left for its second retry or for the second module
+    assert attempt.await_count == 3
+    assert fetcher.retry_budget.stats() == {"tokens": 0.0, "retries": 1, "exhausted": 2}
+
+
+async def test_manager_reports_retries_per_module_and_in_total():
+    modules = [Module("drupal/flaky"), Module("drupal/steady")]
+    fetcher = MetadataFetcher(retry_budget=RetryBudget())
+    failures = {"drupal/flaky": 2}
+
+    async def attempt(url, module_name):
+        if failures.get(module_name):
+            failures[module_name] -= 1
+            raise aiohttp.ClientConnectionError()
+        return {"packages": {module_name: []}}, 10, None
+
+    manager = WorkersManager(modules=modules, concurrency_limit=2, output=SilentOutputHandler(),
+                             current_core="11.0.0", fetcher=fetcher)
+    with patch.object(fetcher, "_attempt", side_effect=attempt), patch("asyncio.sleep", new_callable=AsyncMock):
+        await manager.run()
+
+    assert [module.retries for module in modules] == [2, 0]
+    assert manager.retries == 2
+    assert [row["retries"] for row in manager.profile] == [2, 0]
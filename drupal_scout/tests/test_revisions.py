@@ -0,0 +1,41 @@
+import json
+import subprocess
+
+import pytest
+
+from drupal_scout.exceptions import RevisionNotFoundException
+from drupal_scout.revisions import load_file_at_revision, resolve_revision
+
+
+def _git(directory, *args):
+    subprocess.run(["git", "-C", str(directory), *args], check=True, capture_output=True)
+
+
+@pytest.fixture
+def repository(tmp_path):
+    """A git repository with the Drupal project in a subdirectory and one commit."""
+    project = tmp_path / "web"
+    project.mkdir()
+    (project / "composer.json").write_text(json.dumps({"require": {"drupal/token": "^1.0"}}))
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", "web/composer.json")
+    _git(tmp_path, "-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-q", "-m", "base")
+    return project
+
+
+def test_load_file_at_revision_reads_the_committed_file(repository):
+    commit = resolve_revision(str(repository), "HEAD")
+    (repository / "composer.json").write_text(json.dumps({"require": {}}))
+    assert load_file_at_revision(str(repository), commit, "composer.json") == {"require": {"drupal/token": "^1.0"}}
+    assert load_file_at_revision(str(repository), commit, "composer.lock") is None
+
+
+def test_resolve_revision_rejects_an_unknown_revision(repository):
+    with pytest.raises(RevisionNotFoundException) as exc_info:
+        resolve_revision(str(repository), "no-such-branch")
+    assert "no-such-branch" in exc_info.value.message
+
+
+def test_resolve_revision_outside_a_repository(tmp_path):
+    with pytest.raises(RevisionNotFoundException):
+        resolve_revision(str(tmp_path), "HEAD")
@@ -0,0 +1,105 @@
+import json
+from pathlib import Path
+
+import pytest
+from aioresponses import aioresponses
+
+from drupal_scout.exceptions import ComposerV1Exception, DirectoryNotFoundException, NoComposerJSONFileException
+from drupal_scout.module import Module
+from drupal_scout.scanner import Scanner
+
+BASE = "https://packages.drupal.org/files/packages/8/p2/"
+TOKEN = {"packages": {"drupal/token": [
+    {"version": "1.15.0", "require": {"drupal/core": "^10 || ^11"}},
+    {"version": "1.5.0", "require": {"drupal/core": "^9 || ^10"}},
+]}}
+
+
+def _make_project(directory: Path, composer_json: dict, composer_lock: dict | None = None) -> str:
+    (directory / "vendor" / "composer").mkdir(parents=True)
+    (directory / "vendor" / "composer" / "platform_check.php").touch()
+    (directory / "composer.json").write_text(json.dumps(composer_json))
+    if composer_lock is not None:
+        (directory / "composer.lock").write_text(json.dumps(composer_lock))
+    return str(directory)
+
+
+def test_load_project_reads_the_core_version_and_installed_versions(tmp_path):
+    directory = _make_project(
+        tmp_path,
+        {"require": {"drupal/core": "^10.0", "drupal/token": "^1.0", "drupal/webform": "^6.0"}},
+        {"packages": [{"name": "drupal/core", "version": "10.2.0"}, {"name": "drupal/token", "version": "1.5.0"}]},
+    )
+    project = Scanner().load_project(directory)
+
+    assert project.drupal_core_version == "10.2.0"
+    assert project.lock_file_used is True
+    assert {name: module.version for name, module in project.modules.items()} == {
+        "drupal/token": "1.5.0", "drupal/webform": None,
+    }
+    assert set(project.hints) == {"drupal/core", "drupal/token"}
+
+
+def test_load_project_without_the_lock_file_reads_the_requirements(tmp_path):
+    directory = _make_project(
+        tmp_path,
+        {"require": {"drupal/core-recommended": "^10.1", "drupal/token": "^1.0"}},
+        {"packages": [{"name": "drupal/core", "version": "10.2.0"}, {"name": "drupal/token", "version": "1.5.0"}]},
+    )
+    scanner = Scanner()
+
+    project = scanner.load_project(directory, use_lock=False)
+    assert project.drupal_core_version == "10.1"
+    assert project.lock_file_used is False
+    assert project.modules["drupal/token"].version is None
+    assert project.hints is None
+    assert scanner.load_project(directory, core="^11.0").drupal_core_version == "11.0"
+
+
+def test_load_project_rejects_invalid_projects(tmp_path):
+    scanner = Scanner()
+    with pytest.raises(DirectoryNotFoundException):
+        scanner.load_project(str(tmp_path / "missing"))
+    with pytest.raises(NoComposerJSONFileException):
+        scanner.load_project(str(tmp_path))
+    (tmp_path / "composer.json").write_text(json.dumps({"require": {}}))
+    with pytest.raises(ComposerV1Exception):
+        scanner.load_project(str(tmp_path))
+
+
+def test_detect_drupal_core_version(tmp_path):
+    scanner = Scanner()
+    assert scanner.detect_drupal_core_version(str(tmp_path)) is None
+    (tmp_path / "composer.json").write_text(json.dumps({"require": {"drupal/core": "~10.3.0"}}))
+    assert scanner.detect_drupal_core_version(str(tmp_path)) == "10.3.0"
+    (tmp_path / "composer.lock").write_text(json.dumps({"packages": [{"name": "drupal/core", "version": "10.3.5"}]}))
+    assert scanner.detect_drupal_core_version(str(tmp_path)) == "10.3.5"
+
+
+async def test_scans_share_the_session_and_the_metadata_cache(tmp_path):
+    directory = _make_project(
+        tmp_path,
+        {"require": {"drupal/core": "^10.0", "drupal/token": "^1.0"}},
+        {"packages": [{"name": "drupal/core", "version": "10.2.0"}, {"name": "drupal/token", "version": "1.5.0"}]},
+    )
+    async with Scanner() as scanner:
+        with aioresponses() as mocked:
+            # registered once: the later scans are served from the metadata cache
+            mocked.get(BASE + "drupal/token.json", payload=TOKEN)
+            project = scanner.load_project(directory)
+            await scanner.scan_project(project)
+            assert [entry["version"] for entry in project.modules["drupal/token"].suitable_entries] == [
+                "1.15.0", "1.5.0",
+            ]
+
+            module = Module("drupal/token")
+            workers_manager = await scanner.scan([module], "11.0.0")
+            assert [entry["version"] for entry in module.suitable_entries] == ["1.15.0"]
+            assert workers_manager.retries == 0
+
+            results = [result async for result in scanner.iter_scan(["drupal/token"], "11.0.0")]
+            assert [entry["version"] for entry in results[0]["suitable_entries"]] == ["1.15.0"]
+        session = scanner.fetcher.session
+        assert session is not None and not session.closed
+    assert scanner.fetcher.session is None
+    assert session.closed
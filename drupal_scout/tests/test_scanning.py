@@ -0,0 +1,93 @@
+import asyncio
+import contextlib
+from unittest.mock import patch
+
+import aiohttp
+import pytest
+from aioresponses import aioresponses
+
+from drupal_scout import iter_scan
+from drupal_scout.cache import LRUCache
+
+PAYLOADS = {
+    "drupal/fast": {"packages": {"drupal/fast": [{"version": "1.0.0", "require": {"drupal/core": "^10 || ^11"}}]}},
+    "drupal/slow": {"packages": {"drupal/slow": [{"version": "2.0.0", "require": {"drupal/core": "^9 || ^10"}}]}},
+}
+
+
+def _fake_get(delays, cancelled=None):
+    async def fake_get(self, url):
+        try:
+            await asyncio.sleep(delays[self.module.name])
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append(self.module.name)
+            raise
+        return PAYLOADS[self.module.name]
+    return fake_get
+
+
+@pytest.mark.asyncio
+async def test_results_are_yielded_in_completion_order():
+    with patch('drupal_scout.worker.Worker._get', _fake_get({"drupal/slow": 0.1, "drupal/fast": 0})):
+        results = [result async for result in iter_scan(["drupal/slow", "drupal/fast"], "11.0.0", order="declared")]
+    assert [result["name"] for result in results] == ["drupal/fast", "drupal/slow"]
+    assert results[0]["suitable_entries"] == [{"version": "1.0.0", "requirement": "10 || 11"}]
+    assert results[1]["suitable_entries"] == []
+
+
+@pytest.mark.asyncio
+async def test_closing_the_iterator_cancels_the_remaining_requests():
+    cancelled = []
+    with patch('drupal_scout.worker.Worker._get', _fake_get({"drupal/slow": 60, "drupal/fast": 0}, cancelled)):
+        async with contextlib.aclosing(iter_scan(["drupal/slow", "drupal/fast"], "11.0.0")) as results:
+            async for result in results:
+                assert result["name"] == "drupal/fast"
+                break
+    assert cancelled == ["drupal/slow"]
+
+
+@pytest.mark.asyncio
+async def test_closing_the_iterator_cancels_the_requests_on_a_caller_session():
+    """The requests of the fetcher, not only the workers waiting for them, are cancelled."""
+    requests = {}
+
+    async def fake_request(self, url, module_name):
+        requests[module_name] = asyncio.current_task()
+        await asyncio.sleep(60 if module_name == "drupal/slow" else 0)
+        return PAYLOADS[module_name]
+
+    async with aiohttp.ClientSession() as session:
+        with patch('drupal_scout.fetcher.MetadataFetcher._request', fake_request):
+            async with contextlib.aclosing(iter_scan(["drupal/slow", "drupal/fast"], "11.0.0",
+                                                     session=session)) as results:
+                async for result in results:
+                    assert result["name"] == "drupal/fast"
+                    break
+            await asyncio.sleep(0)
+    assert requests["drupal/slow"].cancelled()
+
+
+@pytest.mark.asyncio
+async def test_deadline_yields_the_remaining_modules_as_timed_out():
+    with patch('drupal_scout.worker.Worker._get', _fake_get({"drupal/slow": 60, "drupal/fast": 0})):
+        results = [result async for result in iter_scan(["drupal/slow", "drupal/fast"], "11.0.0", deadline=0.1)]
+    assert [(result["name"], result.get("timed_out", False)) for result in results] == [
+        ("drupal/fast", False), ("drupal/slow", True),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_external_session_and_cache_are_reused_across_scans():
+    base = "https://packages.drupal.org/files/packages/8/p2/"
+    cache = LRUCache(max_size=16)
+    async with aiohttp.ClientSession() as session:
+        with aioresponses() as mocked:
+            # registered once: the second scan is served from the metadata cache
+            mocked.get(base + "drupal/fast.json", payload=PAYLOADS["drupal/fast"])
+            for _ in range(2):
+                results = [result async for result in iter_scan(
+                    ["drupal/fast"], "11.0.0", session=session, metadata_cache=cache
+                )]
+                assert results[0]["failed"] is False
+        assert not session.closed
@@ -0,0 +1,96 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from drupal_scout.module import Module
+from drupal_scout.scheduling import (POLICY_DECLARED, ScanHistory, default_history_path, expected_cost,
+                                     order_modules)
+
+
+class TestScanHistory(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "scout", "history.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_missing_file_is_an_empty_history(self):
+        self.assertIsNone(ScanHistory(self.path).get("drupal/token"))
+
+    def test_persists_measurements(self):
+        history = ScanHistory(self.path)
+        history.record("drupal/token", 0.4, 2048)
+        history.save()
+        with open(self.path) as f:
+            self.assertEqual(json.load(f), {"modules": {"drupal/token": {"latency": 0.4, "size": 2048}}})
+        self.assertEqual(ScanHistory(self.path).get("drupal/token"), {"latency": 0.4, "size": 2048})
+
+    def test_smooths_the_latency(self):
+        history = ScanHistory(self.path)
+        history.record("drupal/token", 1.0, 100)
+        history.record("drupal/token", 3.0, 120)
+        self.assertEqual(history.get("drupal/token"), {"latency": 2.0, "size": 120})
+
+    def test_corrupt_file_is_ignored(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        history = ScanHistory(self.path)
+        self.assertIsNone(history.get("drupal/token"))
+        history.record("drupal/token", 0.1, 10)
+        history.save()
+        self.assertEqual(ScanHistory(self.path).get("drupal/token")["size"], 10)
+
+    def test_default_path_follows_the_environment(self):
+        # the test suite points the history to a temporary file
+        self.assertEqual(default_history_path(), os.environ["DRUPAL_SCOUT_HISTORY"])
+        self.assertEqual(ScanHistory().path, os.environ["DRUPAL_SCOUT_HISTORY"])
+
+
+class TestOrderModules(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.history = ScanHistory(os.path.join(self.temp_dir.name, "history.json"))
+        self.modules = [Module("drupal/a"), Module("drupal/b"), Module("drupal/c"), Module("drupal/d")]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def names(self, modules):
+        return [module.name for module in modules]
+
+    def test_declared_policy_keeps_the_order(self):
+        self.history.record("drupal/d", 9.0, 1)
+        self.assertEqual(self.names(order_modules(self.modules, POLICY_DECLARED, self.history)),
+                         ["drupal/a", "drupal/b", "drupal/c", "drupal/d"])
+
+    def test_longest_first_by_history(self):
+        self.history.record("drupal/a", 0.1, 1)
+        self.history.record("drupal/b", 0.9, 1)
+        self.history.record("drupal/c", 0.5, 1)
+        self.history.record("drupal/d", 0.2, 1)
+        self.assertEqual(self.names(order_modules(self.modules, history=self.history)),
+                         ["drupal/b", "drupal/c", "drupal/d", "drupal/a"])
+
+    def test_larger_payload_first_between_equal_latencies(self):
+        self.history.record("drupal/a", 0.5, 1000)
+        self.history.record("drupal/b", 0.5, 9000)
+        self.history.record("drupal/c", 0.9, 10)
+        self.history.record("drupal/d", 0.5, 4000)
+        self.assertEqual(self.names(order_modules(self.modules, history=self.history)),
+                         ["drupal/c", "drupal/b", "drupal/d", "drupal/a"])
+
+    def test_unmeasured_modules_start_first_by_lock_hint(self):
+        self.history.record("drupal/a", 5.0, 1)
+        hints = {"drupal/c": 300.0, "drupal/d": 900.0}
+        self.assertEqual(self.names(order_modules(self.modules, history=self.history, hints=hints)),
+                         ["drupal/d", "drupal/c", "drupal/b", "drupal/a"])
+        self.assertEqual(expected_cost(self.modules[0], self.history, hints), ("history", 5.0))
+        self.assertEqual(expected_cost(self.modules[2], self.history, hints), ("lock", 300.0))
+        self.assertEqual(expected_cost(self.modules[1], self.history, hints), ("none", 0.0))
+
+    def test_unknown_policy_raises(self):
+        with self.assertRaises(ValueError):
+            order_modules(self.modules, "shortest-first")
@@ -1,7 +1,6 @@
 import json
 import os
 import tempfile
-from argparse import Namespace
 from unittest import TestCase
 
 from drupal_scout.formatters.suggestformatter import SuggestFormatter
@@ -24,8 +23,7 @@ class TestSuggestFormatter(TestCase):
         """
         with tempfile.TemporaryDirectory() as temp_dir:
             self._create_composer_json(temp_dir, {"drupal/webform": "^6.1"})
-            args = Namespace(directory=temp_dir, save_dump=False)
-            formatter = SuggestFormatter(args)
+            formatter = SuggestFormatter(temp_dir)
 
             module = Module(name='drupal/webform')
             module.version = '6.1.0'
@@ -43,8 +41,7 @@ class TestSuggestFormatter(TestCase):
         """
         with tempfile.TemporaryDirectory() as temp_dir:
             self._create_composer_json(temp_dir, {"drupal/webform": "^6.1"})
-            args = Namespace(directory=temp_dir, save_dump=False)
-            formatter = SuggestFormatter(args)
+            formatter = SuggestFormatter(temp_dir)
 
             module = Module(name='drupal/webform')
             module.version = '6.1.0'
@@ -64,8 +61,7 @@ class TestSuggestFormatter(TestCase):
         """
         with tempfile.TemporaryDirectory() as temp_dir:
             self._create_composer_json(temp_dir, {"drupal/webform": "^6.1"})
-            args = Namespace(directory=temp_dir, save_dump=False)
-            formatter = SuggestFormatter(args)
+            formatter = SuggestFormatter(temp_dir)
 
             module = Module(name='drupal/webform')
             module.version = '6.1.0'
@@ -82,8 +78,7 @@ class TestSuggestFormatter(TestCase):
         """
         with tempfile.TemporaryDirectory() as temp_dir:
             self._create_composer_json(temp_dir, {"drupal/webform": "^6.1"})
-            args = Namespace(directory=temp_dir, save_dump=True)
-            formatter = SuggestFormatter(args)
+            formatter = SuggestFormatter(temp_dir, save_dump=True)
 
             module = Module(name='drupal/webform')
             module.version = '6.1.0'
@@ -105,8 +100,7 @@ class TestSuggestFormatter(TestCase):
         """
         with tempfile.TemporaryDirectory() as temp_dir:
             self._create_composer_json(temp_dir, {"drupal/webform": "^6.1"})
-            args = Namespace(directory=temp_dir, save_dump=False)
-            formatter = SuggestFormatter(args)
+            formatter = SuggestFormatter(temp_dir)
 
             module = Module(name='drupal/webform')
             module.version = '6.1.0'
@@ -126,8 +120,7 @@ class TestSuggestFormatter(TestCase):
         """
         Test the find_lowest_version helper directly with various orderings.
         """
-        args = Namespace(directory='/tmp', save_dump=False)
-        formatter = SuggestFormatter(args)
+        formatter = SuggestFormatter('/tmp')
 
         entries = [
             {'version': '3.0.0'},
@@ -0,0 +1,75 @@
+import json
+from unittest import TestCase
+
+from rich.table import Table
+
+from drupal_scout.formatters.summaryformatter import SummaryFormatter
+from drupal_scout.module import Module
+from drupal_scout.summary import ScanSummary
+
+
+def _module(name, version=None, suitable=(), **flags):
+    module = Module(name)
+    module.version = version
+    module.suitable_entries = [{"version": entry, "requirement": "^11"} for entry in suitable]
+    for flag, value in flags.items():
+        setattr(module, flag, value)
+    return module
+
+
+class TestScanSummary(TestCase):
+    def test_add_counts_each_module_once(self):
+        """
+        Test that a module is counted under the first of timed out, failed, inactive, compatible and incompatible.
+        """
+        summary = ScanSummary()
+        summary.add(_module("drupal/a", "1.2.0", ["1.3.0"]))
+        summary.add(_module("drupal/b", "1.2.0", ["2.0.0"]))
+        summary.add(_module("drupal/c", "1.2.0"))
+        summary.add(_module("drupal/d", active=False))
+        summary.add(_module("drupal/e", failed=True))
+        summary.add(_module("drupal/f", suitable=["2.0.0"], timed_out=True))
+        self.assertEqual(summary.as_dict(), {
+            "total": 6, "compatible": 2, "incompatible": 1, "inactive": 1, "failed": 1, "timed_out": 1,
+            "upgradable_in_place": 1,
+        })
+
+    def test_unparsable_installed_version_is_not_upgradable_in_place(self):
+        """
+        Test that a compatible module with a dev version is not counted as upgradable in place.
+        """
+        summary = ScanSummary()
+        summary.add(_module("drupal/a", "dev-main", ["1.0.0"]))
+        self.assertEqual(summary.counts["compatible"], 1)
+        self.assertEqual(summary.counts["upgradable_in_place"], 0)
+
+    def test_merge(self):
+        """
+        Test that merge adds up the counters of two summaries.
+        """
+        first, second = ScanSummary(), ScanSummary()
+        first.add(_module("drupal/a", "1.0.0", ["1.1.0"]))
+        second.add(_module("drupal/b", failed=True))
+        first.merge(second)
+        self.assertEqual(first.counts["total"], 2)
+        self.assertEqual(first.counts["failed"], 1)
+        self.assertEqual(second.counts["total"], 1)
+
+
+class TestSummaryFormatter(TestCase):
+    def test_format_json(self):
+        """
+        Test that the JSON output is the counters of the summary.
+        """
+        summary = ScanSummary()
+        summary.add(_module("drupal/a", "1.0.0"))
+        output = SummaryFormatter(summary, as_json=True).format([])
+        self.assertEqual(json.loads(output)["incompatible"], 1)
+
+    def test_format_table(self):
+        """
+        Test that the table has a row per counter.
+        """
+        table = SummaryFormatter(ScanSummary()).format([])
+        self.assertIsInstance(table, Table)
+        self.assertEqual(table.row_count, 7)
@@ -76,3 +76,18 @@ class TestTableFormatter(TestCase):
 
         self.assertIn('drupal/no_match', result)
         self.assertIn('No suitable entries found', result)
+
+    def test_build_returns_rows(self):
+        """
+        Test that build() returns one plain row per module with its status.
+        """
+        failed = Module(name='drupal/broken')
+        failed.failed = True
+        suitable = Module(name='drupal/token')
+        suitable.suitable_entries = [{'version': '1.15.0', 'requirement': '^10'}]
+
+        rows = self.formatter.build([suitable, failed])
+
+        self.assertEqual([row['status'] for row in rows], ['suitable', 'failed'])
+        self.assertEqual(rows[0]['suitable_entries'], [{'version': '1.15.0', 'requirement': '^10'}])
+        self.assertIn('Failed to fetch module data', self._render_to_string(self.formatter.render(rows)))
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import os
+from unittest.mock import AsyncMock, patch
+
+import aiohttp
+import pytest
+
+from drupal_scout.cache import LRUCache
+from drupal_scout.exceptions import ModuleNotFoundException
+from drupal_scout.fetcher import MetadataFetcher
+from drupal_scout.warmer import CacheWarmer
+
+
+def test_record_keeps_most_recent_modules():
+    warmer = CacheWarmer(MetadataFetcher(), max_recent=2)
+    warmer.record(["drupal/token", "drupal/webform"])
+    warmer.record(["drupal/token", "drupal/pathauto"])
+    assert warmer.recent == ["drupal/pathauto", "drupal/token"]
+
+
+def test_modules_for_collects_project_modules(tmp_path):
+    with open(os.path.join(tmp_path, "composer.json"), "w") as f:
+        json.dump({"require": {"drupal/core-recommended": "^10", "drupal/token": "^1", "php": ">=8.1"}}, f)
+    warmer = CacheWarmer(MetadataFetcher())
+    assert warmer.modules_for([str(tmp_path), str(tmp_path / "missing")]) == ["drupal/token"]
+
+
+async def test_warm_spreads_refreshes_at_rate():
+    fetcher = MetadataFetcher()
+
+    async def refresh(name):
+        if name == "drupal/gone":
+            raise ModuleNotFoundException("gone")
+        if name == "drupal/flaky":
+            raise aiohttp.ClientConnectionError()
+        return {"packages": {}}
+
+    fetcher.refresh = AsyncMock(side_effect=refresh)
+    warmer = CacheWarmer(fetcher)
+    with patch("drupal_scout.warmer.asyncio.sleep", new=AsyncMock()) as sleep:
+        refreshed = await warmer.warm(["drupal/token", "drupal/gone", "drupal/flaky"], rate=4)
+
+    assert refreshed == 1
+    assert [call.args[0] for call in sleep.await_args_list] == [0.25, 0.25]
+    assert fetcher.refresh.await_count == 3
+
+
+async def test_refresh_replaces_cached_payload():
+    fetcher = MetadataFetcher(cache=LRUCache())
+    fetcher._request = AsyncMock(side_effect=[{"packages": {"old": []}}, {"packages": {"new": []}}])
+    await fetcher.fetch("drupal/token")
+    await fetcher.refresh("drupal/token")
+    assert await fetcher.fetch("drupal/token") == {"packages": {"new": []}}
+    assert fetcher._request.await_count == 2
+
+
+async def test_schedule_replaces_and_stops_background_task():
+    warmer = CacheWarmer(MetadataFetcher())
+    warmer.record(["drupal/token"])
+    warmer.warm = AsyncMock(return_value=1)
+    first = warmer.schedule(interval=60)
+    await asyncio.sleep(0)
+    second = warmer.schedule(interval=60)
+    await asyncio.sleep(0)
+    assert first.cancelled() or first.done()
+    assert warmer.running
+    await warmer.stop()
+    assert second.cancelled()
+    assert not warmer.running
+    warmer.warm.assert_awaited_with(["drupal/token"], 2.0)
+
+
+async def test_schedule_rejects_a_rate_or_an_interval_that_is_not_positive():
+    warmer = CacheWarmer(MetadataFetcher())
+    with pytest.raises(ValueError):
+        warmer.schedule(interval=0)
+    with pytest.raises(ValueError):
+        warmer.schedule(rate=-1)
+    assert not warmer.running
@@ -0,0 +1,48 @@
+import asyncio
+import os
+
+import pytest
+
+from drupal_scout.watcher import FileWatcher, _inotify_libc
+
+
+async def _next_change(watcher):
+    return await asyncio.wait_for(anext(watcher.changes()), timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_polling_reports_a_changed_file(tmp_path):
+    watched = tmp_path / "composer.json"
+    watched.write_text("{}")
+    async with FileWatcher([str(watched)], debounce=0.05, poll_interval=0.01, use_inotify=False) as watcher:
+        assert watcher.backend == "polling"
+        await asyncio.sleep(0.05)
+        watched.write_text('{"require": {}}')
+        assert await _next_change(watcher) == {str(watched)}
+
+
+@pytest.mark.asyncio
+async def test_polling_reports_a_created_file(tmp_path):
+    watched = tmp_path / "composer.lock"
+    async with FileWatcher([str(watched)], debounce=0.05, poll_interval=0.01, use_inotify=False) as watcher:
+        await asyncio.sleep(0.05)
+        watched.write_text("{}")
+        assert await _next_change(watcher) == {str(watched)}
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(_inotify_libc() is None, reason="inotify is not available")
+async def test_inotify_debounces_a_burst_of_changes(tmp_path):
+    """Both composer files written in a burst, one replaced by a rename, are reported once."""
+    composer_json = tmp_path / "composer.json"
+    composer_lock = tmp_path / "composer.lock"
+    composer_json.write_text("{}")
+    composer_lock.write_text("{}")
+    async with FileWatcher([str(composer_json), str(composer_lock)], debounce=0.2) as watcher:
+        assert watcher.backend == "inotify"
+        (tmp_path / "unrelated.txt").write_text("ignored")
+        composer_json.write_text('{"require": {}}')
+        replacement = tmp_path / "composer.lock.tmp"
+        replacement.write_text('{"packages": []}')
+        os.replace(replacement, composer_lock)
+        assert await _next_change(watcher) == {str(composer_json), str(composer_lock)}
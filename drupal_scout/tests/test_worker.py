@@ -286,6 +286,25 @@ async def test_run_marks_module_failed_on_connection_error():
     assert module.active is True  # active should remain True (not a 404)
 
 
+@pytest.mark.asyncio
+async def test_run_marks_module_failed_on_a_body_that_is_not_json():
+    """
+    Test that run() marks the module as failed when the response is not JSON, e.g. an HTML error page.
+    """
+    module = Module(name='drupal/test_module')
+    worker = Worker(module=module, current_core='10.0.0')
+    url = worker.prepare_composer_url(module.name)
+
+    with patch('asyncio.sleep', new_callable=AsyncMock):
+        with aioresponses() as mocked:
+            for _ in range(_MAX_RETRIES):
+                mocked.get(url, status=200, body="<html>Maintenance</html>", content_type="text/html")
+            await worker.run(asyncio.Semaphore(1))
+
+    assert module.failed is True
+    assert module.active is True
+
+
 @pytest.mark.asyncio
 async def test_get_succeeds_after_transient_failure():
     """
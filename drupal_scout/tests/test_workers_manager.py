@@ -1,9 +1,11 @@
 import asyncio
 from unittest.mock import patch, MagicMock, AsyncMock
 import pytest
+from drupal_scout.evaluation import CompatibilityMatrix
 from drupal_scout.workers_manager import WorkersManager
 from drupal_scout.module import Module
 from drupal_scout.output import SilentOutputHandler
+from drupal_scout.summary import ScanSummary
 
 @pytest.mark.asyncio
 async def test_run_with_custom_concurrency():
@@ -46,3 +48,273 @@ async def test_run_with_default_cpu_concurrency():
 
         assert mock_worker_class.call_count == 1
         assert mock_worker_instance.run.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_run_evaluates_requirements_in_one_batch():
+    """Workers only fetch; the manager evaluates every requirement once after all fetches."""
+    modules = [Module("drupal/module_1"), Module("drupal/module_2")]
+    payloads = {
+        "drupal/module_1": {"packages": {"drupal/module_1": [
+            {"version": "1.0.0", "require": {"drupal/core": "^9 || ^10"}},
+            {"version": "2.0.0", "require": {"drupal/core": "^10 || ^11"}},
+        ]}},
+        "drupal/module_2": {"packages": {"drupal/module_2": [
+            {"version": "3.0.0", "require": {"drupal/core": "^9 || ^10"}},
+        ]}},
+    }
+
+    async def fake_get(self, url):
+        return payloads[self.module.name]
+
+    manager = WorkersManager(modules=modules, concurrency_limit=2, output=SilentOutputHandler(),
+                             current_core="11.0.0")
+    with patch('drupal_scout.worker.Worker._get', fake_get), \
+         patch('drupal_scout.workers_manager.CompatibilityMatrix.for_modules',
+               wraps=CompatibilityMatrix.for_modules) as mock_for_modules:
+        await manager.run()
+
+    mock_for_modules.assert_called_once()
+    assert [entry['version'] for entry in modules[0].suitable_entries] == ['2.0.0']
+    assert modules[1].suitable_entries == []
+
+
+@pytest.mark.asyncio
+async def test_run_reuses_cached_evaluation_results():
+    """A second scan of the same payload, installed version and core skips parsing and matching."""
+    from drupal_scout.cache import LRUCache
+    from drupal_scout.fetcher import MetadataFetcher
+    from drupal_scout.worker import Worker
+
+    payload = {"packages": {"drupal/token": [
+        {"version": "1.5.0", "require": {"drupal/core": "^9 || ^10"}},
+        {"version": "1.15.0", "require": {"drupal/core": "^10 || ^11"}},
+    ]}}
+    fetcher = MetadataFetcher(cache=LRUCache())
+    fetcher._request = AsyncMock(return_value=payload)
+    results = LRUCache()
+
+    async def scan(core):
+        module = Module("drupal/token")
+        manager = WorkersManager(modules=[module], concurrency_limit=2, output=SilentOutputHandler(),
+                                 current_core=core, fetcher=fetcher, results=results)
+        await manager.run()
+        return [entry['version'] for entry in module.suitable_entries]
+
+    with patch.object(Worker, 'find_transitive_entries', autospec=True,
+                      side_effect=Worker.find_transitive_entries) as parse:
+        assert await scan("11.0.0") == ["1.15.0"]
+        assert await scan("11.0.0") == ["1.15.0"]
+        assert parse.call_count == 1
+        # another target core is another result
+        assert await scan("10.1.0") == ["1.5.0", "1.15.0"]
+        assert parse.call_count == 2
+
+    assert results.stats()["hits"] == 1
+    assert results.stats()["misses"] == 2
+
+
+@pytest.mark.asyncio
+async def test_run_reports_unfinished_modules_as_timed_out():
+    """At the deadline the pending workers are cancelled; the finished modules are evaluated as usual."""
+    modules = [Module("drupal/fast"), Module("drupal/stuck")]
+
+    async def fake_get(self, url):
+        if self.module.name == "drupal/stuck":
+            await asyncio.sleep(60)
+        return {"packages": {"drupal/fast": [{"version": "2.0.0", "require": {"drupal/core": "^10 || ^11"}}]}}
+
+    manager = WorkersManager(modules=modules, concurrency_limit=2, output=SilentOutputHandler(),
+                             current_core="11.0.0", deadline=0.05)
+    with patch('drupal_scout.worker.Worker._get', fake_get):
+        await asyncio.wait_for(manager.run(), timeout=5)
+
+    assert modules[0].timed_out is False
+    assert [entry['version'] for entry in modules[0].suitable_entries] == ['2.0.0']
+    assert modules[1].timed_out is True
+    assert modules[1].suitable_entries == []
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_only_caller_cancels_the_request():
+    """A worker cancelled at the deadline does not leave its request running in the background."""
+    from drupal_scout.fetcher import MetadataFetcher
+
+    fetcher = MetadataFetcher()
+    requests = []
+
+    async def slow_request(url, module_name):
+        requests.append(asyncio.current_task())
+        await asyncio.sleep(60)
+
+    fetcher._request = slow_request
+    caller = asyncio.ensure_future(fetcher.fetch("drupal/stuck"))
+    await asyncio.sleep(0.01)
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+    await asyncio.sleep(0)
+
+    assert requests[0].cancelled()
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_caller_keeps_the_shared_request():
+    from drupal_scout.fetcher import MetadataFetcher
+
+    fetcher = MetadataFetcher()
+    release = asyncio.Event()
+
+    async def slow_request(url, module_name):
+        await release.wait()
+        return {"packages": {}}
+
+    fetcher._request = AsyncMock(side_effect=slow_request)
+    first = asyncio.ensure_future(fetcher.fetch("drupal/shared"))
+    second = asyncio.ensure_future(fetcher.fetch("drupal/shared"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == {"packages": {}}
+    assert first.cancelled()
+    fetcher._request.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_run_starts_longest_modules_first_and_records_history(tmp_path):
+    """Workers start in longest-first order; the request measurements of the scan go into the history."""
+    from aioresponses import aioresponses
+    from drupal_scout.fetcher import MetadataFetcher
+    from drupal_scout.scheduling import ScanHistory
+
+    history = ScanHistory(str(tmp_path / "history.json"))
+    history.record("drupal/quick", 0.1, 10)
+    history.record("drupal/slow", 2.0, 10)
+    modules = [Module("drupal/quick"), Module("drupal/slow"), Module("drupal/new")]
+    fetcher = MetadataFetcher()
+
+    started = []
+
+    async def fake_run(self, semaphore, evaluate=True):
+        started.append(self.module.name)
+        await self.fetcher.fetch(self.module.name)
+
+    manager = WorkersManager(modules=modules, concurrency_limit=1, output=SilentOutputHandler(),
+                             current_core="11.0.0", fetcher=fetcher, history=history)
+    with aioresponses() as mocked, patch('drupal_scout.worker.Worker.run', fake_run):
+        for module in modules:
+            mocked.get(fetcher.prepare_url(module.name), payload={"packages": {module.name: []}})
+        async with fetcher:
+            await manager.run()
+
+    assert started == ["drupal/new", "drupal/slow", "drupal/quick"]
+    assert [row["module"] for row in manager.profile] == started
+    assert [row["estimate_source"] for row in manager.profile] == ["none", "history", "history"]
+    assert all(row["latency"] is not None and row["finished_after"] is not None for row in manager.profile)
+    assert history.get("drupal/new")["size"] == manager.profile[0]["size"]
+
+
+@pytest.mark.asyncio
+async def test_run_counts_modules_in_the_summary_and_drops_their_entries():
+    """A summary-only scan counts every module as it is evaluated and keeps none of its entries."""
+    modules = [Module("drupal/module_1"), Module("drupal/module_2")]
+    modules[0].version = "2.0.0"
+    payloads = {
+        "drupal/module_1": {"packages": {"drupal/module_1": [
+            {"version": "2.1.0", "require": {"drupal/core": "^10 || ^11"}},
+        ]}},
+        "drupal/module_2": {"packages": {"drupal/module_2": [
+            {"version": "3.0.0", "require": {"drupal/core": "^9 || ^10"}},
+        ]}},
+    }
+
+    async def fake_get(self, url):
+        return payloads[self.module.name]
+
+    summary = ScanSummary()
+    manager = WorkersManager(modules=modules, concurrency_limit=2, output=SilentOutputHandler(),
+                             current_core="11.0.0", summary=summary)
+    with patch('drupal_scout.worker.Worker._get', fake_get):
+        await manager.run()
+
+    assert summary.as_dict() == {
+        "total": 2, "compatible": 1, "incompatible": 1, "inactive": 0, "failed": 0, "timed_out": 0,
+        "upgradable_in_place": 1,
+    }
+    assert all(not module.suitable_entries and not module.transitive_entries for module in modules)
+
+
+@pytest.mark.asyncio
+async def test_run_fail_fast_cancels_the_scan_at_the_first_blocking_module():
+    """With fail_fast, a module without a suitable entry cancels the fetches that are still running."""
+    modules = [Module("drupal/slow"), Module("drupal/blocking"), Module("drupal/compatible")]
+    payloads = {
+        "drupal/blocking": {"packages": {"drupal/blocking": [
+            {"version": "1.0.0", "require": {"drupal/core": "^9 || ^10"}},
+        ]}},
+        "drupal/compatible": {"packages": {"drupal/compatible": [
+            {"version": "2.0.0", "require": {"drupal/core": "^10 || ^11"}},
+        ]}},
+    }
+
+    async def fake_get(self, url):
+        if self.module.name == "drupal/slow":
+            await asyncio.sleep(60)
+        elif self.module.name == "drupal/blocking":
+            await asyncio.sleep(0.01)
+        return payloads[self.module.name]
+
+    manager = WorkersManager(modules=modules, concurrency_limit=3, output=SilentOutputHandler(),
+                             current_core="11.0.0", order="declared", fail_fast=True)
+    with patch('drupal_scout.worker.Worker._get', fake_get):
+        await asyncio.wait_for(manager.run(), timeout=5)
+
+    assert manager.blocking is modules[1]
+    assert [entry['version'] for entry in modules[2].suitable_entries] == ['2.0.0']
+    assert [row["module"] for row in manager.profile if row["cancelled"]] == ["drupal/slow"]
+    assert not any(row["timed_out"] for row in manager.profile)
+
+
+@pytest.mark.asyncio
+async def test_run_fail_fast_cancels_the_requests_in_flight():
+    """The requests of the fetcher are cancelled with the workers, not left running for a shared fetcher."""
+    from drupal_scout.fetcher import MetadataFetcher
+
+    modules = [Module("drupal/slow"), Module("drupal/blocking")]
+    requests = {}
+
+    async def fake_request(self, url, module_name):
+        requests[module_name] = asyncio.current_task()
+        if module_name == "drupal/slow":
+            await asyncio.sleep(60)
+        return {"packages": {module_name: [{"version": "1.0.0", "require": {"drupal/core": "^9 || ^10"}}]}}
+
+    manager = WorkersManager(modules=modules, concurrency_limit=2, output=SilentOutputHandler(),
+                             current_core="11.0.0", order="declared", fail_fast=True, fetcher=MetadataFetcher())
+    with patch('drupal_scout.fetcher.MetadataFetcher._request', fake_request):
+        await asyncio.wait_for(manager.run(), timeout=5)
+        await asyncio.sleep(0)
+
+    assert manager.blocking is modules[1]
+    assert requests["drupal/slow"].cancelled()
+
+
+@pytest.mark.asyncio
+async def test_run_fail_fast_without_blocking_module():
+    """With fail_fast, a scan whose modules all have a suitable entry runs to the end."""
+    modules = [Module("drupal/compatible")]
+
+    async def fake_get(self, url):
+        return {"packages": {"drupal/compatible": [
+            {"version": "2.0.0", "require": {"drupal/core": "^10 || ^11"}},
+        ]}}
+
+    manager = WorkersManager(modules=modules, concurrency_limit=1, output=SilentOutputHandler(),
+                             current_core="11.0.0", fail_fast=True)
+    with patch('drupal_scout.worker.Worker._get', fake_get):
+        await manager.run()
+
+    assert manager.blocking is None
+    assert len(modules[0].suitable_entries) == 1
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from typing import Iterable
+
+import aiohttp
+
+from .exceptions import ModuleNotFoundException
+from .fetcher import MetadataFetcher
+from .project import ProjectFileCache
+
+logger = logging.getLogger(__name__)
+
+# default number of metadata requests per second issued by the warmer
+DEFAULT_RATE = 2.0
+
+
+class CacheWarmer:
+    """
+    Refreshes the cached module metadata in the background, so that interactive scans hit a warm cache.
+    The warmer covers the modules required by a list of projects or, without projects, the modules
+    that were queried most recently. The requests are spread over time at a fixed rate.
+    """
+
+    def __init__(self, fetcher: MetadataFetcher, project_files: ProjectFileCache | None = None,
+                 max_recent: int = 256):
+        """
+        Initialize the warmer.
+        :param fetcher:         the fetcher whose cache is kept warm
+        :type fetcher:          MetadataFetcher
+        :param project_files:   the cache of parsed project files
+        :type project_files:    ProjectFileCache | None
+        :param max_recent:      the number of recently queried modules to remember
+        :type max_recent:       int
+        """
+        self.fetcher = fetcher
+        self.project_files = project_files or ProjectFileCache()
+        self.max_recent = max_recent
+        self.__recent: OrderedDict[str, None] = OrderedDict()
+        self.__task: asyncio.Task | None = None
+
+    @property
+    def recent(self) -> list[str]:
+        """
+        The recently queried modules, most recent first.
+        """
+        return list(reversed(self.__recent))
+
+    @property
+    def running(self) -> bool:
+        return self.__task is not None and not self.__task.done()
+
+    def record(self, module_names: Iterable[str]) -> None:
+        """
+        Remember the modules as recently queried.
+        :param module_names:    the names of the queried modules
+        :type module_names:     Iterable[str]
+        """
+        for name in module_names:
+            self.__recent[name] = None
+            self.__recent.move_to_end(name)
+        while len(self.__recent) > self.max_recent:
+            self.__recent.popitem(last=False)
+
+    def modules_for(self, directories: Iterable[str]) -> list[str]:
+        """
+        Collect the drupal/* modules required by the projects, except the drupal/core* packages.
+        Projects that cannot be read are skipped with a warning.
+        :param directories:     the project directories
+        :type directories:      Iterable[str]
+        :return:                the module names, without duplicates
+        :rtype:                 list
+        """
+        names: dict[str, None] = {}
+        for directory in directories:
+            try:
+                composer_json = self.project_files.load(os.path.join(directory, "composer.json"))
+            except (OSError, ValueError) as exc:
+                logger.warning("Skipping project %s while warming the cache: %s", directory, exc)
+                continue
+            for name in composer_json.get("require") or {}:
+                if name.startswith("drupal/") and not name.startswith("drupal/core"):
+                    names[name] = None
+        return list(names)
+
+    async def warm(self, module_names: Iterable[str], rate: float = DEFAULT_RATE) -> int:
+        """
+        Refresh the cached metadata of the modules, starting at most `rate` requests per second.
+        :param module_names:    the names of the modules
+        :type module_names:     Iterable[str]
+        :param rate:            the number of requests started per second
+        :type rate:             float
+        :return:                the number of refreshed modules
+        :rtype:                 int
+        """
+        refreshed = 0
+
+        async def refresh(name: str) -> None:
+            nonlocal refreshed
+            try:
+                await self.fetcher.refresh(name)
+                refreshed += 1
+            except ModuleNotFoundException:
+                pass
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                logger.warning("Module %s could not be refreshed: %s", name, exc)
+
+        async with asyncio.TaskGroup() as tg:
+            for index, name in enumerate(module_names):
+                if index:
+                    await asyncio.sleep(1 / rate)
+                tg.create_task(refresh(name))
+        return refreshed
+
+    async def run(self, directories: list[str] | None = None, rate: float = DEFAULT_RATE,
+                  interval: float | None = None) -> None:
+        """
+        Warm the cache once or, with an interval, repeatedly until cancelled.
+        :param directories:     the projects to cover; the recently queried modules when empty
+        :type directories:      list[str] | None
+        :param rate:            the number of requests started per second
+        :type rate:             float
+        :param interval:        the number of seconds between the starts of two passes
+        :type interval:         float | None
+        """
+        while True:
+            loop = asyncio.get_running_loop()
+            started_at = loop.time()
+            names = self.modules_for(directories) if directories else self.recent
+            refreshed = await self.warm(names, rate)
+            logger.info("Refreshed the metadata of %d of %d modules.", refreshed, len(names))
+            if interval is None:
+                return
+            await asyncio.sleep(max(0.0, interval - (loop.time() - started_at)))
+
+    def schedule(self, directories: list[str] | None = None, rate: float = DEFAULT_RATE,
+                 interval: float | None = None) -> asyncio.Task:
+        """
+        Start warming in a background task, replacing the one scheduled before.
+        The arguments are those of run().
+        :return:    the background task
+        :rtype:     asyncio.Task
+        :raises:    ValueError if the rate or the interval is not positive
+        """
+        if rate <= 0:
+            raise ValueError("The rate must be positive.")
+        if interval is not None and interval <= 0:
+            raise ValueError("The interval must be positive.")
+        if self.__task is not None:
+            self.__task.cancel()
+        self.__task = asyncio.ensure_future(self.run(directories, rate, interval))
+        self.__task.add_done_callback(self._report)
+        return self.__task
+
+    async def stop(self) -> None:
+        """
+        Cancel the background task, if any, and wait for it to finish.
+        """
+        task, self.__task = self.__task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    @staticmethod
+    def _report(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Warming the metadata cache failed: %s", task.exception())
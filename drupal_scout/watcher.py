@@ -0,0 +1,176 @@
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+from typing import AsyncIterator, Iterable
+
+logger = logging.getLogger(__name__)
+
+# the inotify events that change a file in place or replace it, from <sys/inotify.h>
+_IN_MODIFY = 0x002
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_WATCH_MASK = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+# struct inotify_event without the trailing name: wd, mask, cookie, len
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+
+def _inotify_libc() -> ctypes.CDLL | None:
+    """
+    Get the C library if it provides inotify, i.e. on Linux.
+    """
+    name = ctypes.util.find_library("c")
+    if name is None:
+        return None
+    try:
+        libc = ctypes.CDLL(name, use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, "inotify_init1") or not hasattr(libc, "inotify_add_watch"):
+        return None
+    return libc
+
+
+class FileWatcher:
+    """
+    Watches a few files and reports the changed ones, once the changes have settled.
+    With inotify, the directories of the files are watched, so that files replaced by a rename, as editors
+    and composer do, keep being watched. Without inotify, the modification time and size of the files are polled.
+    Use the watcher as an async context manager and iterate over changes().
+    """
+
+    def __init__(self, paths: Iterable[str], debounce: float = 0.3, poll_interval: float = 1.0,
+                 use_inotify: bool = True):
+        """
+        Initialize the watcher.
+        :param paths:           the files to watch; they do not have to exist yet
+        :type paths:            Iterable[str]
+        :param debounce:        the number of quiet seconds after which a burst of changes is reported
+        :type debounce:         float
+        :param poll_interval:   the number of seconds between two polls, without inotify
+        :type poll_interval:    float
+        :param use_inotify:     whether to use inotify where it is available
+        :type use_inotify:      bool
+        """
+        self.paths = {os.path.abspath(path) for path in paths}
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        # "inotify" or "polling", set when the watcher is started
+        self.backend: str | None = None
+        self.__queue: asyncio.Queue[str] = asyncio.Queue()
+        self.__fd: int | None = None
+        self.__directories: dict[int, str] = {}
+        self.__poller: asyncio.Task | None = None
+
+    async def __aenter__(self) -> 'FileWatcher':
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def start(self) -> None:
+        """
+        Start watching the files, with inotify if possible and by polling otherwise.
+        """
+        if self.use_inotify and self._start_inotify():
+            self.backend = "inotify"
+        else:
+            self.__poller = asyncio.get_running_loop().create_task(self._poll())
+            self.backend = "polling"
+
+    async def close(self) -> None:
+        """
+        Stop watching the files.
+        """
+        if self.__fd is not None:
+            asyncio.get_running_loop().remove_reader(self.__fd)
+            os.close(self.__fd)
+            self.__fd = None
+        if self.__poller is not None:
+            self.__poller.cancel()
+            try:
+                await self.__poller
+            except asyncio.CancelledError:
+                pass
+            self.__poller = None
+
+    async def changes(self) -> AsyncIterator[set[str]]:
+        """
+        Iterate over the changes of the watched files.
+        A change is reported once no further change followed it for the debounce interval,
+        so that writing both composer files is reported once.
+        :return:    the paths of the files changed since the previous iteration
+        :rtype:     AsyncIterator[set[str]]
+        """
+        while True:
+            changed = {await self.__queue.get()}
+            while True:
+                try:
+                    changed.add(await asyncio.wait_for(self.__queue.get(), self.debounce))
+                except TimeoutError:
+                    break
+            yield changed
+
+    def _start_inotify(self) -> bool:
+        libc = _inotify_libc()
+        if libc is None:
+            return False
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            logger.debug("inotify is not available: %s", os.strerror(ctypes.get_errno()))
+            return False
+        for directory in {os.path.dirname(path) for path in self.paths}:
+            wd = libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK)
+            if wd < 0:
+                logger.debug("%s cannot be watched with inotify: %s", directory, os.strerror(ctypes.get_errno()))
+                os.close(fd)
+                self.__directories = {}
+                return False
+            self.__directories[wd] = directory
+        self.__fd = fd
+        asyncio.get_running_loop().add_reader(fd, self._read_events)
+        return True
+
+    def _read_events(self) -> None:
+        try:
+            data = os.read(self.__fd, _READ_SIZE)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            directory = self.__directories.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if path in self.paths:
+                self.__queue.put_nowait(path)
+
+    async def _poll(self) -> None:
+        signatures = {path: self._signature(path) for path in self.paths}
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            for path in self.paths:
+                signature = self._signature(path)
+                if signature != signatures[path]:
+                    signatures[path] = signature
+                    self.__queue.put_nowait(path)
+
+    @staticmethod
+    def _signature(path: str) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
@@ -5,17 +5,18 @@ import re
 import aiohttp
 import jq
 from packaging import version
-from packaging.specifiers import SpecifierSet, InvalidSpecifier
-from packaging.version import InvalidVersion
-from .exceptions import ModuleNotFoundException
+from .cache import LRUCache
+from .constraints import VersionSet
+from .evaluation import CompatibilityMatrix, compile_requirement_parts, parse_target, requirement_set
+from .exceptions import CircuitOpenException, ModuleNotFoundException
+from .fetcher import MetadataFetcher, _MAX_RETRIES
 from .module import Module
 
 logger = logging.getLogger(__name__)
 
-_MAX_RETRIES = 3
-_BACKOFF_FACTOR = 1
-_RETRY_STATUS_CODES = frozenset([500, 502, 503, 504])
-_REQUEST_TIMEOUT = aiohttp.ClientTimeout(sock_connect=5, sock_read=30)
+# jq expression selecting the drupal/* requirements of a release, except the drupal/core* packages
+DEPENDENCIES_JQ = ('(.require | with_entries(select((.key | startswith("drupal/")) '
+                   'and (.key | startswith("drupal/core") | not))))')
 
 
 class Worker:
@@ -23,27 +24,47 @@ class Worker:
     The main worker class.
     """
 
-    def __init__(self, module: Module, use_lock_version: str | bool = False, current_core: str = '8'):
+    def __init__(self, module: Module, use_lock_version: str | bool = False, current_core: str = '8',
+                 fetcher: MetadataFetcher | None = None, results: LRUCache | None = None):
         """
         Initialize the worker.
         :param module:           the module to be processed
         :param use_lock_version:  whether to use the version from the lock file
         :param current_core:
+        :param fetcher:          the metadata fetcher shared by the scan
+        :param results:          the cache of evaluation results shared across scans, if any
         """
         self.current_core = current_core.replace("^", "").replace("~", "")
         self.module = module
+        self.fetcher = fetcher or MetadataFetcher()
+        self.results = results
+        # whether the entries of the module were taken from the results cache
+        self.cached = False
+        self.__result_key: tuple | None = None
         self.use_lock_version: str | bool = False
         if type(use_lock_version) is str:
             self.use_lock_version = use_lock_version.replace("^", "").replace("~", "")
 
-    async def run(self, semaphore: asyncio.Semaphore):
+    async def run(self, semaphore: asyncio.Semaphore, evaluate: bool = True):
+        """
+        Fetch the module metadata and find its transitive entries.
+        :param semaphore:   the semaphore limiting concurrent requests
+        :param evaluate:    whether to find the suitable entries right away; the workers manager
+                            defers it to evaluate the requirements of the whole scan in one batch
+        """
         async with semaphore:
             # This is the main entry point for the worker.
             try:
                 composer_url = self.prepare_composer_url(self.module.name)
                 contents = await self._get(composer_url)
+                if self._load_result(composer_url):
+                    return
                 self.module.transitive_entries = self.find_transitive_entries(contents)
-                self.module.suitable_entries = self.find_suitable_entries(self.module.transitive_entries)
+                if evaluate:
+                    self.evaluate()
+            except CircuitOpenException as e:
+                logger.error("Module %s was not fetched: %s", self.module.name, e.message)
+                self.module.failed = True
             except (aiohttp.ClientError, asyncio.TimeoutError) as e:
                 logger.error("Module %s failed after %d attempts: %s", self.module.name, _MAX_RETRIES, e)
                 self.module.failed = True
@@ -51,6 +72,44 @@ class Worker:
                 self.module.active = False
                 print(e.message)
 
+    def evaluate(self, matrix: CompatibilityMatrix | None = None) -> None:
+        """
+        Find the suitable entries among the fetched transitive entries of the module.
+        :param matrix:  the pre-evaluated requirements of the whole scan, if any
+        :type matrix:   CompatibilityMatrix | None
+        """
+        if self.cached:
+            return
+        self.module.suitable_entries = self.find_suitable_entries(self.module.transitive_entries, matrix)
+        if self.results is not None and self.__result_key is not None:
+            self.results.set(self.__result_key, (self.module.transitive_entries, self.module.suitable_entries))
+
+    def _load_result(self, url: str) -> bool:
+        """
+        Take the entries of the module from the results cache.
+        The result depends on the payload version, the installed version, the target core and the lock flag.
+        :param url:     the URL of the fetched payload
+        :type url:      str
+        :return:        whether the cache had the result
+        :rtype:         bool
+        """
+        if self.results is None:
+            return False
+        validator = self.fetcher.validator(url)
+        if validator is None:
+            return False
+        self.__result_key = (self.module.name, validator, self.module.version, self.current_core,
+                             bool(self.use_lock_version))
+        cached = self.results.get(self.__result_key)
+        if cached is None:
+            return False
+        transitive_entries, suitable_entries = cached
+        # copies, so that the dependency resolution of this scan does not change the cached lists
+        self.module.transitive_entries = list(transitive_entries)
+        self.module.suitable_entries = list(suitable_entries)
+        self.cached = True
+        return True
+
     async def _get(self, url: str) -> dict:
         """
         Perform an HTTP GET request with retry logic and exponential backoff.
@@ -61,47 +120,7 @@ class Worker:
         :rtype:         dict
         :raises:        aiohttp.ClientError, asyncio.TimeoutError on exhausted retries
         """
-        last_exception: BaseException | None = None
-        for attempt in range(1, _MAX_RETRIES + 1):
-            if attempt > 1:
-                wait = _BACKOFF_FACTOR * (2 ** (attempt - 2))
-                logger.warning(
-                    "Retrying module %s... attempt %d/%d",
-                    self.module.name, attempt, _MAX_RETRIES
-                )
-                await asyncio.sleep(wait)
-            try:
-                async with aiohttp.ClientSession(timeout=_REQUEST_TIMEOUT) as session:
-                    async with session.get(url) as response:
-                        if response.status == 404:
-                            raise ModuleNotFoundException(
-                                "The module {} is not found. Possibly it is no more supported.".format(self.module.name))
-                        if response.status in _RETRY_STATUS_CODES:
-                            last_exception = aiohttp.ClientResponseError(
-                                response.request_info,
-                                response.history,
-                                status=response.status,
-                                message=f"HTTP {response.status} for {url}",
-                            )
-                            if attempt < _MAX_RETRIES:
-                                logger.warning(
-                                    "Retrying module %s... attempt %d/%d (HTTP %d)",
-                                    self.module.name, attempt + 1, _MAX_RETRIES, response.status
-                                )
-                            continue
-                        contents = await response.json()
-                        return contents
-            except ModuleNotFoundException:
-                raise
-            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
-                last_exception = exc
-                if attempt < _MAX_RETRIES:
-                    logger.warning(
-                        "Retrying module %s... attempt %d/%d (%s)",
-                        self.module.name, attempt + 1, _MAX_RETRIES, type(exc).__name__
-                    )
-        assert last_exception is not None
-        raise last_exception
+        return await self.fetcher.get(url, self.module.name)
 
     def prepare_composer_url(self, module_name: str) -> str:
         """
@@ -111,7 +130,7 @@ class Worker:
         :return:   the URL to the JSON data of the module
         :rtype:    str
         """
-        return 'https://packages.drupal.org/files/packages/8/p2/' + module_name + '.json'
+        return self.fetcher.prepare_url(module_name)
 
     def find_transitive_entries(self, response_contents: dict) -> list:
         """
@@ -124,10 +143,12 @@ class Worker:
         transitive_entries = []
         entries = jq.compile(
             '.packages."' + self.module.name + '" | .[] | select(.require != null) | {"version", '
-                                               '"requirement":.require."drupal/core"}').input(response_contents).all()
+                                               '"requirement":.require."drupal/core", '
+                                               '"dependencies":' + DEPENDENCIES_JQ + '}').input(response_contents).all()
         for entry in entries:
             req_str = entry.get('requirement', '')
             if req_str and "|" in req_str:
+                entry['constraint'] = req_str
                 req_clean = req_str.replace("^", "").replace(" ", "")
                 parts = [p.strip() for p in re.split(r'\|+', req_clean) if p.strip()]
                 entry["requirement_parts"] = parts
@@ -135,81 +156,46 @@ class Worker:
                 transitive_entries.append(entry)
         return transitive_entries
 
-    def _is_clause_satisfied(self, clause: str) -> bool:
+    def _core_key(self) -> tuple | None:
         """
-        Check if a single requirement clause is satisfied by self.current_core.
+        Parse self.current_core into a version key, or None if it is not a valid version.
         """
-        try:
-            core_ver = version.parse(self.current_core)
-        except InvalidVersion:
-            try:
-                core_ver = version.parse(f"{self.current_core}.0.0")
-            except InvalidVersion:
-                return False
+        return parse_target(self.current_core)
 
-        raw_clause = clause.strip()
-        if not raw_clause:
-            return False
+    def _requirement_set(self, entry: dict) -> VersionSet:
+        """
+        Compile the drupal/core requirement of the entry into a version set.
+        """
+        return requirement_set(entry)
 
-        # Fast path for simple numbers or caret major versions e.g. '8', '^8', '9', '10'
-        if re.match(r'^[\^~]?\d+$', raw_clause):
-            try:
-                major = int(re.sub(r'[^\d]', '', raw_clause))
-                return core_ver.major == major
-            except ValueError:
-                pass
-
-        # Normalize specifiers for SpecifierSet
-        spec_str = raw_clause
-        def _expand_caret(m: re.Match) -> str:
-            ver_str = m.group(1)
-            major = int(ver_str.split('.')[0])
-            return f">={ver_str}, <{major + 1}.0.0"
-        spec_str = re.sub(r'\^(\d+(?:\.\d+)*)', _expand_caret, spec_str)
-        spec_str = re.sub(r'(\d+(?:\.\d+)*)\s*([<>=!~])', r'\1, \2', spec_str)
-        parts = [p.strip() for p in spec_str.split(',') if p.strip()]
-        norm_parts = []
-        for p in parts:
-            if re.match(r'^\d+\.x$', p):
-                norm_parts.append(f"=={p.split('.')[0]}.*")
-            elif re.match(r'^\d+$', p):
-                norm_parts.append(f"=={p}.*")
-            elif re.match(r'^\d+(\.\d+)+$', p):
-                norm_parts.append(f">={p}")
-            else:
-                norm_parts.append(p)
-        norm_spec_str = ", ".join(norm_parts)
-
-        try:
-            spec_set = SpecifierSet(norm_spec_str)
-            return core_ver in spec_set
-        except (InvalidSpecifier, InvalidVersion) as exc:
-            logger.warning("Failed to evaluate requirement clause %r as SpecifierSet: %s", clause, exc)
-            matches = re.findall(r'\b\d+\b', raw_clause)
-            if matches:
-                try:
-                    majors = [int(m) for m in matches]
-                    return core_ver.major in majors
-                except ValueError:
-                    pass
+    def _is_clause_satisfied(self, clause: str) -> bool:
+        """
+        Check if a single requirement clause is satisfied by self.current_core.
+        """
+        core_key = self._core_key()
+        if core_key is None or not clause.strip():
             return False
+        return core_key in compile_requirement_parts((clause.strip(),))
 
-    def find_suitable_entries(self, transitive_entries: list) -> list:
+    def find_suitable_entries(self, transitive_entries: list, matrix: CompatibilityMatrix | None = None) -> list:
         """
         Get the suitable transitive versions of the module.
         :param transitive_entries:  the transitive entries of the module
         :type transitive_entries:   list
+        :param matrix:              the pre-evaluated requirements of the whole scan, if any
+        :type matrix:               CompatibilityMatrix | None
         :return:    the suitable versions of the module
         :rtype:     list
         """
         suitable_entries = []
-        for entry in transitive_entries:
-            req_parts = entry.get('requirement_parts', [])
-            if not req_parts and 'requirement' in entry:
-                req_parts = [p.strip() for p in re.split(r'\|+', entry['requirement']) if p.strip()]
-
-            if any(self._is_clause_satisfied(part) for part in req_parts):
-                suitable_entries.append(entry)
+        if matrix is not None:
+            for entry in transitive_entries:
+                if matrix.is_satisfied(self._requirement_set(entry), self.current_core):
+                    suitable_entries.append(entry)
+        elif (core_key := self._core_key()) is not None:
+            for entry in transitive_entries:
+                if core_key in self._requirement_set(entry):
+                    suitable_entries.append(entry)
 
         # apply post-filtering if the lock version is used and the module version is specified
         if self.use_lock_version and self.module.version:
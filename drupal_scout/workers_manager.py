@@ -1,20 +1,64 @@
 import asyncio
+import logging
 from os import cpu_count
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, AsyncIterator
+from .cache import LRUCache
+from .evaluation import CompatibilityMatrix
+from .exceptions import BlockingModuleException
+from .fetcher import MetadataFetcher
+from .resolver import DependencyResolver
+from .module import Module
+from .scheduling import POLICY_LONGEST_FIRST, ScanHistory, expected_cost, order_modules
+from .summary import ScanSummary
 from .worker import Worker
 
 if TYPE_CHECKING:
     from .output import OutputHandler
 
+logger = logging.getLogger(__name__)
+
 class WorkersManager:
     """
     The main workers manager class.
     """
 
-    def __init__(self, modules: list, concurrency_limit: int, output: 'OutputHandler', current_core: str | None = None, use_lock_version: bool = False):
+    def __init__(self, modules: list, concurrency_limit: int, output: 'OutputHandler', current_core: str | None = None, use_lock_version: bool = False,
+                 resolve_dependencies: bool = False, fetcher: MetadataFetcher | None = None,
+                 semaphore: asyncio.Semaphore | None = None, results: LRUCache | None = None,
+                 deadline: float | None = None, order: str = POLICY_LONGEST_FIRST,
+                 history: ScanHistory | None = None, hints: dict[str, float] | None = None,
+                 summary: ScanSummary | None = None, fail_fast: bool = False):
         """
         Initialize the singleton workers manager.
+        The semaphore, when given, is a concurrency budget shared with other managers and
+        takes the place of concurrency_limit for the fetches.
+        The results cache, when given, keeps the evaluated entries of the modules across scans.
+        The deadline, when given, is the number of seconds after which the unfinished modules are
+        cancelled and marked as timed out.
+        The workers are started in the order of the scheduling policy, which estimates the scan time
+        of the modules from the history of previous scans, or from the lock-file hints without it.
+        The measurements of this scan are added to the history.
+        With a summary, every module is counted as soon as it is evaluated, and its entries are dropped.
+        With fail_fast, every module is evaluated as soon as it is fetched, and the scan stops at the first
+        module without a suitable entry, which is kept as the blocking module.
         """
+        self.order = order
+        self.fail_fast = fail_fast
+        # the first module found without a suitable entry, only looked for with fail_fast
+        self.blocking: Module | None = None
+        self.summary = summary
+        self.history = history
+        self.hints = hints or {}
+        # per-module timings of the last run, in scheduling order
+        self.profile: list[dict] = []
+        self.elapsed = 0.0
+        # the number of retried requests of the last run
+        self.retries = 0
+        self.results = results
+        self.deadline = deadline
+        self.resolve_dependencies = resolve_dependencies
+        self.semaphore = semaphore
+        self.fetcher = fetcher or MetadataFetcher()
         self.modules = modules
         self.output = output
         self.concurrency_limit = concurrency_limit
@@ -27,22 +71,206 @@ class WorkersManager:
     async def run(self):
         """
         Run the workers concurrently using asyncio TaskGroup and show progress via Rich.
+        Once every payload is fetched, the requirements of all modules are evaluated in one batch.
+        When the deadline expires, the pending workers are cancelled and the finished modules are
+        evaluated as usual.
+        With fail_fast, the pending workers are cancelled as soon as a module turns out to be blocking.
+        """
+        semaphore = self.semaphore or asyncio.Semaphore(self.concurrency_limit)
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        deadline_at = started_at + self.deadline if self.deadline is not None else None
+        finished: set[Worker] = set()
+        timings: dict[Worker, float] = {}
+
+        try:
+            async with asyncio.timeout_at(deadline_at):
+                with self.output.progress_bar() as progress:
+                    main_task = progress.add_task("[cyan]Scanning modules...", total=len(self.modules))
+
+                    try:
+                        async with asyncio.TaskGroup() as tg:
+                            for module in order_modules(self.modules, self.order, self.history, self.hints):
+                                worker = Worker(
+                                    module=module,
+                                    use_lock_version=self.use_lock_version,
+                                    current_core=self.current_core,
+                                    fetcher=self.fetcher,
+                                    results=self.results
+                                )
+
+                                self.workers.append(worker)
+
+                                async def run_worker_with_progress(w, s, p, t):
+                                    await w.run(s, evaluate=self.fail_fast)
+                                    finished.add(w)
+                                    timings[w] = loop.time() - started_at
+                                    p.advance(t)
+                                    if self.fail_fast and self._is_blocking(w.module):
+                                        # leaving the task group with an error cancels the other workers
+                                        raise BlockingModuleException(w.module, self.current_core or '8')
+
+                                tg.create_task(run_worker_with_progress(worker, semaphore, progress, main_task))
+                    except* BlockingModuleException as group:
+                        self.blocking = group.exceptions[0].module
+        except TimeoutError:
+            timed_out = [worker for worker in self.workers if worker not in finished]
+            for worker in timed_out:
+                worker.module.timed_out = True
+            logger.warning(
+                "The scan deadline of %gs expired; %d module(s) timed out: %s", self.deadline, len(timed_out),
+                ", ".join(worker.module.name for worker in timed_out)
+            )
+
+        self.elapsed = loop.time() - started_at
+        self._record_profile(finished, timings)
+        if self.retries:
+            logger.warning("%d request(s) were retried during the scan.", self.retries)
+
+        if self.blocking is not None:
+            logger.warning("The scan stopped at the blocking module %s.", self.blocking.name)
+
+        workers = [worker for worker in self.workers if worker in finished]
+        # with fail_fast, the workers evaluated their modules as they were fetched
+        if not self.fail_fast:
+            # modules served from the results cache need no evaluation
+            matrix = CompatibilityMatrix.for_modules(
+                [worker.module for worker in workers if worker.cached is not True], [self.current_core or '8']
+            )
+            for worker in workers:
+                worker.evaluate(matrix)
+        if self.summary is not None and not self.resolve_dependencies:
+            for worker in workers:
+                self._summarize(worker.module)
+
+        if self.resolve_dependencies:
+            resolver = DependencyResolver(self.fetcher, self.current_core or '8', self.concurrency_limit)
+            try:
+                async with asyncio.timeout_at(deadline_at):
+                    await resolver.resolve([
+                        module for module in self.modules
+                        if module.active and not module.failed and not module.timed_out
+                    ])
+            except TimeoutError:
+                logger.warning("The scan deadline expired; the dependencies of the modules were not resolved.")
+            if self.fail_fast and self.blocking is None:
+                # a module whose suitable entries are all blocked by their dependencies blocks the upgrade too
+                self.blocking = next((worker.module for worker in workers if self._is_blocking(worker.module)), None)
+
+        if self.summary is not None:
+            for worker in self.workers:
+                if self.resolve_dependencies or worker not in finished:
+                    self._summarize(worker.module)
+
+    async def iter_completed(self) -> AsyncIterator[Module]:
+        """
+        Run the workers and yield each module as soon as it is fetched and evaluated, in completion order.
+        The modules are evaluated one at a time instead of in one batch, and their dependencies are not resolved.
+        When the deadline expires, the pending workers are cancelled and their modules are yielded as timed out.
+        Closing the iterator, or cancelling the task that consumes it, cancels the pending workers.
+        """
+        semaphore = self.semaphore or asyncio.Semaphore(self.concurrency_limit)
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        deadline_at = started_at + self.deadline if self.deadline is not None else None
+        self.workers = [
+            Worker(
+                module=module,
+                use_lock_version=self.use_lock_version,
+                current_core=self.current_core,
+                fetcher=self.fetcher,
+                results=self.results
+            )
+            for module in order_modules(self.modules, self.order, self.history, self.hints)
+        ]
+        self.profile = []
+        self.retries = 0
+        positions = {worker: position for position, worker in enumerate(self.workers, start=1)}
+        tasks = {asyncio.ensure_future(worker.run(semaphore)): worker for worker in self.workers}
+        pending = set(tasks)
+        try:
+            while pending:
+                timeout = None if deadline_at is None else max(0.0, deadline_at - loop.time())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    task.result()
+                    worker = tasks[task]
+                    self._record_worker(positions[worker], worker, loop.time() - started_at, False)
+                    yield worker.module
+
+            if pending:
+                # the deadline expired
+                timed_out = [tasks[task] for task in pending]
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                pending = set()
+                logger.warning(
+                    "The scan deadline of %gs expired; %d module(s) timed out: %s", self.deadline, len(timed_out),
+                    ", ".join(worker.module.name for worker in timed_out)
+                )
+                for worker in timed_out:
+                    worker.module.timed_out = True
+                    self._record_worker(positions[worker], worker, None, True)
+                    yield worker.module
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            self.profile.sort(key=lambda row: row["position"])
+            self.elapsed = loop.time() - started_at
+
+    @staticmethod
+    def _is_blocking(module: Module) -> bool:
+        """
+        Check whether the module was fetched and has no suitable entry for the target core.
+        """
+        return module.active is True and not module.failed and not module.timed_out and not module.suitable_entries
+
+    def _summarize(self, module: Module) -> None:
+        """
+        Count the module in the summary and let go of its entries.
+        """
+        self.summary.add(module)
+        module.transitive_entries = []
+        module.suitable_entries = []
+        module.blocked_entries = []
+
+    def _record_profile(self, finished: set[Worker], timings: dict[Worker, float]) -> None:
+        """
+        Collect the timings and retries of the workers and add the request measurements to the history.
+        """
+        self.profile = []
+        self.retries = 0
+        for position, worker in enumerate(self.workers, start=1):
+            unfinished = worker not in finished
+            # the workers left when the scan stops at a blocking module were cancelled, not timed out
+            self._record_worker(position, worker, timings.get(worker), unfinished and self.blocking is None,
+                                cancelled=unfinished and self.blocking is not None)
+
+    def _record_worker(self, position: int, worker: Worker, finished_after: float | None, timed_out: bool,
+                       cancelled: bool = False) -> None:
+        """
+        Collect the timing and retries of a worker and add its request measurement to the history.
         """
-        semaphore = asyncio.Semaphore(self.concurrency_limit)
-        
-        with self.output.progress_bar() as progress:
-            main_task = progress.add_task("[cyan]Scanning modules...", total=len(self.modules))
-            
-            async with asyncio.TaskGroup() as tg:
-                for module in self.modules:
-                    worker = Worker(
-                        module=module,
-                        use_lock_version=self.use_lock_version,
-                        current_core=self.current_core
-                    )
-                    
-                    async def run_worker_with_progress(w, s, p, t):
-                        await w.run(s)
-                        p.advance(t)
-                        
-                    tg.create_task(run_worker_with_progress(worker, semaphore, progress, main_task))
+        module = worker.module
+        source, estimate = expected_cost(module, self.history, self.hints)
+        stats = self.fetcher.take_request_stats(self.fetcher.prepare_url(module.name)) or {}
+        if stats.get("size") is not None and self.history is not None:
+            self.history.record(module.name, stats["latency"], stats["size"])
+        module.retries = stats.get("retries", 0)
+        self.retries += module.retries
+        self.profile.append({
+            "module": module.name,
+            "position": position,
+            "estimate_source": source,
+            "estimate": estimate,
+            "finished_after": finished_after,
+            "latency": stats.get("latency"),
+            "size": stats.get("size"),
+            "retries": module.retries,
+            "timed_out": timed_out,
+            "cancelled": cancelled,
+        })